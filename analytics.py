@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import camssXLSX2RDF as camss
+import index as sqlindex
+import utils
+
+
+def read_scores(db_path: str = None) -> pd.DataFrame:
+    """
+    Reads the criterion scores of all the indexed assessments in one query, with the grouping columns: scenario, tool
+    version, SDO name (ass_dict['agent']['P3']) and specification type.
+    :param db_path: SQLite index file path, 'arti/index.sqlite' by default (see index.py, run(..., index=True))
+    :return: one row per assessment and criterion, in the order of the spread-sheet columns
+    """
+    ass_index = sqlindex.AssessmentIndex(db_path)
+    try:
+        scores = pd.read_sql_query(
+            'SELECT a.assessment_id, a.title, a.scenario, a.tool_version, o.name AS sdo, sp.spec_type, s.criterion, '
+            's.score, s.answer FROM scores s JOIN assessments a USING (assessment_id) '
+            'LEFT JOIN specifications sp ON sp.spec_id = a.spec_id '
+            "LEFT JOIN organisations o ON o.org_id = a.sdo_id AND o.kind = 'agent'", ass_index.connection)
+    finally:
+        ass_index.close()
+    if scores.empty:
+        raise Exception('No assessments indexed, convert them with run(..., index=True) first.')
+    scores['score'] = pd.to_numeric(scores['score'], errors='coerce').fillna(0).astype(int)
+    scores['not_applicable'] = scores['answer'].fillna('').str.strip().str.lower() == 'not applicable'
+    for column in GROUPS:
+        scores[column] = scores[column].fillna('(none)')
+    # criteria in the order of the spread-sheet columns, as in Extractor.criteria: A1, A2, ..., A10...
+    scores['number'] = pd.to_numeric(scores['criterion'].str.extract(r'^A(\d+)', expand=False),
+                                     errors='coerce').fillna(0).astype(int)
+    scores = scores.sort_values(['assessment_id', 'number', 'criterion'], kind='stable', ignore_index=True)
+    scores['position'] = scores.groupby('assessment_id').cumcount()
+    return scores
+
+
+def get_categories(scores: pd.DataFrame) -> pd.DataFrame:
+    """
+    Category scores, strengths and compliance levels of every assessment, as computed one by one by
+    utils.PunctuationCalculator, for all the assessments of a scenario version at once. Each scenario version is
+    scored with its own profile (utils.get_profile); the scenarios without one (MSP, TS) have no categories, their
+    assessments only count in the per-criterion averages.
+    :param scores: see read_scores
+    :return: one row per assessment and category
+    """
+    criteria = scores.groupby('assessment_id').criterion.transform('size')
+    tables = []
+    for (scenario, tool_version), group in scores.groupby(['scenario', 'tool_version'], sort=False):
+        profile = utils.get_profile(scenario, tool_version)
+        if profile is None:
+            continue
+        bounds = [start for start, _ in profile.category_range[1:]]
+        group = group[criteria[group.index] == profile.criteria].copy()
+        group['category'] = np.searchsorted(bounds, group['position'].to_numpy(), side='right') + 1
+        table = group.groupby(['assessment_id', 'category'], sort=False).agg(
+            title=('title', 'first'), scenario=('scenario', 'first'), tool_version=('tool_version', 'first'),
+            sdo=('sdo', 'first'), spec_type=('spec_type', 'first'), score=('score', 'sum'),
+            not_applicable=('not_applicable', 'sum'), criteria=('score', 'size')).reset_index()
+        table['name'] = table['category'].map({i: name for i, (name, _, _) in enumerate(profile.categories, start=1)})
+        table['criterion_maximum'] = profile.maximum
+        table['maximum'] = table['criteria'] * profile.maximum
+        table['strength'] = ((table['criteria'] - table['not_applicable']) / table['criteria'] * 100).round(4)
+        table['compliance_level'] = None
+        for category, rows in table.groupby('category').groups.items():
+            table.loc[rows, 'compliance_level'] = profile.get_levels(category, table.loc[rows, 'score'])
+        tables.append(table)
+    if not tables:
+        raise Exception('No scored assessments indexed, the scenarios of the indexed ones have no scoring profile.')
+    categories = pd.concat(tables, ignore_index=True)
+    categories['compliance_level'] = categories['compliance_level'].fillna('(none)')
+    return categories
+
+
+def get_overall(categories: pd.DataFrame) -> pd.DataFrame:
+    """
+    Overall score and strength of every scored assessment, the not applicable criteria discounted as in
+    utils.PunctuationCalculator.
+    """
+    overall = categories.groupby('assessment_id', sort=False).agg(
+        title=('title', 'first'), scenario=('scenario', 'first'), tool_version=('tool_version', 'first'),
+        sdo=('sdo', 'first'), spec_type=('spec_type', 'first'), score=('score', 'sum'),
+        not_applicable=('not_applicable', 'sum'), criteria=('criteria', 'sum'),
+        criterion_maximum=('criterion_maximum', 'first')).reset_index()
+    overall['score'] -= overall['not_applicable'] * overall['criterion_maximum']
+    overall['maximum'] = (overall['criteria'] - overall['not_applicable']) * overall['criterion_maximum']
+    overall = overall.drop(columns='criterion_maximum')
+    overall['percentage'] = (overall['score'] / overall['maximum'].replace(0, np.nan) * 100).round(2)
+    overall['strength'] = ((overall['criteria'] - overall['not_applicable']) / overall['criteria'] * 100).round(4)
+    return overall
+
+
+def get_distributions(categories: pd.DataFrame, overall: pd.DataFrame) -> pd.DataFrame:
+    """
+    Distribution (count, mean, standard deviation, quartiles) of the category and overall scores, per group.
+    """
+    tables = []
+    for group in GROUPS:
+        table = categories.groupby([group, 'category', 'name']).score.describe().reset_index()
+        total = overall.groupby(group).percentage.describe().reset_index()
+        total['category'], total['name'] = categories['category'].max() + 1, 'Overall (%)'
+        table = pd.concat([table, total], ignore_index=True).rename(columns={group: 'group'})
+        table.insert(0, 'group_by', group)
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True).sort_values(['group_by', 'group', 'category'], ignore_index=True)
+
+
+def get_compliance(categories: pd.DataFrame) -> pd.DataFrame:
+    """
+    Number of assessments per compliance level of each category, per group.
+    """
+    tables = []
+    for group in GROUPS:
+        table = categories.groupby([group, 'category', 'name', 'compliance_level']).size() \
+            .unstack('compliance_level', fill_value=0).reset_index().rename(columns={group: 'group'})
+        table.insert(0, 'group_by', group)
+        tables.append(table)
+    table = pd.concat(tables, ignore_index=True).fillna(0)
+    levels = [level for level in LEVELS if level in table.columns]
+    others = [column for column in table.columns if column not in ['group_by', 'group', 'category', 'name'] + levels]
+    table = table[['group_by', 'group', 'category', 'name'] + levels + others]
+    table[levels + others] = table[levels + others].astype(int)
+    return table
+
+
+def get_criteria(scores: pd.DataFrame) -> pd.DataFrame:
+    """
+    Average score and not applicable rate of every criterion, per scenario and tool version.
+    """
+    criteria = scores.groupby(['scenario', 'tool_version', 'number', 'criterion']).agg(
+        assessments=('score', 'size'), mean_score=('score', 'mean'),
+        not_applicable_rate=('not_applicable', 'mean')).reset_index().drop(columns='number')
+    criteria['mean_score'] = criteria['mean_score'].round(2)
+    criteria['not_applicable_rate'] = (criteria['not_applicable_rate'] * 100).round(2)
+    return criteria
+
+
+def report(db_path: str = None, output: str = None) -> dict:
+    """
+    Use it to compare all the converted assessments: distributions of the category scores and compliance levels by
+    SDO, specification type, scenario and tool version, and per-criterion averages and not applicable rates. The
+    whole index is read once and every table computed with pandas, for all the assessments at once.
+    :param db_path: SQLite index file path, 'arti/index.sqlite' by default (see run(..., index=True))
+    :param output: the report file path (Excel workbook, one sheet per table)
+    :return: the tables of the report, per sheet name
+    """
+    output = output if output else REPORT_PATH
+    start = time.perf_counter()
+    scores = read_scores(db_path)
+    categories = get_categories(scores)
+    overall = get_overall(categories)
+    tables = {'assessments': overall, 'categories': categories.drop(columns=['criteria', 'criterion_maximum']),
+              'distributions': get_distributions(categories, overall), 'compliance': get_compliance(categories),
+              'criteria': get_criteria(scores)}
+    elapsed = time.perf_counter() - start
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with pd.ExcelWriter(output) as writer:
+        for name, table in tables.items():
+            table.to_excel(writer, sheet_name=name, index=False)
+    camss.log(f"{scores.assessment_id.nunique()} assessments analysed in {round(elapsed, 2)} s, see '{output}'.")
+    return tables
+
+
+GROUPS = ['sdo', 'spec_type', 'scenario', 'tool_version']  # grouping columns of the report
+LEVELS = ['Ad-hoc', 'Opportunistic', 'Essential', 'Sustainable', 'Seamless']  # order of the compliance level columns
+REPORT_PATH = 'arti/report/analytics.xlsx'  # batch analytics report
+
+
+if __name__ == '__main__':
+    report(sys.argv[1] if len(sys.argv) > 1 else None)
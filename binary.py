@@ -0,0 +1,217 @@
+import os
+import sys
+import mmap
+import time
+import shutil
+import struct
+from array import array
+
+import numpy as np
+
+import camssXLSX2RDF as camss
+import nquads
+
+# file layout, all sections aligned on 8 bytes:
+# header     MAGIC, version, id width in bytes, number of terms, number of quads, offset of the quads section
+# offsets    uint64[terms + 1], start of every term in the term section, relative to the section
+# terms      the terms in N-Quads syntax, UTF-8, one after the other; term 0 is the empty term (no graph)
+# quads      uint32 or uint64[quads, 4], (subject, predicate, object, graph) term ids
+MAGIC = b'CAMSSNQB'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQQ')
+
+
+class BinaryDataset:
+    """
+    Dictionary-encoded, memory-mapped N-Quads dataset. Every distinct term (IRI, blank node or literal, in its N-Quads
+    syntax) is stored once, and the quads as fixed-width integer term ids, so that the long IRIs repeated on almost
+    every line of the merged datasets take 16 or 32 bytes per quad. Opening the dataset only maps the file: the quads
+    are read as a NumPy array view and the terms decoded on demand.
+    """
+    file_path: str  # the binary dataset file path (string type)
+    terms: int  # number of distinct terms, the empty term included (integer type)
+    quads: np.ndarray  # (subject, predicate, object, graph) term ids, one row per quad
+
+    def __init__(self, file_path: str):
+        """
+        BinaryDataset class initializer. Maps the file into memory.
+        :param file_path: the binary dataset file path, see write()
+        """
+        self.file_path = file_path
+        self.file = open(file_path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, width, self.terms, count, quads_offset = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"'{file_path}' is not a CAMSS binary N-Quads dataset (version {VERSION}).")
+        self.offsets = np.frombuffer(self.mm, dtype='<u8', count=self.terms + 1, offset=HEADER.size)
+        self.terms_offset = HEADER.size + 8 * (self.terms + 1)
+        self.quads = np.frombuffer(self.mm, dtype='<u4' if width == 4 else '<u8', count=count * 4,
+                                   offset=quads_offset).reshape(count, 4)
+        self.cache = {}
+
+    def __len__(self) -> int:
+        return len(self.quads)
+
+    def term(self, term_id: int) -> str:
+        """
+        Returns a term in its N-Quads syntax, '' for the graph of a triple.
+        """
+        term = self.cache.get(term_id)
+        if term is None:
+            start = self.terms_offset + int(self.offsets[term_id])
+            end = self.terms_offset + int(self.offsets[term_id + 1])
+            term = self.mm[start:end].decode('utf-8')
+            self.cache[term_id] = term
+        return term
+
+    def iter_quads(self):
+        """
+        Iterates over the quads, as terms in their N-Quads syntax.
+        :return: generator of (subject, predicate, object, graph) tuples, graph is None for a triple
+        """
+        term = self.term
+        for s, p, o, g in self.quads.tolist():
+            yield term(s), term(p), term(o), term(g) if g else None
+
+    def iter_lines(self):
+        """
+        Iterates over the N-Quads lines of the dataset, without the line break.
+        """
+        for s, p, o, g in self.iter_quads():
+            yield f'{s} {p} {o} {g} .' if g else f'{s} {p} {o} .'
+
+    def write_nquads(self, destination: str):
+        """
+        Rebuilds the N-Quads file of the dataset, compressed according to the extension of the destination.
+        """
+        with camss.open_atomic(destination, 'wt') as f:
+            for line in self.iter_lines():
+                f.write(line + '\n')
+
+    def close(self):
+        """
+        Unmaps the file. The arrays taken from the dataset (e.g. dataset.quads or a slice of it) are views of the
+        mapping: while the caller still holds one, the mapping cannot be closed and is only released once the last view
+        is garbage collected.
+        """
+        self.quads = self.offsets = None
+        try:
+            self.mm.close()
+        except BufferError:
+            # exported views, see above
+            pass
+        self.mm = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def write(file_paths: list, destination: str) -> (int, int):
+    """
+    Encodes N-Quads files into one binary dataset. The lines are streamed; only the term dictionary and the quad ids
+    are kept in memory.
+    :param file_paths: the (compressed or not) N-Quads files
+    :param destination: the binary dataset file path
+    :return: the number of terms and of quads
+    :raise ValueError: on a line outside the restricted shape handled by the tokenizer
+    """
+    ids = {'': 0}
+    quads = array('Q')
+    for file_path in file_paths:
+        for line in nquads.iter_lines(file_path):
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            quad = nquads.parse_line(line)
+            if quad is None:
+                raise ValueError(f'Unexpected N-Quads line in {file_path}: {line}')
+            for term in quad:
+                term = term if term else ''
+                term_id = ids.get(term)
+                if term_id is None:
+                    term_id = ids[term] = len(ids)
+                quads.append(term_id)
+    terms = [term.encode('utf-8') for term in ids]
+    offsets = np.zeros(len(terms) + 1, dtype='<u8')
+    np.cumsum([len(term) for term in terms], out=offsets[1:])
+    width = 4 if len(terms) <= 0xFFFFFFFF else 8
+    terms_size = int(offsets[-1])
+    quads_offset = HEADER.size + offsets.nbytes + terms_size
+    padding = -quads_offset % 8
+    quads_offset += padding
+    with camss.open_atomic(destination, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, width, len(terms), len(quads) // 4, quads_offset))
+        f.write(offsets.tobytes())
+        for term in terms:
+            f.write(term)
+        f.write(b'\0' * padding)
+        f.write(np.frombuffer(quads, dtype='<u8').astype('<u4' if width == 4 else '<u8').tobytes())
+    return len(terms), len(quads) // 4
+
+
+def export(graphs: list = None) -> list:
+    """
+    Use it to export the merged datasets as binary datasets, 'arti/out/<graph>/<graph>-graph.nqb', e.g. after
+    __merge_graphs__.
+    :param graphs: the graphs exported, 'ass', 'crit' and 'specs' by default
+    :return: the binary dataset file paths
+    """
+    exported = []
+    for graph in graphs if graphs else ['ass', 'crit', 'specs']:
+        files = nquads.get_graph_files(f'arti/out/{graph}/')
+        if not files:
+            continue
+        destination = f'arti/out/{graph}/{graph}-graph{EXTENSION}'
+        terms, count = write(files, destination)
+        camss.log(f"'{destination}': {count} quads, {terms} terms")
+        exported.append(destination)
+    return exported
+
+
+def benchmark(file_path: str) -> dict:
+    """
+    Compares the binary dataset with the plain, gzip and xz N-Quads of the same file: file size, and time to open the
+    dataset and iterate over all its quads (terms in N-Quads syntax).
+    :param file_path: a plain N-Quads file, e.g. 'arti/out/ass/ass-graph.nq' or one written by nquads.write_synthetic
+    :return: (size in bytes, load time in seconds) per format
+    """
+    root = os.path.splitext(file_path)[0]
+    results = {}
+    for name, suffix in [('nq', ''), ('nq.gz', '.gz'), ('nq.xz', '.xz')]:
+        path = file_path if not suffix else f'{root}.nq{suffix}'
+        if suffix:
+            with camss.open_stream(file_path, 'rb') as infile, camss.open_stream(path, 'wb') as outfile:
+                shutil.copyfileobj(infile, outfile, 1 << 20)
+        start = time.perf_counter()
+        for line in nquads.iter_lines(path):
+            nquads.parse_line(line)
+        results[name] = (os.path.getsize(path), time.perf_counter() - start)
+    path = root + EXTENSION
+    write([file_path], path)
+    start = time.perf_counter()
+    with BinaryDataset(path) as dataset:
+        for _ in dataset.iter_quads():
+            pass
+    results['nqb'] = (os.path.getsize(path), time.perf_counter() - start)
+    start = time.perf_counter()
+    with BinaryDataset(path) as dataset:
+        # the ids only, e.g. to count the quads per predicate
+        np.unique(dataset.quads[:, 1], return_counts=True)
+    results['nqb (ids)'] = (os.path.getsize(path), time.perf_counter() - start)
+    for name, (size, elapsed) in results.items():
+        print(f'{name}\t{round(size / 1024 / 1024, 2)} MB\t{round(elapsed, 3)} s')
+    return results
+
+
+EXTENSION = '.nqb'  # binary dataset file extension
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        benchmark(sys.argv[1])
+    else:
+        export()
@@ -3,16 +3,34 @@ import re
 import sys
 import glob
 import uuid
+import json
+import pickle
 import hashlib
+import gzip
+import lzma
+import shutil
+import threading
+import zipfile
 import datetime
+import time
+import traceback
 import pandas as p
 import logging
+from io import StringIO
+from contextlib import contextmanager
 from pathlib import PurePath
 import pandas as pd
 import rdflib
 from rdflib import Namespace
 
 import utils
+import readers
+import nquads
+import index as sqlindex
+import preflight
+import records
+import scores
+import store as localstore
 
 
 class AssessmentScenario:
@@ -30,13 +48,14 @@ class AssessmentScenario:
     gradients: dict = None  # EIF gradients dictionary
     ass_dict: dict  # Assessment dictionary
 
-    def __init__(self, file_path: str = None, row: int = 0):
+    def __init__(self, file_path: str = None, row: int = 0, ass_df: p.DataFrame = None):
         """
         Assessments class initializer. Collection of the assessments' common metadata.
         :param file_path: file path data
+        :param ass_df: the workbook already loaded (see readers.py), instead of reading it from file_path
         """
         self.ass_file_path = file_path  # file path
-        self.ass_df = self.open_file()  # assessments stored in DataFrame
+        self.ass_df = self.open_file() if ass_df is None else ass_df  # assessments stored in DataFrame
         self.scenario = self.get_scenario()  # assessments scenario
         self.scenario_full = self.get_scenario_full()  # the assessment scenario full name
         self.url_scenario = self.get_url_eusurvey() # the EUSurvey URL of the CAMSS Assessment Scenario
@@ -49,9 +68,10 @@ class AssessmentScenario:
 
     def open_file(self) -> p.DataFrame:
         """
-        Loads from an excel workbook all the assessments  from a EU Survey/CAMSS Tool and transforms it into a DataFrame
+        Loads from an excel workbook (or a csv export) all the assessments  from a EU Survey/CAMSS Tool and transforms it
+        into a DataFrame. See readers.py for the available reader backends.
         """
-        self.ass_df = p.read_excel(self.ass_file_path, header=None)
+        self.ass_df = get_workbook_cache().read(self.ass_file_path)
         return self.ass_df
 
     def get_scenario(self):
@@ -106,9 +126,15 @@ class AssessmentScenario:
 
     def get_date(self):
         """
-        Takes EU Survey export date (unused).
+        Takes the EU Survey export date, as an ISO 8601 date; None if the output has none.
         """
-        return str(self.ass_df.loc[1, 1])[:11]
+        value = self.ass_df.loc[1, 1]
+        try:
+            # ISO 8601 (year first), or the European day/month/year
+            date = p.to_datetime(value, dayfirst=not re.match(r'\s*\d{4}-', str(value)))
+        except (ValueError, TypeError, OverflowError):
+            return None
+        return None if p.isna(date) else date.date().isoformat()
 
     def get_criteria(self):
         self.criteria = {}
@@ -126,12 +152,15 @@ class AssessmentScenario:
     @staticmethod
     def get_gradients():
         """
-        Extracts gradients from predefined answers and creates a DataFrame.
+        Extracts gradients from predefined answers and creates a DataFrame. Read only once per process.
         :return: dict
         """
-        df = p.read_csv('gradients_EIFv6.csv', sep='\t', header=None)
-        df = df.apply(lambda x: x.astype(str).str.lower())
-        return dict(zip(df[0], df[1]))
+        global GRADIENTS
+        if GRADIENTS is None:
+            df = p.read_csv(GRADIENTS_PATH, sep='\t', header=None)
+            df = df.apply(lambda x: x.astype(str).str.lower())
+            GRADIENTS = dict(zip(df[0], df[1]))
+        return GRADIENTS
 
     def get_ass_dict(self):
         """
@@ -144,7 +173,8 @@ class AssessmentScenario:
         # main dictionary keys
         self.ass_dict = dict.fromkeys(dict_keys)
         # common elements for EIF, MSP and ICT
-        self.ass_dict['assessment_date'] = str(datetime.date.today())  # date of the assessment
+        # date of the assessment: the export date, so that converting the same output again gives the same quads
+        self.ass_dict['assessment_date'] = self.ass_date if self.ass_date else str(datetime.date.today())
         self.ass_dict['submission_date'] = None  # assessment submission date
         self.ass_dict['tool_version'] = self.tool_version  # EU Survey/CAMSS Tool version
         self.ass_dict['tool_release_date'] = None  # Tool release date
@@ -167,15 +197,20 @@ class Extractor(AssessmentScenario):
     ass_title: str  # the title of the specification being assessed (string type)
     ass_id: str  # the assessment identifier (string type)
     criteria_: dict  # criteria from AssessmentScenario
-    ass_dict: dict  # the assessment data (dictionary type)
+    ass_dict: dict  # the assessment data (dictionary type, records.Assessment once extracted if RECORDS)
+    record: 'records.Assessment'  # the assessment data as a compact record, None if not RECORDS
+    registry: 'EntityRegistry'  # the registry the contact point uuids are taken from
 
-    def __init__(self, file_path: str, row: int = 0):
+    def __init__(self, file_path: str, row: int = 0, ass_df: p.DataFrame = None, registry: 'EntityRegistry' = None):
         """
         Extractor class initializer. Extracts the assessment data currently analysed.
         :param file_path: the file path of the current assessments
         :param row: the row pointing at the current assessment
+        :param ass_df: the workbook already loaded (see readers.py), instead of reading it from file_path
+        :param registry: the registry of the contact point uuids, e.g. a sink's; the process registry by default
         """
-        super().__init__(file_path, row)
+        super().__init__(file_path, row, ass_df)
+        self.registry = get_registry() if registry is None else registry
         self.ass_ = self.ass_df
         self.row = row
         self.ass = p.concat([self.ass_.iloc[3:4], self.ass_.iloc[
@@ -189,19 +224,24 @@ class Extractor(AssessmentScenario):
         # populates the dictionary with the data of the current assessment
         self.ass_dict = self.ass_dict
         self._get_ass_dict()
+        # keeps the data as a compact record instead, still readable as the dictionaries (see records.py)
+        self.record = records.Assessment.from_extractor(self) if RECORDS else None
+        if self.record is not None:
+            self.ass_dict = self.record
+            self.criteria = self.criteria_ = self.record.results
 
     def get_title(self):
         """
         Extracts the title of the specification being assessed.
         """
-        if self.scenario == 'EIF':
-            title = str(self.ass_.loc[self.row, 11]).strip()
-        elif self.scenario == 'MSP':
-            title = str(self.ass_.loc[self.row, 10]).strip()
-        else:
-            title = str(self.ass_.loc[self.row, 12]).strip()
-        title = re.sub("\s+", " ", title).strip()
-        return title
+        return self.normalize_title(self.ass_.loc[self.row, TITLE_COLUMNS.get(self.scenario, TITLE_COLUMNS['TS'])])
+
+    @staticmethod
+    def normalize_title(title) -> str:
+        """
+        The title of a specification as a single-spaced string, whatever the scenario (see also ScoreExtractor).
+        """
+        return re.sub(r"\s+", " ", str(title)).strip()
 
     def get_id(self) -> str:
         """
@@ -280,7 +320,8 @@ class Extractor(AssessmentScenario):
             self.ass_dict['title']['version'] = self.ass.loc[self.row, 12]  # description of the specification
             self.ass_dict['title']['spec_id'] = sha256(
                 str(self.ass_dict['title']['P1']))  # the specification identifier, the MD5 of the title
-            self.ass_dict['title']['distribution_id'] = str(uuid.uuid4())  # distribution_id
+            self.ass_dict['title']['distribution_id'] = stable_id(
+                self.ass_dict['title']['spec_id'], 'distribution')  # distribution_id
             self.ass_dict['title']['P2'] = self.ass.loc[self.row, 14]  # spec_download_url
             # organization
             self.ass_dict['organization'] = {}  # a new dictionary in the dictionary
@@ -295,7 +336,8 @@ class Extractor(AssessmentScenario):
             self.ass_dict['organization']['L5'] = self.ass.loc[self.row, 5]  # submitter_phone
             self.ass_dict['organization']['L6'] = self.ass.loc[self.row, 7]  # submitter_email
             self.ass_dict['organization']['L7'] = None  # submission_date
-            self.ass_dict['organization']['uuid'] = uuid.uuid4() \
+            self.ass_dict['organization']['uuid'] = self.registry.get_uuid(
+                'organization', self.ass_dict['organization']['submitter_org_id']) \
                 if 'CAMSS' not in [self.ass_dict['organization']['L1'], self.ass_dict['organization']['L2']] \
                 else 'ddf032efca18c9e6eaa97bc90924977af1d96bffe564b351a6081835c75d8164'  # organization contact point uuid (?)
             # agent, SDO
@@ -320,7 +362,8 @@ class Extractor(AssessmentScenario):
                 str(self.ass_dict['agent']['P3']))  # sdo_id (for the Agent instance)
             self.ass_dict['agent']['P4'] = self.ass.loc[self.row, 18]
             # sdo_contact_point
-            self.ass_dict['agent']['uuid'] = uuid.uuid4()  # agent contact point uuid (?)
+            self.ass_dict['agent']['uuid'] = self.registry.get_uuid(
+                'agent', self.ass_dict['agent']['sdo_id'])  # agent contact point uuid (?)
             # submission_rationale
             self.ass_dict['P5'] = None  # submission_rationale
             # 'other_evaluations'
@@ -360,11 +403,12 @@ class Extractor(AssessmentScenario):
             self.ass_dict['status'] = None  # to review
             # title
             self.ass_dict['title'] = {}  # a new dictionary in the dictionary
-            self.ass_title = self.ass.loc[self.row, 9]  # title of the specification
+            self.ass_title = self.ass.loc[self.row, TITLE_COLUMNS['MSP']]  # title of the specification
             self.ass_dict['title']['P1'] = self.ass_title  # title of the specification
             self.ass_dict['title']['spec_id'] = sha256(
                 str(self.ass_dict['title']['P1']))  # the specification identifier, the MD5 of the title
-            self.ass_dict['title']['distribution_id'] = str(uuid.uuid4())  # distribution_id
+            self.ass_dict['title']['distribution_id'] = stable_id(
+                self.ass_dict['title']['spec_id'], 'distribution')  # distribution_id
             self.ass_dict['title']['P2'] = self.ass.loc[self.row, 10]  # spec_download_url
             # organization
             self.ass_dict['organization'] = {}  # a new dictionary in the dictionary
@@ -379,14 +423,16 @@ class Extractor(AssessmentScenario):
             self.ass_dict['organization']['L5'] = self.ass.loc[self.row, 6]  # submitter_phone
             self.ass_dict['organization']['L6'] = self.ass.loc[self.row, 8]  # submitter_email
             self.ass_dict['organization']['L7'] = None  # submission_date
-            self.ass_dict['organization']['uuid'] = uuid.uuid4()  # organization contact point uuid (?)
+            self.ass_dict['organization']['uuid'] = self.registry.get_uuid(
+                'organization', self.ass_dict['organization']['submitter_org_id'])  # organization contact point uuid (?)
             # agent, SDO
             self.ass_dict['agent'] = {}  # a new dictionary in the dictionary
             self.ass_dict['agent']['P3'] = self.ass.loc[self.row, 11]  # sdo_name
             self.ass_dict['agent']['sdo_id'] = sha256(
                 str(self.ass_dict['agent']['P3']))  # sdo_id (for the Agent instance)
             self.ass_dict['agent']['P4'] = self.ass.loc[self.row, 13]  # sdo_contact_point
-            self.ass_dict['agent']['uuid'] = uuid.uuid4()  # agent contact point uuid (?) aqui
+            self.ass_dict['agent']['uuid'] = self.registry.get_uuid(
+                'agent', self.ass_dict['agent']['sdo_id'])  # agent contact point uuid (?)
             # submission_rationale
             self.ass_dict['P5'] = self.ass.loc[self.row, 14]  # submission_rationale
             # 'other_evaluations'
@@ -426,11 +472,12 @@ class Extractor(AssessmentScenario):
             self.ass_dict['status'] = self.ass.loc[self.row, 31]  # to review
             # title
             self.ass_dict['title'] = {}  # a new dictionary in the dictionary
-            self.ass_title = self.ass.loc[self.row, 11]  # global variable for the title of the specification
+            self.ass_title = self.ass.loc[self.row, TITLE_COLUMNS['TS']]  # global variable for the title of the specification
             self.ass_dict['title']['P1'] = self.ass_title  # spec_title
             self.ass_dict['title']['spec_id'] = sha256(
                 str(self.ass_dict['title']['P1']))  # spec_id, the MD5 of the title
-            self.ass_dict['title']['distribution_id'] = str(uuid.uuid4())  # distribution_id
+            self.ass_dict['title']['distribution_id'] = stable_id(
+                self.ass_dict['title']['spec_id'], 'distribution')  # distribution_id
             self.ass_dict['title']['P2'] = self.ass.loc[self.row, 12]  # spec_download_url
             # organization
             self.ass_dict['organization'] = {}  # a new dictionary in the dictionary
@@ -445,14 +492,16 @@ class Extractor(AssessmentScenario):
             self.ass_dict['organization']['L5'] = self.ass.loc[self.row, 6]  # submitter_phone
             self.ass_dict['organization']['L6'] = self.ass.loc[self.row, 8]  # submitter_email
             self.ass_dict['organization']['L7'] = None  # submission_date
-            self.ass_dict['organization']['uuid'] = uuid.uuid4()  # organization contact point uuid (?)
+            self.ass_dict['organization']['uuid'] = self.registry.get_uuid(
+                'organization', self.ass_dict['organization']['submitter_org_id'])  # organization contact point uuid (?)
             # agent, SDO
             self.ass_dict['agent'] = {}  # a new dictionary in the dictionary
             self.ass_dict['agent']['P3'] = self.ass.loc[self.row, 13]  # sdo_name
             self.ass_dict['agent']['sdo_id'] = sha256(
                 str(self.ass_dict['agent']['P3']))  # sdo_id (for the Agent instance)
             self.ass_dict['agent']['P4'] = self.ass.loc[self.row, 15]  # sdo_contact_point
-            self.ass_dict['agent']['uuid'] = uuid.uuid4()  # agent contact point uuid (?)
+            self.ass_dict['agent']['uuid'] = self.registry.get_uuid(
+                'agent', self.ass_dict['agent']['sdo_id'])  # agent contact point uuid (?)
             # submission_rationale
             self.ass_dict['P5'] = self.ass.loc[self.row, 16]  # submission_rationale
             # 'other_evaluations'
@@ -472,13 +521,13 @@ class Extractor(AssessmentScenario):
             self.ass_dict['C5'] = self.ass.loc[self.row, 35]  # egov_interoperability
         for elem in self.ass_dict['title']:
             if type(self.ass_dict['title'][elem]) is str:
-                self.ass_dict['title'][elem] = re.sub("\s+", " ", self.ass_dict['title'][elem]).strip()
+                self.ass_dict['title'][elem] = self.normalize_title(self.ass_dict['title'][elem])
         for elem in self.ass_dict['organization']:
             if type(self.ass_dict['organization'][elem]) is str:
-                self.ass_dict['organization'][elem] = re.sub("\s+", " ", self.ass_dict['organization'][elem]).strip()
+                self.ass_dict['organization'][elem] = self.normalize_title(self.ass_dict['organization'][elem])
         for elem in self.ass_dict['agent']:
             if type(self.ass_dict['agent'][elem]) is str:
-                self.ass_dict['agent'][elem] = re.sub("\s+", " ", self.ass_dict['agent'][elem]).strip()
+                self.ass_dict['agent'][elem] = self.normalize_title(self.ass_dict['agent'][elem])
         return
 
     def _get_criteria(self):
@@ -519,7 +568,7 @@ class Extractor(AssessmentScenario):
             index = index_0 + 1
             answer = str(self.ass.loc[self.row, index_0]).strip()
             # Score element ID and Value
-            self.criteria_[criterion].append(str(uuid.uuid4()))
+            self.criteria_[criterion].append(stable_id(self.get_id(), criterion, 'score'))
             if self.scenario == 'EIF':
                 option = str(self._new_yesno_choice(str(answer), self.gradients))
                 self.criteria_[criterion].append(option)
@@ -527,48 +576,661 @@ class Extractor(AssessmentScenario):
                 option = str(self._yesno_choice(str(answer)))
                 self.criteria_[criterion].append(option)
             # Criterion Justification Id and Judgement text
-            self.criteria_[criterion].append(str(uuid.uuid4()))
+            self.criteria_[criterion].append(stable_id(self.get_id(), criterion, 'statement'))
             text = self.ass.loc[self.row, index]
             text = repr(text)
             text = re.sub(r'"', '\\"', text)
             text = re.sub(r'\\r', '', text)
             if answer in possible_answ[:3] and self.ass.loc[self.row, 15] == 'W3C (https://www.w3.org)':
                 self.criteria_[criterion].append(
-                    re.sub(r'"', '\\"', repr(predefined_answ['W3C (https://www.w3.org)'][possible_answ.index(answer)])))
+                    get_justification(predefined_answ['W3C (https://www.w3.org)'][possible_answ.index(answer)]))
             elif answer in possible_answ[:3] and self.ass.loc[self.row, 15] == 'IETF (https://www.ietf.org/)':
                 self.criteria_[criterion].append(
-                    re.sub(r'"', '\\"',
-                           repr(predefined_answ['IETF (https://www.ietf.org/)'][possible_answ.index(answer)])))
+                    get_justification(predefined_answ['IETF (https://www.ietf.org/)'][possible_answ.index(answer)]))
             elif answer in possible_answ and self.ass.loc[self.row, 15] == 'ETSI (https://www.etsi.org/)':
                 self.criteria_[criterion].append(
-                    re.sub(r'"', '\\"',
-                           repr(predefined_answ['ETSI (https://www.etsi.org/)'][possible_answ.index(answer)])))
+                    get_justification(predefined_answ['ETSI (https://www.etsi.org/)'][possible_answ.index(answer)]))
             else:
                 self.criteria_[criterion].append(text)
             self.criteria_[criterion].append(str(self.ass.loc[self.row, index_0]))
         return
 
 
+class EntityRegistry:
+    """
+    Registry of the real-world entities shared across assessments (submitter organisations and SDOs).
+    Keeps one stable contact point node per entity and records in which output file the entity triples were already
+    written, so that each entity is emitted only once. The registry is persisted across runs.
+    """
+    registry_path: str  # file path of the persisted registry (string type)
+    entities: dict  # entities per kind ('organization', 'agent'), keyed by submitter_org_id/sdo_id
+
+    def __init__(self, registry_path: str = None, persistent: bool = True, exists=None):
+        """
+        EntityRegistry class initializer. Loads the registry persisted by previous runs, if any.
+        :param registry_path: file path of the persisted registry
+        :param persistent: whether the registry is loaded from and saved to registry_path
+        :param exists: function checking whether an output file exists, output_exists() by default
+        """
+        self.registry_path = registry_path if registry_path else ENTITIES_PATH
+        self.persistent = persistent
+        self.exists = exists if exists else output_exists
+        self.entities = {'organization': {}, 'agent': {}}
+        self.lock = threading.RLock()  # shared by the concurrent conversions (e.g. the watcher worker pool)
+        if persistent and os.path.isfile(self.registry_path):
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                self.entities.update(json.load(f))
+
+    def get_uuid(self, kind: str, entity_id: str) -> str:
+        """
+        Returns the stable contact point identifier of an entity, creating it the first time the entity is seen.
+        :param kind: the kind of entity, 'organization' or 'agent'
+        :param entity_id: the entity identifier (submitter_org_id or sdo_id)
+        :return: the contact point uuid
+        """
+        with self.lock:
+            entity = self.entities[kind].setdefault(entity_id, {'uuid': stable_id(kind, entity_id), 'emitted': {}})
+        return entity['uuid']
+
+    @staticmethod
+    def fingerprint(lines: list) -> str:
+        """
+        Digest of the N-Quads lines describing an entity.
+        """
+        return sha256('\n'.join(lines))
+
+    def is_emitted(self, kind: str, entity_id: str, lines: list) -> bool:
+        """
+        Checks whether the very same entity triples were already written to an output file that still exists.
+        :param kind: the kind of entity, 'organization' or 'agent'
+        :param entity_id: the entity identifier (submitter_org_id or sdo_id)
+        :param lines: the N-Quads lines describing the entity
+        :return: True if the triples do not need to be emitted again
+        """
+        entity = self.entities[kind].get(entity_id)
+        if entity is None:
+            return False
+        file_path = entity['emitted'].get(self.fingerprint(lines))
+        return file_path is not None and self.exists(file_path)
+
+    def set_emitted(self, kind: str, entity_id: str, lines: list, file_path: str):
+        """
+        Records the output file where the entity triples have been written.
+        """
+        with self.lock:
+            self.get_uuid(kind, entity_id)
+            self.entities[kind][entity_id]['emitted'][self.fingerprint(lines)] = file_path
+
+    def emit(self, kind: str, entity_id: str, lines: list, file_path: str, f):
+        """
+        Writes the entity triples into the open output file, unless they were already emitted. The check and the
+        record are made under the registry lock, so that concurrent conversions emit an entity only once.
+        """
+        with self.lock:
+            if not self.is_emitted(kind, entity_id, lines):
+                for line in lines:
+                    print(line, file=f)
+                self.set_emitted(kind, entity_id, lines, file_path)
+
+    def save(self):
+        """
+        Persists the registry. Entities that were never emitted (e.g. spread-sheet header rows) are not kept.
+        """
+        if not self.persistent:
+            return
+        with self.lock:
+            entities = {kind: {key: value for key, value in self.entities[kind].items() if value['emitted']}
+                        for kind in self.entities}
+            os.makedirs(os.path.dirname(self.registry_path) or '.', exist_ok=True)
+            with open(self.registry_path, 'w', encoding='utf-8') as f:
+                json.dump(entities, f, indent=1)
+
+
+def get_registry() -> EntityRegistry:
+    """
+    Returns the entity registry of the current process, loading it from disk the first time.
+    """
+    global REGISTRY
+    with GLOBALS_LOCK:
+        if REGISTRY is None:
+            REGISTRY = EntityRegistry()
+    return REGISTRY
+
+
+class WorkbookCache:
+    """
+    On-disk cache of the parsed EU Survey/CAMSS workbooks. Entries are keyed by the SHA-256 of the workbook content,
+    so renamed or touched files are still served from the cache, and stored as pickled DataFrames (header metadata
+    and assessment rows). The least recently used entries are evicted when the cache exceeds its size cap.
+    """
+    cache_path: str  # cache folder (string type)
+    max_size: int  # maximum size of the cache in bytes (integer type)
+
+    def __init__(self, cache_path: str = None, max_size: int = None):
+        """
+        WorkbookCache class initializer.
+        :param cache_path: cache folder
+        :param max_size: maximum size of the cache in bytes
+        """
+        self.cache_path = cache_path if cache_path else CACHE_PATH
+        self.max_size = max_size if max_size is not None else CACHE_MAX_SIZE
+
+    @staticmethod
+    def get_key(file_path: str) -> str:
+        """
+        Digests the content of a workbook.
+        :param file_path: the workbook file path
+        :return: the SHA-256 of the file content
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def read(self, file_path: str) -> p.DataFrame:
+        """
+        Returns the parsed workbook, from the cache when its content has not changed since it was last parsed.
+        :param file_path: the workbook file path
+        :return: the workbook DataFrame, without header
+        """
+        entry = os.path.join(self.cache_path, self.get_key(file_path) + '.pkl')
+        if os.path.isfile(entry):
+            try:
+                with open(entry, 'rb') as f:
+                    df = pickle.load(f)
+                os.utime(entry)  # last use, for the LRU eviction
+                return df
+            except Exception:
+                # unreadable entry (e.g. written by another pandas version), parsed again below
+                os.remove(entry)
+        df = readers.read(file_path)
+        os.makedirs(self.cache_path, exist_ok=True)
+        with open(entry + '.tmp', 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(entry + '.tmp', entry)
+        self.evict()
+        return df
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in its size cap.
+        """
+        entries = [os.path.join(self.cache_path, name) for name in os.listdir(self.cache_path)
+                   if name.endswith('.pkl')]
+        entries = sorted(((os.stat(entry), entry) for entry in entries), key=lambda e: e[0].st_mtime)
+        size = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if size <= self.max_size:
+                break
+            os.remove(entry)
+            size -= stat.st_size
+
+    def clear(self):
+        """
+        Removes all the cached workbooks.
+        """
+        if os.path.isdir(self.cache_path):
+            for name in os.listdir(self.cache_path):
+                os.remove(os.path.join(self.cache_path, name))
+
+
+def get_workbook_cache() -> WorkbookCache:
+    """
+    Returns the workbook cache of the current process.
+    """
+    global WORKBOOK_CACHE
+    with GLOBALS_LOCK:
+        if WORKBOOK_CACHE is None:
+            WORKBOOK_CACHE = WorkbookCache()
+    return WORKBOOK_CACHE
+
+
+class ShardedOutput:
+    """
+    Consolidated output of one of the CAMSS Knowledge Graphs (assessments, criteria or specifications). Instead of one
+    small NQuads file per assessment, the quads of every assessment are appended to a few large shard files, and an
+    offset index ('index.tsv') allows to extract any per-assessment file on demand.
+    """
+    root: str  # graph output folder, e.g. 'arti/out/ass/' (string type)
+    path: str  # shards folder (string type)
+    shard_size: int  # size in bytes from which a new shard is started (integer type)
+    index: dict  # per-assessment file name -> (shard file name, offset, length)
+
+    def __init__(self, root: str, shard_size: int = None):
+        """
+        ShardedOutput class initializer. Loads the offset index of the existing shards.
+        :param root: graph output folder
+        :param shard_size: size in bytes from which a new shard is started
+        """
+        self.root = slash(root)
+        self.path = self.root + 'shards/'
+        self.shard_size = shard_size if shard_size else SHARD_SIZE
+        self.index = {}
+        self.stale = set()  # shards holding quads of removed or replaced per-assessment files, see compact()
+        self.lock = threading.Lock()  # appends from concurrent conversions (e.g. the watcher worker pool)
+        if os.path.isfile(self.path + 'index.tsv'):
+            with open(self.path + 'index.tsv', 'r', encoding='utf-8') as f:
+                for line in f:
+                    name, shard, offset, length = line.rstrip('\n').split('\t')
+                    if name in self.index:
+                        self.stale.add(self.index.pop(name)[0])
+                    if shard:
+                        self.index[name] = (shard, int(offset), int(length))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def get_shards(self) -> list:
+        """
+        Returns the shard file names, in writing order.
+        """
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if is_nquads(name))
+
+    def get_current_shard(self, compression: str = None) -> str:
+        """
+        Returns the shard file name the next quads are appended to.
+        :param compression: None, 'gzip' or 'xz'
+        """
+        shards = self.get_shards()
+        suffix = get_suffix(compression)
+        if shards and shards[-1].endswith('.nq' + suffix) and os.path.getsize(self.path + shards[-1]) < self.shard_size:
+            return shards[-1]
+        return f'shard-{len(shards):05d}.nq{suffix}'
+
+    def append(self, name: str, content: str, compression: str = None):
+        """
+        Appends the quads of a per-assessment file to the current shard and indexes them.
+        :param name: the per-assessment file name
+        :param content: the NQuads
+        :param compression: None, 'gzip' or 'xz'; the quads are then a compressed member of a compressed shard
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with self.lock:
+            shard = self.get_current_shard(compression)
+            data = compress(content.encode('utf-8'), get_compression(shard))
+            with open(self.path + shard, 'ab') as f:
+                offset = f.tell()
+                f.write(data)
+            with open(self.path + 'index.tsv', 'a', encoding='utf-8') as f:
+                print(name, shard, offset, len(data), sep='\t', file=f)
+            if name in self.index:
+                self.stale.add(self.index[name][0])
+            self.index[name] = (shard, offset, len(data))
+
+    def remove(self, name: str) -> bool:
+        """
+        Removes a per-assessment file from the consolidated output, e.g. before its assessment is converted again.
+        It is dropped from the offset index at once, and its quads from the shards by the next compact().
+        :param name: the per-assessment file name
+        :return: whether the file was in the consolidated output
+        """
+        with self.lock:
+            if name not in self.index:
+                return False
+            with open(self.path + 'index.tsv', 'a', encoding='utf-8') as f:
+                # tombstone
+                print(name, '', '', '', sep='\t', file=f)
+            self.stale.add(self.index.pop(name)[0])
+        return True
+
+    def compact(self):
+        """
+        Rewrites the shards holding quads of removed or replaced per-assessment files with the indexed quads only,
+        and the offset index with the current entries only.
+        """
+        with self.lock:
+            if not self.stale:
+                return
+            for shard in sorted(self.stale):
+                if not os.path.isfile(self.path + shard):
+                    continue
+                entries = sorted((offset, name) for name, (s, offset, _) in self.index.items() if s == shard)
+                with open(self.path + shard, 'rb') as infile, open(self.path + shard + '.tmp', 'wb') as outfile:
+                    for offset, name in entries:
+                        length = self.index[name][2]
+                        infile.seek(offset)
+                        self.index[name] = (shard, outfile.tell(), length)
+                        outfile.write(infile.read(length))
+                os.replace(self.path + shard + '.tmp', self.path + shard)
+            with open_atomic(self.path + 'index.tsv', 'wt') as f:
+                for name, (shard, offset, length) in self.index.items():
+                    print(name, shard, offset, length, sep='\t', file=f)
+            self.stale.clear()
+
+    @contextmanager
+    def open(self, name: str, compression: str = None):
+        """
+        Opens a per-assessment output in memory; its quads are appended to the current shard when closed.
+        :param name: the per-assessment file name
+        :param compression: None, 'gzip' or 'xz'
+        """
+        buffer = StringIO()
+        yield buffer
+        self.append(name, buffer.getvalue(), compression)
+
+    def extract(self, name: str, destination: str = None) -> str:
+        """
+        Extracts the quads of a per-assessment file from the shards.
+        :param name: the per-assessment file name
+        :param destination: the folder where to write the per-assessment file, if any
+        :return: the NQuads
+        """
+        shard, offset, length = self.index[name]
+        with open(self.path + shard, 'rb') as f:
+            f.seek(offset)
+            content = decompress(f.read(length), get_compression(shard)).decode('utf-8')
+        if destination:
+            os.makedirs(destination, exist_ok=True)
+            with open(slash(destination) + name, 'w', encoding='utf-8') as f:
+                f.write(content)
+        return content
+
+    def merge(self, file_path: str):
+        """
+        Writes the (cumulative) NQuads dataset file by concatenating the shards. Shards compressed with the same codec
+        as the merged file are copied as they are, since concatenated gzip/xz members are a valid stream.
+        :param file_path: the merged file path, compressed according to its extension
+        """
+        shards = self.get_shards()
+        if all(get_compression(shard) == get_compression(file_path) for shard in shards):
+            with open(file_path, 'wb') as outfile:
+                for shard in shards:
+                    with open(self.path + shard, 'rb') as infile:
+                        shutil.copyfileobj(infile, outfile, 1 << 20)
+        else:
+            with open_stream(file_path, 'wb') as outfile:
+                for shard in shards:
+                    with open_stream(self.path + shard, 'rb') as infile:
+                        shutil.copyfileobj(infile, outfile, 1 << 20)
+
+
+def get_sharded_output(root: str) -> ShardedOutput:
+    """
+    Returns the consolidated output of a graph output folder, loading its offset index the first time.
+    :param root: graph output folder, e.g. 'arti/out/ass/'
+    """
+    root = slash(root)
+    with GLOBALS_LOCK:
+        if root not in SHARDED_OUTPUTS:
+            SHARDED_OUTPUTS[root] = ShardedOutput(root)
+        return SHARDED_OUTPUTS[root]
+
+
+def output_exists(file_path: str) -> bool:
+    """
+    Checks whether a per-assessment NQuads file exists, either as a file or inside the consolidated shards.
+    :param file_path: the per-assessment file path, e.g. 'arti/out/ass/nq/<name>.nq'
+    """
+    if os.path.isfile(file_path):
+        return True
+    root = os.path.dirname(os.path.dirname(file_path))
+    return os.path.basename(file_path) in get_sharded_output(root)
+
+
+def extract_graph(root: str, name: str, destination: str = None) -> str:
+    """
+    Extracts a per-assessment NQuads file from the consolidated output.
+    :param root: graph output folder, e.g. 'arti/out/ass/'
+    :param name: the per-assessment file name
+    :param destination: the folder where to write the file, by default the 'nq' subfolder of the graph output folder
+    :return: the NQuads
+    """
+    return get_sharded_output(root).extract(name, destination if destination else slash(root) + 'nq/')
+
+
+def remove_outputs(extract: Extractor):
+    """
+    Removes the outputs of an assessment, i.e. its assessment and specification graphs (per-assessment files, or
+    entries of the consolidated shards) and its score table, so that it is converted again: Graph skips the
+    assessments whose outputs exist. The entities emitted into the removed graphs are emitted again (see
+    EntityRegistry.is_emitted).
+    :param extract: the Extractor of the assessment
+    """
+    for root, name in [('arti/out/ass/', f'{extract.scenario}-{extract.tool_version}-CAMSSAssessment_{extract.ass_title}.nq'),
+                       ('arti/out/specs/', f'{extract.ass_title}.nq')]:
+        for suffix in COMPRESSIONS.values():
+            if os.path.isfile(root + 'nq/' + name + suffix):
+                os.remove(root + 'nq/' + name + suffix)
+        get_sharded_output(root).remove(name)
+    punct = f'arti/punct/{extract.ass_dict["title"]["P1"]}-EIFScenario-scores.csv'
+    if os.path.isfile(punct):
+        os.remove(punct)
+
+
+class RunJournal:
+    """
+    Journal of a batch run: every (workbook, row) converted is appended to the journal, and the rows that failed are
+    appended to the quarantine report instead of stopping the batch. Workbooks are identified by their content, so a
+    resumed run skips the rows already converted, unless the workbook has changed since: the outputs of its
+    assessments are then replaced.
+    """
+    journal_path: str  # journal file path (string type)
+    quarantine_path: str  # quarantine report file path (string type)
+    done: set  # (workbook content hash, row) converted
+
+    def __init__(self, resume: bool = False, journal_path: str = None, quarantine_path: str = None):
+        """
+        RunJournal class initializer.
+        :param resume: whether to continue the last run; otherwise the journal and the quarantine report are reset
+        :param journal_path: journal file path
+        :param quarantine_path: quarantine report file path
+        """
+        self.journal_path = journal_path if journal_path else JOURNAL_PATH
+        self.quarantine_path = quarantine_path if quarantine_path else QUARANTINE_PATH
+        self.done = set()
+        self.keys = {}  # workbook path -> content hash
+        self.converted = {}  # workbook path -> content hashes of the workbook converted by the run being resumed
+        self.failed = 0
+        self.skipped = 0
+        self.lock = threading.Lock()  # shared by the concurrent conversions (e.g. the watcher worker pool)
+        os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+        os.makedirs(os.path.dirname(self.quarantine_path) or '.', exist_ok=True)
+        if resume and os.path.isfile(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    fields = line.rstrip('\n').split('\t')
+                    if len(fields) == 3 and fields[2].isdigit():  # a line cut by an interruption is ignored
+                        self.done.add((fields[0], int(fields[2])))
+                        self.converted.setdefault(fields[1], set()).add(fields[0])
+        else:
+            open(self.journal_path, 'w', encoding='utf-8').close()
+        if not resume or not os.path.isfile(self.quarantine_path):
+            with open(self.quarantine_path, 'w', encoding='utf-8') as f:
+                print('time', 'file', 'row', 'error', 'message', sep='\t', file=f)
+
+    def get_key(self, file_path: str) -> str:
+        if file_path not in self.keys:
+            self.keys[file_path] = WorkbookCache.get_key(file_path)
+        return self.keys[file_path]
+
+    def is_changed(self, file_path: str) -> bool:
+        """
+        Checks whether a workbook was edited since the run being resumed converted some of its rows.
+        """
+        return any(key != self.get_key(file_path) for key in self.converted.get(file_path, ()))
+
+    def is_done(self, file_path: str, row: int) -> bool:
+        """
+        Checks whether a row was converted by the run being resumed.
+        """
+        if (self.get_key(file_path), row) in self.done:
+            self.skipped += 1
+            return True
+        return False
+
+    def set_done(self, file_path: str, row: int):
+        """
+        Records a converted row; written at once, so that it survives an interruption of the run.
+        """
+        key = self.get_key(file_path)
+        with self.lock:
+            self.done.add((key, row))
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                print(key, file_path, row, sep='\t', file=f)
+
+    def quarantine(self, file_path: str, row: int, error: Exception):
+        """
+        Reports a row, or a whole workbook (row None), that could not be converted.
+        """
+        message = ' '.join(str(error).split()) or traceback.format_exception_only(type(error), error)[-1].strip()
+        with self.lock:
+            self.failed += 1
+            with open(self.quarantine_path, 'a', encoding='utf-8') as f:
+                print(datetime.datetime.now().isoformat(timespec='seconds'), file_path, '' if row is None else row,
+                      type(error).__name__, message, sep='\t', file=f)
+        log(f"Quarantined '{file_path}'" + ('' if row is None else f' row {row}') + f': {message}', level='w')
+
+    def print_report(self):
+        if self.skipped:
+            print(f'{self.skipped} assessments converted by the previous run were skipped.')
+        if self.failed:
+            print(f"{self.failed} assessments could not be converted, see '{self.quarantine_path}'.")
+
+
+class Sink:
+    """
+    Destination of the outputs of a conversion (see convert()): per-assessment NQuads ('ass/nq/', 'crit/nq/',
+    'specs/nq/') and score tables ('punct/'), by path relative to the sink. Each sink has its own entity registry, so
+    conversions to different sinks share no state and can run concurrently.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.registry = EntityRegistry(persistent=False, exists=self.exists)
+
+    def open(self, path: str):
+        """
+        Opens an output for writing, as a text stream context manager.
+        :param path: the output path relative to the sink, e.g. 'ass/nq/<name>.nq'
+        """
+        raise NotImplementedError
+
+    def exists(self, path: str) -> bool:
+        raise NotImplementedError
+
+
+class MemorySink(Sink):
+    """
+    Keeps the outputs in memory.
+    """
+    files: dict  # output path -> content
+
+    def __init__(self):
+        super().__init__()
+        self.files = {}
+
+    @contextmanager
+    def open(self, path: str):
+        buffer = StringIO()
+        yield buffer
+        with self.lock:
+            self.files[path] = buffer.getvalue()
+
+    def exists(self, path: str) -> bool:
+        return path in self.files
+
+    def get_nquads(self, graph: str = None) -> str:
+        """
+        Returns the NQuads of a graph ('ass', 'crit' or 'specs'), or of all of them.
+        """
+        return ''.join(content for path, content in self.files.items()
+                       if is_nquads(path) and (graph is None or path.startswith(graph + '/')))
+
+    def get_scores(self) -> dict:
+        """
+        Returns the score table of each assessment, by specification title.
+        """
+        return {path[len('punct/'):-len('-EIFScenario-scores.csv')]: content
+                for path, content in self.files.items() if path.startswith('punct/')}
+
+
+class DirectorySink(Sink):
+    """
+    Writes the outputs into a folder, laid out as 'arti/out/' and 'arti/punct/'.
+    """
+    root: str  # output folder (string type)
+
+    def __init__(self, root: str):
+        super().__init__()
+        self.root = slash(root)
+
+    def open(self, path: str):
+        os.makedirs(os.path.dirname(self.root + path), exist_ok=True)
+        return open_stream(self.root + path, 'wt')
+
+    def exists(self, path: str) -> bool:
+        return os.path.isfile(self.root + path)
+
+
+class ArchiveSink(Sink):
+    """
+    Writes the outputs into a zip archive; close() it once the conversions are done.
+    """
+    file_path: str  # zip archive path (string type)
+
+    def __init__(self, file_path):
+        """
+        :param file_path: the zip archive path, or a binary file-like object
+        """
+        super().__init__()
+        self.file_path = file_path
+        self.archive = zipfile.ZipFile(file_path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.names = set()
+
+    @contextmanager
+    def open(self, path: str):
+        buffer = StringIO()
+        yield buffer
+        with self.lock:
+            self.archive.writestr(path, buffer.getvalue())
+            self.names.add(path)
+
+    def exists(self, path: str) -> bool:
+        return path in self.names
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
 class Graph:
-    def __init__(self, extract: Extractor, ass_: AssessmentScenario = None):
+    def __init__(self, extract: Extractor, ass_: AssessmentScenario = None, consolidated: bool = False,
+                 compression: str = None, sink: Sink = None):
+        self.consolidated = consolidated  # append the quads to the consolidated shards instead of one file each
+        self.compression = compression  # None, 'gzip' or 'xz' compression of the NQuads outputs
+        self.sink = sink  # write the outputs to a Sink instead of 'arti/out/' and 'arti/punct/'
+        self.registry = get_registry() if sink is None else sink.registry
         self.sc = extract.scenario
         self.tool_version = extract.tool_version
         self.dictionary = extract.ass_dict
         self.ass_description = self.get_description()
         self.criteria = extract.criteria
+        self.profile = utils.get_profile(self.sc, self.tool_version)  # None: the scenario assessments are not scored
         if ass_ is None:
             self.spec_title = extract.ass_title
             print()
-            files = get_files('arti/out/ass/nq/')
-            if f'{self.sc}-{self.tool_version}-CAMSSAssessment_{self.spec_title}.nq' not in files:
+            if not self.exists('arti/out/ass/', f'{self.sc}-{self.tool_version}-CAMSSAssessment_{self.spec_title}.nq'):
                 print(self.spec_title)
             else:
                 print(self.spec_title, "\n", "Reminder: This CAMSS Assessments is already in your local folder!")
             #declare_namespace(ass_)
             self.create_ass_graph()
-            os.makedirs('arti/punct/', exist_ok=True)
-            calculator = utils.PunctuationCalculator(self.criteria, self.dictionary)
-            calculator.generate_punctuation_file()
+            if self.profile is not None:
+                calculator = utils.PunctuationCalculator(self.criteria, self.dictionary, self.profile)
+                if self.sink is not None:
+                    with self.sink.open(f'punct/{self.dictionary["title"]["P1"]}-EIFScenario-scores.csv') as f:
+                        calculator.generate_punctuation_file(f)
+                else:
+                    os.makedirs('arti/punct/', exist_ok=True)
+                    calculator.generate_punctuation_file()
             #get_punct(extract.criteria, self.dictionary)
             self.create_specs_graph()
         else:
@@ -582,18 +1244,53 @@ class Graph:
         else:
             return "This CAMSS scenario is dedicated to the assessment of formal technical specification, in general terms. According to the regulation on standardisation 1025/2012, a technical specification is a 'document that prescribes technical requirements to be fulfilled by a product, process, service or system'."
 
+    def exists(self, root: str, name: str) -> bool:
+        """
+        Checks whether a per-assessment graph was already written.
+        :param root: graph output folder, e.g. 'arti/out/ass/'
+        :param name: the per-assessment file name
+        """
+        if self.sink is not None:
+            return self.sink.exists(self.get_path(root, name))
+        if self.consolidated:
+            return name in get_sharded_output(root)
+        files = get_files(root + 'nq/')
+        return any(name + get_suffix(compression) in files for compression in COMPRESSIONS)
+
+    def open_graph(self, root: str, name: str):
+        """
+        Opens the output of a per-assessment graph: its own file, or a buffer appended to the consolidated shards.
+        :param root: graph output folder, e.g. 'arti/out/ass/'
+        :param name: the per-assessment file name
+        """
+        if self.sink is not None:
+            return self.sink.open(self.get_path(root, name))
+        if self.consolidated:
+            return get_sharded_output(root).open(name, self.compression)
+        return open_atomic(self.get_path(root, name), 'wt')
+
+    def get_path(self, root: str, name: str) -> str:
+        """
+        Returns the file path of a per-assessment graph, with the extension of its compression, if any.
+        :param root: graph output folder, e.g. 'arti/out/ass/'
+        :param name: the per-assessment file name
+        """
+        if self.sink is not None:
+            return PurePath(root).name + '/nq/' + name
+        return root + 'nq/' + name + ('' if self.consolidated else get_suffix(self.compression))
+
     # def get_predef_judgment(self):
 
     def create_ass_graph(self=None):
         origin_graph_org = f'<{CAMSSA}{self.dictionary["organization"]["submitter_org_id"]}>'
         origin_graph_contact_org = f'<{CAMSSA}{self.dictionary["organization"]["uuid"]}>'
         origin_graph_ass = f'<{CAMSSA}{self.dictionary["assessment_id"]}>'
-        origin_graph_global_sco = f'<{CAMSSA}{uuid.uuid4()}>'
+        origin_graph_global_sco = f'<{CAMSSA}{stable_id(self.dictionary["assessment_id"], "score")}>'
         target_graph_ass = f'<{CAMSSA}>'
-        files = get_files('arti/out/ass/nq/')
-        if f'{self.sc}-{self.tool_version}-CAMSSAssessment_{self.spec_title}.nq' not in files:
-            with open('arti/out/ass/nq/' + f'{self.sc}-{self.tool_version}-CAMSSAssessment_{self.spec_title}.nq', 'w',
-                      encoding='utf-8') as fa:
+        ass_name = f'{self.sc}-{self.tool_version}-CAMSSAssessment_{self.spec_title}.nq'
+        ass_file = self.get_path('arti/out/ass/', ass_name)
+        if not self.exists('arti/out/ass/', ass_name):
+            with self.open_graph('arti/out/ass/', ass_name) as fa:
                 # assessment
                 print(origin_graph_ass + f' <{RDF}type> <{CAV}Assessment> {target_graph_ass} .', file=fa)
                 print(origin_graph_ass + f' <{RDF}type> <{OWL}NamedIndividual> {target_graph_ass} .', file=fa)
@@ -626,9 +1323,10 @@ class Graph:
                       file=fa)
                 print(origin_graph_ass + f' <{CAV}performedBy> {origin_graph_org} {target_graph_ass} .',
                       file=fa)
-                print(origin_graph_ass + f' <{CAV}considers> {origin_graph_global_sco} {target_graph_ass} .',
-                      file=fa)
-                ass_distribution = uuid.uuid4()
+                if self.profile is not None:
+                    print(origin_graph_ass + f' <{CAV}considers> {origin_graph_global_sco} {target_graph_ass} .',
+                          file=fa)
+                ass_distribution = stable_id(self.dictionary["assessment_id"], 'distribution')
                 print(origin_graph_ass + f' <{DCAT}distribution> <{CAMSSA}{ass_distribution}> {target_graph_ass} .',
                       file=fa)
                 print(
@@ -641,29 +1339,22 @@ class Graph:
                     f'<{CAMSSA}{ass_distribution}> <{DCAT}accessURL> "https://joinup.ec.europa.eu/collection/common-assessment-method-standards-and-specifications-camss"^^<{XSD}anyURI> {target_graph_ass} .',
                     file=fa)
                 # organization
-                print(origin_graph_org + f' <{RDF}type> <{OWL}NamedIndividual> {target_graph_ass} .', file=fa)
-                print(origin_graph_org + f' <{RDF}type> <{ORG}Organization> {target_graph_ass} .', file=fa)
-                # print(
-                #     origin_graph_org + f' <{CAMSS}contactPoint> <{CAMSSA}{self.dictionary["organization"]["uuid"]}> {target_graph_ass} .',
-                #     file=fa)
-                print(
+                org_lines = [
+                    origin_graph_org + f' <{RDF}type> <{OWL}NamedIndividual> {target_graph_ass} .',
+                    origin_graph_org + f' <{RDF}type> <{ORG}Organization> {target_graph_ass} .',
                     origin_graph_org + f' <{SCHEMA}contactPoint> <{CAMSSA}{self.dictionary["organization"]["uuid"]}> {target_graph_ass} .',
-                    file=fa)
-                print(
                     origin_graph_org + f' <{SKOS}prefLabel> "{self.dictionary["organization"]["L1"]} {self.dictionary["organization"]["L2"]}"@en {target_graph_ass} .',
-                    file=fa)
-                print(
                     origin_graph_contact_org + f' <{RDF}type> <{SCHEMA}ContactPoint> {target_graph_ass} .',
-                    file=fa)
-                print(origin_graph_contact_org + f' <{RDF}type> <{OWL}NamedIndividual> {target_graph_ass} .', file=fa)
+                    origin_graph_contact_org + f' <{RDF}type> <{OWL}NamedIndividual> {target_graph_ass} .']
                 if self.dictionary["organization"]["L6"] == 'nan':
-                    print(
-                        origin_graph_contact_org + f' <{SCHEMA}email> "NaN"^^<{XSD}double> {target_graph_ass} .',
-                        file=fa)
+                    org_lines.append(
+                        origin_graph_contact_org + f' <{SCHEMA}email> "NaN"^^<{XSD}double> {target_graph_ass} .')
                 else:
-                    print(
-                        origin_graph_contact_org + f' <{SCHEMA}email> "{self.dictionary["organization"]["L6"]}" {target_graph_ass} .',
-                        file=fa)
+                    org_lines.append(
+                        origin_graph_contact_org + f' <{SCHEMA}email> "{self.dictionary["organization"]["L6"]}" {target_graph_ass} .')
+                # the organization and its contact point are only emitted once across assessments
+                self.registry.emit('organization', self.dictionary["organization"]["submitter_org_id"], org_lines,
+                                    ass_file, fa)
                 # statement
                 for criterion in self.dictionary['results_in'].keys():
                     origin_graph_sta = f'<{CAMSSA}{self.dictionary["results_in"][criterion]["statement_id"]}>'
@@ -675,18 +1366,20 @@ class Graph:
                     print(
                         origin_graph_sta + f' <{CAV}refersTo> <{CAMSSA}{self.dictionary["results_in"][criterion]["score_id"]}> {target_graph_ass} .',
                         file=fa)
-                # global score
-                # Create an instance of the class
-                calculator = utils.PunctuationCalculator(self.criteria, self.dictionary)
-                # Run the criteria analysis
-                ass_punct = calculator.run_criteria()
-                # Get the total_overall_score and overall_strength values
-                total_overall_score = ass_punct[5][0]  # The total_overall_score is the second to last element
-                overall_strength = ass_punct[5][1]  # The overall_strength is the last element
-                print(origin_graph_global_sco + f' <{RDF}type> <{CAV}Score> {target_graph_ass} .', file=fa)
-                print(origin_graph_global_sco + f' <{RDF}type> <{OWL}NamedIndividual> {target_graph_ass} .', file=fa)
-                print(origin_graph_global_sco + f' <{CAV}value> "{round((int(total_overall_score.split("/")[0])/int(total_overall_score.split("/")[1]))*100,2)}%AssessmentScoreAverage"^^<{XSD}string> {target_graph_ass} .', file=fa)
-                print(origin_graph_global_sco + f' <{CAV}value> "{round(overall_strength, 2)}%StrengthOfAssessmentScoreAverage"^^<{XSD}string> {target_graph_ass} .', file=fa)
+                # global score, for the scenarios with a scoring profile
+                if self.profile is not None:
+                    # Create an instance of the class
+                    calculator = utils.PunctuationCalculator(self.criteria, self.dictionary, self.profile)
+                    # Run the criteria analysis
+                    ass_punct = calculator.run_criteria()
+                    # Get the total_overall_score and overall_strength values
+                    overall = len(self.profile.categories)  # the overall score follows the category scores
+                    total_overall_score = ass_punct[overall][0]
+                    overall_strength = ass_punct[overall][1]
+                    print(origin_graph_global_sco + f' <{RDF}type> <{CAV}Score> {target_graph_ass} .', file=fa)
+                    print(origin_graph_global_sco + f' <{RDF}type> <{OWL}NamedIndividual> {target_graph_ass} .', file=fa)
+                    print(origin_graph_global_sco + f' <{CAV}value> "{round((int(total_overall_score.split("/")[0])/int(total_overall_score.split("/")[1]))*100,2)}%AssessmentScoreAverage"^^<{XSD}string> {target_graph_ass} .', file=fa)
+                    print(origin_graph_global_sco + f' <{CAV}value> "{round(overall_strength, 2)}%StrengthOfAssessmentScoreAverage"^^<{XSD}string> {target_graph_ass} .', file=fa)
                 # score
                 for criterion in self.dictionary['results_in'].keys():
                     origin_graph_sco = f'<{CAMSSA}{self.dictionary["results_in"][criterion]["score_id"]}>'
@@ -702,7 +1395,12 @@ class Graph:
     def create_criteria_graph(self=None):
         origin_graph_cri = f'<{SC}{self.dictionary["contextualised_by"]["scenario_id"]}>'
         target_graph_cri = f'<{SC}>'
-        with open('arti/out/crit/nq/' + f'{self.sc}-{self.tool_version}-criteria.nq', 'w') as fc:
+        crit_name = f'{self.sc}-{self.tool_version}-criteria.nq'
+        if (self.consolidated or self.sink is not None) and self.exists('arti/out/crit/', crit_name):
+            # the criteria of a scenario version are only appended once to the consolidated shards, and only written
+            # once to a sink (an archive cannot replace its members)
+            return
+        with self.open_graph('arti/out/crit/', crit_name) as fc:
             # criteria
             print(origin_graph_cri + f' <{RDF}type> <{CAV}Scenario> {target_graph_cri} .', file=fc)
             print(origin_graph_cri + f' <{RDF}type> <{OWL}NamedIndividual> {target_graph_cri} .', file=fc)
@@ -737,27 +1435,20 @@ class Graph:
 
     def create_specs_graph(self=None):
         target_graph_spe = f'<{CSSV_RSC}>'
-        files = get_files('arti/out/specs/nq/')
-        if f'{self.spec_title}.nq' not in files:
-            with open('arti/out/specs/nq/' + f'{self.spec_title}.nq', 'w') as fs:
+        specs_file = self.get_path('arti/out/specs/', f'{self.spec_title}.nq')
+        if not self.exists('arti/out/specs/', f'{self.spec_title}.nq'):
+            with self.open_graph('arti/out/specs/', f'{self.spec_title}.nq') as fs:
                 # specification ContactPoint
-                print(
+                contact_lines = [
                     f'<{CSSV_RSC}{self.dictionary["agent"]["uuid"]}> <{RDF}type> <{SCHEMA}ContactPoint> {target_graph_spe} .',
-                    file=fs)
-                print(
                     f'<{CSSV_RSC}{self.dictionary["agent"]["uuid"]}> <{RDF}type> <{OWL}NamedIndividual> {target_graph_spe} .',
-                    file=fs)
-                print(
-                    f'<{CSSV_RSC}{self.dictionary["agent"]["uuid"]}> <{SCHEMA}contactPoint> <{CSSV_RSC}{self.dictionary["agent"]["sdo_id"]}> {target_graph_spe} .',
-                    file=fs)
+                    f'<{CSSV_RSC}{self.dictionary["agent"]["uuid"]}> <{SCHEMA}contactPoint> <{CSSV_RSC}{self.dictionary["agent"]["sdo_id"]}> {target_graph_spe} .']
                 if self.dictionary["agent"]["P4"] != self.dictionary["agent"]["P4"]:
-                    print(
-                        f'<{CSSV_RSC}{self.dictionary["agent"]["uuid"]}> <{SCHEMA}email> "NaN"^^<{XSD}double> {target_graph_spe} .',
-                        file=fs)
+                    contact_lines.append(
+                        f'<{CSSV_RSC}{self.dictionary["agent"]["uuid"]}> <{SCHEMA}email> "NaN"^^<{XSD}double> {target_graph_spe} .')
                 else:
-                    print(
-                        f'<{CSSV_RSC}{self.dictionary["agent"]["uuid"]}> <{SCHEMA}email> "{self.dictionary["agent"]["P4"]}" {target_graph_spe} .',
-                        file=fs)
+                    contact_lines.append(
+                        f'<{CSSV_RSC}{self.dictionary["agent"]["uuid"]}> <{SCHEMA}email> "{self.dictionary["agent"]["P4"]}" {target_graph_spe} .')
                 # specification Standard
                 print(
                     f'<{CSSV_RSC}{self.dictionary["title"]["spec_id"]}> <{RDF}type> <{CSSV}{self.dictionary["spec_type"]}> {target_graph_spe} .',
@@ -795,15 +1486,12 @@ class Graph:
                     f'<{CSSV_RSC}{self.dictionary["title"]["distribution_id"]}> <{DCAT}downloadURL> "{self.dictionary["title"]["P2"]}"^^<{XSD}anyURI> {target_graph_spe} .',
                     file=fs)
                 # specification Organization
-                print(
+                contact_lines += [
                     f'<{CSSV_RSC}{self.dictionary["agent"]["sdo_id"]}> <{RDF}type> <{OWL}NamedIndividual> {target_graph_spe} .',
-                    file=fs)
-                print(
                     f'<{CSSV_RSC}{self.dictionary["agent"]["sdo_id"]}> <{RDF}type> <{ORG}Organization> {target_graph_spe} .',
-                    file=fs)
-                print(
-                    f'<{CSSV_RSC}{self.dictionary["agent"]["sdo_id"]}> <{SKOS}prefLabel> "{self.dictionary["agent"]["P3"]}"^^<{XSD}string> {target_graph_spe} .',
-                    file=fs)
+                    f'<{CSSV_RSC}{self.dictionary["agent"]["sdo_id"]}> <{SKOS}prefLabel> "{self.dictionary["agent"]["P3"]}"^^<{XSD}string> {target_graph_spe} .']
+                # the SDO and its contact point are only emitted once across specifications
+                self.registry.emit('agent', self.dictionary["agent"]["sdo_id"], contact_lines, specs_file, fs)
 
 
 CAMSS = "http://data.europa.eu/2sa#"
@@ -826,6 +1514,24 @@ XSD = "http://www.w3.org/2001/XMLSchema#"
 DCT = "http://purl.org/dc/terms/"
 SKOS = "http://www.w3.org/2004/02/skos/core#"
 
+RECORDS = True  # whether Extractor keeps the assessment data as compact records (see records.py)
+ENTITIES_PATH = 'arti/entities.json'  # persisted registry of organisations, SDOs and contact points
+REGISTRY = None  # EntityRegistry of the current process
+CACHE_PATH = 'arti/cache/'  # parsed workbooks cache
+CACHE_MAX_SIZE = 512 * 1024 * 1024  # parsed workbooks cache size cap, in bytes
+WORKBOOK_CACHE = None  # WorkbookCache of the current process
+SHARD_SIZE = 256 * 1024 * 1024  # size in bytes from which a new consolidated output shard is started
+SHARDED_OUTPUTS = {}  # ShardedOutput per graph output folder
+GLOBALS_LOCK = threading.Lock()  # first use of the registry, workbook cache and shard indexes by concurrent threads
+COMPRESSIONS = {None: '', 'gzip': '.gz', 'xz': '.xz'}  # supported NQuads compressions and their file extension
+JOURNAL_PATH = 'arti/journal.tsv'  # (workbook, row) converted by the last run
+QUARANTINE_PATH = 'arti/quarantine.tsv'  # assessments that could not be converted by the last run
+GRADIENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gradients_EIFv6.csv')  # EIF gradients
+GRADIENTS = None  # EIF gradients, read once per process
+JUSTIFICATIONS = {}  # escaped predefined SDO justifications
+TITLE_COLUMNS = {'EIF': 11, 'MSP': 9, 'TS': 11}  # column of the specification title, per scenario
+ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, CAMSSA)  # namespace of the content-derived node identifiers
+
 
 # Namespaces
 def declare_namespace(g):
@@ -856,39 +1562,48 @@ def declare_namespace(g):
     return g
 
 
-def __merge_graphs__():
+def __merge_graphs__(consolidated: bool = False, compression: str = None):
+    """
+    Merges the per-assessment NQuads files, or the consolidated shards, into the (cumulative) NQuads dataset files.
+    Compressed inputs are read transparently.
+    :param consolidated: whether the graphs were written in consolidated mode
+    :param compression: None, 'gzip' or 'xz' compression of the merged files
+    """
+    suffix = get_suffix(compression)
     for files_root in ['arti/out/ass/nq/', 'arti/out/crit/nq/', 'arti/out/specs/nq/']:
+        if consolidated:
+            graph = files_root.split('/')[2]
+            get_sharded_output(files_root[:-3]).merge(f'{files_root[:-3]}{graph}-graph.nq{suffix}')
+            if files_root == 'arti/out/specs/nq/':
+                log(f'Merging CAMSS Assessments Graphs, CAMSS Scenarios and Critera Graphs and Specifications Graphs into (cumulative) NQuads dataset files...',
+                    nl=False)
+                print()
+                print("Done!")
+            continue
         # Creating a list of filenames
-        filenames = get_files(files_root)
+        filenames = [file for file in get_files(files_root) if is_nquads(file)]
         # Open file3 in write mode
         if files_root == 'arti/out/ass/nq/':
-            with open('arti/out/ass/ass-graph.nq', 'w', encoding='utf-8') as outfile:
+            with open_stream(f'arti/out/ass/ass-graph.nq{suffix}', 'wb') as outfile:
                 # Iterate through list
                 for names in filenames:
-                    # Open each file in read mode
-                    with open(files_root + names, 'r') as infile:
-                        # read the data from file1 and
-                        # file2 and write it in file3
-                        for line in infile:
-                            outfile.write(line)
+                    # Open each file in read mode, decompressing it if needed
+                    with open_stream(files_root + names, 'rb') as infile:
+                        shutil.copyfileobj(infile, outfile, 1 << 20)
         if files_root == 'arti/out/crit/nq/':
-            with open('arti/out/crit/crit-graph.nq', 'w', encoding='utf-8') as outfile:
+            with open_stream(f'arti/out/crit/crit-graph.nq{suffix}', 'wb') as outfile:
                 # Iterate through list
                 for names in filenames:
-                    # Open each file in read mode
-                    with open(files_root + names, 'r') as infile:
-                        # read the data from file1 and
-                        # file2 and write it in file3
-                        outfile.write(infile.read())
+                    # Open each file in read mode, decompressing it if needed
+                    with open_stream(files_root + names, 'rb') as infile:
+                        shutil.copyfileobj(infile, outfile, 1 << 20)
         if files_root == 'arti/out/specs/nq/':
-            with open('arti/out/specs/specs-graph.nq', 'w', encoding='utf-8') as outfile:
+            with open_stream(f'arti/out/specs/specs-graph.nq{suffix}', 'wb') as outfile:
                 # Iterate through list
                 for names in filenames:
-                    # Open each file in read mode
-                    with open(files_root + names, 'r') as infile:
-                        # read the data from file1 and
-                        # file2 and write it in file3
-                        outfile.write(infile.read())
+                    # Open each file in read mode, decompressing it if needed
+                    with open_stream(files_root + names, 'rb') as infile:
+                        shutil.copyfileobj(infile, outfile, 1 << 20)
             log(f'Merging CAMSS Assessments Graphs, CAMSS Scenarios and Critera Graphs and Specifications Graphs into (cumulative) NQuads dataset files...',
                 nl=False)
             print()
@@ -897,7 +1612,16 @@ def __merge_graphs__():
             print("Done!")
 
 
-def convert_graph_to(target: str):
+def convert_graph_to(target: str, compression: str = None):
+    """
+    Converts the per-assessment NQuads files, compressed or not, into Turtle or JSON-LD, and composes the merged
+    Turtle or JSON-LD files from the per-assessment conversions. Per-assessment files are only converted again when
+    their NQuads file changed, and the merged dataset is never parsed again, unless there are no per-assessment files
+    (consolidated mode) or the per-assessment conversions cannot be composed.
+    :param target: 'Turtle' or 'JSON-LD'
+    :param compression: None, 'gzip' or 'xz' compression of the converted files
+    """
+    suffix = get_suffix(compression)
     if target.lower() == 'turtle':
         target = 'ttl'
         extension = 'ttl'
@@ -905,41 +1629,154 @@ def convert_graph_to(target: str):
         target = 'json-ld'
         extension = 'jsonld'
     # try:
+    converted = {}  # per-assessment conversions, per graph output folder
     for files_root in ['arti/out/ass/nq/', 'arti/out/crit/nq/', 'arti/out/specs/nq/']:
         # Creating a list of filenames
-        filenames = get_files(files_root, exclude=['ttl', 'json-ld'])
+        filenames = [file for file in get_files(files_root, exclude=['ttl', 'json-ld']) if is_nquads(file)]
+        new_file = files_root.split("/")
+        new_file.remove('nq')
+        new_file.remove('')
+        new_dir = '/'.join(new_file) + f'/{target}/'
+        converted[files_root[:-3]] = []
         for file in filenames:
-            head = file[:-3]
-            new_file = files_root.split("/")
-            new_file.remove('nq')
-            new_file.remove('')
-            new_dir = '/'.join(new_file) + f'/{target}/'
+            head = strip_nquads(file)
+            destination = new_dir + head + '.' + extension + suffix
+            converted[files_root[:-3]].append(destination)
+            if os.path.isfile(destination) and os.path.getmtime(destination) >= os.path.getmtime(files_root + file):
+                # unchanged since its last conversion
+                continue
             os.makedirs(new_dir, exist_ok=True)
-            g = rdflib.ConjunctiveGraph()
-            data = open(files_root + file, 'rb')
-            g.parse(data, format='nquads')
+            g = nquads.parse(files_root + file)
             if target == 'ttl':
                 g = declare_namespace(g)
-            g.serialize(format=target, destination=new_dir + head + '.' + extension)
+            serialize(g, target, destination)
     for files_root in ['arti/out/ass/', 'arti/out/crit/', 'arti/out/specs/']:
+        graph = files_root.split('/')[2]
+        merged = f'{files_root}{graph}-graph.{extension}{suffix}'
+        if converted[files_root]:
+            composed = compose_turtle(converted[files_root], merged) if target == 'ttl' \
+                else compose_jsonld(converted[files_root], merged)
+            if composed:
+                print(f'{graph}-graph.{extension}{suffix}')
+                continue
         # Creating a list of filenames
-        filenames = get_files(files_root, exclude=['nq', 'ttl', 'json-ld', 'ass-graph.jsonld', 'specs-graph.jsonld',
+        filenames = get_files(files_root, exclude=['nq', 'ttl', 'json-ld', 'shards', 'ass-graph.jsonld', 'specs-graph.jsonld',
                                                    'crit-graph.jsonld', 'ass-graph.ttl', 'specs-graph.ttl',
                                                    'crit-graph.ttl', 'CAMSS_Ontology_Assessments_graph.ttl'])
+        filenames = [file for file in filenames if is_nquads(file)]
         for file in filenames:
-            head = file[:-3]
-            g = rdflib.ConjunctiveGraph()
-            data = open(files_root + file, 'rb')
-            g.parse(data, format='nquads')
+            head = strip_nquads(file)
+            g = nquads.parse(files_root + file)
             print(file)
             if target == 'ttl':
                 g = declare_namespace(g)
-            g.serialize(format=target, destination=files_root + head + '.' + extension)
+            serialize(g, target, files_root + head + '.' + extension + suffix)
     print('Transformation Done!')
     # except:
     #    pass
 
 
+def compose_turtle(files: list, destination: str) -> bool:
+    """
+    Composes a Turtle file from several Turtle files: one shared prefix header and the concatenated bodies.
+    :param files: the Turtle files (compressed or not)
+    :param destination: the composed file path
+    :return: False, and nothing is written, when two files bind the same prefix to different namespaces
+    """
+    pattern = re.compile(r'^@prefix\s+([^\s:]*):\s*<([^>]*)>\s*\.\s*$')
+    prefixes = {}
+    for file in files:
+        with open_stream(file, 'rt') as f:
+            for line in f:
+                prefix = pattern.match(line)
+                if prefix is None:
+                    if line.strip():
+                        break
+                    continue
+                if prefixes.setdefault(prefix.group(1), prefix.group(2)) != prefix.group(2):
+                    return False
+    with open_stream(destination, 'wt') as outfile:
+        for prefix, namespace in prefixes.items():
+            print(f'@prefix {prefix}: <{namespace}> .', file=outfile)
+        for file in files:
+            with open_stream(file, 'rt') as f:
+                header = True
+                for line in f:
+                    if header and (not line.strip() or pattern.match(line)):
+                        continue
+                    if header:
+                        outfile.write('\n')
+                        header = False
+                    outfile.write(line)
+    return True
+
+
+def compose_jsonld(files: list, destination: str) -> bool:
+    """
+    Composes a JSON-LD file from several JSON-LD files, joining the '@graph' arrays of each named graph (and the
+    default graph nodes) as a stream: only one source file is loaded at a time.
+    :param files: the JSON-LD files (compressed or not)
+    :param destination: the composed file path
+    :return: True
+    """
+    def get_graphs(document) -> list:
+        # [(graph name or None for the default graph, nodes)]
+        items = document if isinstance(document, list) else document.get('@graph', [document]) \
+            if '@id' not in document else [document]
+        graphs = []
+        for item in items:
+            if '@graph' in item:
+                graphs.append((item.get('@id'), item['@graph']))
+            else:
+                graphs.append((None, [item]))
+        return graphs
+
+    names = []  # graph names, in order of appearance
+    for file in files:
+        with open_stream(file, 'rt') as f:
+            for name, _ in get_graphs(json.load(f)):
+                if name not in names:
+                    names.append(name)
+    with open_stream(destination, 'wt') as outfile:
+        outfile.write('[')
+        first_item = True
+        for name in names:
+            if name is not None:
+                outfile.write(('' if first_item else ',') + '\n  {"@id": ' + json.dumps(name) + ', "@graph": [')
+                first_item = False
+            first_node = True
+            for file in files:
+                with open_stream(file, 'rt') as f:
+                    for graph, nodes in get_graphs(json.load(f)):
+                        if graph != name:
+                            continue
+                        for node in nodes:
+                            if name is None:
+                                outfile.write(('' if first_item else ',') + '\n  ' + json.dumps(node))
+                                first_item = False
+                            else:
+                                outfile.write(('' if first_node else ',') + '\n    ' + json.dumps(node))
+                                first_node = False
+            if name is not None:
+                outfile.write('\n  ]}')
+        outfile.write('\n]\n')
+    return True
+
+
+def serialize(g: rdflib.ConjunctiveGraph, target: str, destination: str):
+    """
+    Serializes a graph into a file, compressed according to its extension.
+    :param g: the graph
+    :param target: the rdflib serialization format
+    :param destination: the file path
+    """
+    if get_compression(destination) is None:
+        g.serialize(format=target, destination=destination)
+    else:
+        with open_stream(destination, 'wb') as f:
+            g.serialize(f, format=target, encoding='utf-8')
+
+
 def log(message: str, nl: bool = True, level: str = 'i'):
     """
     ################
@@ -987,6 +1824,113 @@ def get_files(root_dir: str, exclude: [] = None) -> (str, str, str):
     return files
 
 
+def get_suffix(compression: str = None) -> str:
+    """
+    Returns the file extension of a compression.
+    :param compression: None, 'gzip' or 'xz'
+    """
+    if compression not in COMPRESSIONS:
+        raise Exception(f"Unknown compression '{compression}', use one of {list(COMPRESSIONS)}.")
+    return COMPRESSIONS[compression]
+
+
+def get_compression(file_path: str) -> str:
+    """
+    Returns the compression of a file according to its extension.
+    :param file_path: the file path
+    :return: None, 'gzip' or 'xz'
+    """
+    for compression, suffix in COMPRESSIONS.items():
+        if suffix and file_path.endswith(suffix):
+            return compression
+    return None
+
+
+def is_nquads(file_name: str) -> bool:
+    """
+    Checks whether a file is a (compressed or not) NQuads file.
+    """
+    return any(file_name.endswith('.nq' + suffix) for suffix in COMPRESSIONS.values())
+
+
+def strip_nquads(file_name: str) -> str:
+    """
+    Removes the NQuads extension, and the compression one, from a file name.
+    """
+    return file_name[:-len('.nq' + get_suffix(get_compression(file_name)))]
+
+
+def open_stream(file_path: str, mode: str = 'rb'):
+    """
+    Opens a file, transparently (de)compressing it with gzip or xz according to its extension.
+    :param file_path: the file path
+    :param mode: 'rb', 'wb', 'ab', 'rt', 'wt' or 'at'
+    :return: file object
+    """
+    compression = get_compression(file_path)
+    encoding = 'utf-8' if 't' in mode else None
+    if compression == 'gzip':
+        return gzip.open(file_path, mode, encoding=encoding)
+    elif compression == 'xz':
+        return lzma.open(file_path, mode, encoding=encoding)
+    return open(file_path, mode.replace('t', ''), encoding=encoding)
+
+
+@contextmanager
+def open_atomic(file_path: str, mode: str = 'wt'):
+    """
+    Opens a file for writing (see open_stream) under a temporary hidden name, which is renamed to the file path once
+    closed without errors: a failing conversion leaves no partial output behind.
+    :param file_path: the file path
+    :param mode: 'wb' or 'wt'
+    """
+    # unique, the same file (e.g. the criteria of a scenario) may be written by several threads at once
+    tmp = os.path.join(os.path.dirname(file_path), f'.~{uuid.uuid4().hex[:8]}.' + os.path.basename(file_path))
+    try:
+        with open_stream(tmp, mode) as f:
+            yield f
+        os.replace(tmp, file_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def compress(data: bytes, compression: str = None) -> bytes:
+    if compression == 'gzip':
+        return gzip.compress(data)
+    elif compression == 'xz':
+        return lzma.compress(data)
+    return data
+
+
+def decompress(data: bytes, compression: str = None) -> bytes:
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    elif compression == 'xz':
+        return lzma.decompress(data)
+    return data
+
+
+def stable_id(*parts) -> str:
+    """
+    Content-derived node identifier (a name-based uuid, version 5), so that the same assessment, statement, score or
+    distribution gets the same node in every run and the published datasets can be compared (see delta.py).
+    :param parts: what identifies the node, e.g. the assessment identifier and the criterion
+    :return: the identifier, as a uuid text
+    """
+    return str(uuid.uuid5(ID_NAMESPACE, '/'.join(str(part) for part in parts)))
+
+
+def get_justification(text: str) -> str:
+    """
+    Escapes a predefined SDO justification as a judgement literal (repr() and escaped double quotes). Memoised, since
+    the same few justifications are used by every assessment of a W3C, IETF or ETSI specification.
+    """
+    if text not in JUSTIFICATIONS:
+        JUSTIFICATIONS[text] = re.sub(r'"', '\\"', repr(text))
+    return JUSTIFICATIONS[text]
+
+
 def sha256(text: str) -> str:
     """
     ################
@@ -1002,36 +1946,110 @@ def sha256(text: str) -> str:
         raise Exception("No sha256-based id generated because no thruty provided.")
 
 
-def __extract_file_assessments__(root_dir: str, ass_files: list):
+def __extract_file_assessments__(root_dir: str, ass_files: list, consolidated: bool = False,
+                                 compression: str = None, index: sqlindex.AssessmentIndex = None,
+                                 journal: RunJournal = None, overwrite: bool = False) -> list:
     """
     ################
     Origin: camss.py
     ################
+    :param consolidated: whether to append the graphs to the consolidated shards instead of one file per assessment
+    :param compression: None, 'gzip' or 'xz' compression of the NQuads outputs
+    :param index: the SQLite index to populate, if any
+    :param journal: the journal of the run, if any: the rows it records as converted are skipped, and the failing
+    rows are quarantined instead of stopping the batch
+    :param overwrite: whether to convert again the assessments already converted, e.g. those of an edited workbook:
+    their outputs are removed first (see remove_outputs)
+    :return: the (scenario, tool version, specification title) of every assessment converted
     """
+    converted = []
+    progress = utils.get_progress()
+    overwritten = set()  # the outputs of two rows of the same specification are only removed before the first one
     for file in ass_files:
         # log(f"Extracting assessments from '{file}'...", nl=False)
-        ass_file = Extractor(root_dir + '/' + file)
+        try:
+            # the workbook is hashed and loaded once, its DataFrame shared by the extractors of all its rows
+            ass_file = Extractor(root_dir + '/' + file)
+        except Exception as e:
+            if journal is None:
+                raise
+            journal.quarantine(root_dir + '/' + file, None, e)
+            continue
+        # the outputs of an edited workbook are replaced
+        replace = overwrite or (journal is not None and journal.is_changed(root_dir + '/' + file))
         len_ass = len(ass_file.ass_df)
         row = 1
         print(ass_file.scenario + ' Scenario ' + 'v' + ass_file.tool_version)
+        progress.emit(utils.FILE_STARTED, root_dir + '/' + file, total=max(len_ass - 4, 0))
         while row + 4 <= len_ass:
             # log(f"Extracting data from the {row}º Assessment in '{file}' into a dictionary...",
             # nl=False)
-            extractor = Extractor(root_dir + '/' + file, row + 3)
+            ass_row = row + 3
             row += 1
-            # print(f"*{extractor.ass_dict['title']['P1']}* specification retrieved!")
-            os.makedirs('arti/out', exist_ok=True)
-            os.makedirs('arti/out/ass', exist_ok=True)
-            os.makedirs('arti/out/ass/nq', exist_ok=True)
-            os.makedirs('arti/out/crit', exist_ok=True)
-            os.makedirs('arti/out/crit/nq', exist_ok=True)
-            os.makedirs('arti/out/specs', exist_ok=True)
-            os.makedirs('arti/out/specs/nq', exist_ok=True)
-            Graph(extract=extractor)
-            Graph(extract=extractor, ass_=ass_file)
-            # print(f"*{extractor.ass_dict['title']['P1']}* graph created!")
-            # print()
-            # progress_bar(file, row, extractor.ass_dict['title']['P1'])
+            if journal is not None and journal.is_done(root_dir + '/' + file, ass_row):
+                progress.emit(utils.ROW_SKIPPED, root_dir + '/' + file, ass_row)
+                continue
+            try:
+                extractor = Extractor(root_dir + '/' + file, ass_row, ass_df=ass_file.ass_df)
+                progress.emit(utils.ROW_EXTRACTED, root_dir + '/' + file, ass_row, extractor.ass_title)
+                if replace and (extractor.scenario, extractor.tool_version, extractor.ass_title) not in overwritten:
+                    remove_outputs(extractor)
+                    overwritten.add((extractor.scenario, extractor.tool_version, extractor.ass_title))
+                # print(f"*{extractor.ass_dict['title']['P1']}* specification retrieved!")
+                os.makedirs('arti/out', exist_ok=True)
+                os.makedirs('arti/out/ass', exist_ok=True)
+                os.makedirs('arti/out/ass/nq', exist_ok=True)
+                os.makedirs('arti/out/crit', exist_ok=True)
+                os.makedirs('arti/out/crit/nq', exist_ok=True)
+                os.makedirs('arti/out/specs', exist_ok=True)
+                os.makedirs('arti/out/specs/nq', exist_ok=True)
+                Graph(extract=extractor, consolidated=consolidated, compression=compression)
+                Graph(extract=extractor, ass_=ass_file, consolidated=consolidated, compression=compression)
+                if index is not None:
+                    index.add(extractor, root_dir + '/' + file)
+            except Exception as e:
+                if journal is None:
+                    raise
+                journal.quarantine(root_dir + '/' + file, ass_row, e)
+                progress.emit(utils.ROW_FAILED, root_dir + '/' + file, ass_row)
+                continue
+            if journal is not None:
+                journal.set_done(root_dir + '/' + file, ass_row)
+            converted.append((extractor.scenario, extractor.tool_version, extractor.ass_title))
+            progress.emit(utils.GRAPH_WRITTEN, root_dir + '/' + file, ass_row, extractor.ass_title)
+        progress.emit(utils.FILE_DONE, root_dir + '/' + file)
+        if replace:
+            for root in ['arti/out/ass/', 'arti/out/specs/']:
+                get_sharded_output(root).compact()
+        if index is not None:
+            index.commit()
+        if journal is not None:
+            # the entities emitted so far must survive an interruption of the run
+            get_registry().save()
+    return converted
+
+def convert(workbook, sink: Sink = None, backend: str = None) -> Sink:
+    """
+    Converts the assessments of an EU Survey/CAMSS output into a sink, with no dependence on the current working
+    directory nor on the 'arti/' folders: nothing is read or written outside the workbook and the sink. Re-entrant,
+    conversions can run concurrently from several threads, each one with its own sink.
+    :param workbook: the workbook file path, or its content (bytes)
+    :param sink: MemorySink (default), DirectorySink or ArchiveSink
+    :param backend: name of a reader backend to force (see readers.py)
+    :return: the sink, e.g. sink.get_nquads() and sink.get_scores() for a MemorySink
+    """
+    sink = MemorySink() if sink is None else sink
+    if isinstance(workbook, (bytes, bytearray)):
+        ass_df = readers.read_bytes(bytes(workbook), backend)
+    else:
+        ass_df = readers.read(str(workbook), backend)
+    ass_file = Extractor(None, ass_df=ass_df, registry=sink.registry)
+    for row in range(4, len(ass_df)):
+        extractor = Extractor(None, row, ass_df=ass_df, registry=sink.registry)
+        Graph(extract=extractor, sink=sink)
+        Graph(extract=extractor, ass_=ass_file, sink=sink)
+    return sink
+
 
 def slash(path) -> str:
     """
@@ -1064,27 +2082,62 @@ def __help__():
         """)
 
 
-def run(param: str = 'arti/in/'):
+def run(param: str = 'arti/in/', consolidated: bool = False, compression: str = None, index: bool = False,
+        resume: bool = False, progress: list = None, store: bool = False):
     """
     Use it to run the code from a python console, Jupyter Lab or Notebook, etc.
+    :param consolidated: whether to append the graphs to a few consolidated shard files ('arti/out/*/shards/')
+    instead of writing one file per assessment; use extract_graph() to get a per-assessment file on demand
+    :param compression: None, 'gzip' or 'xz' compression of the NQuads outputs
+    :param index: whether to populate the SQLite index of the assessments ('arti/index.sqlite', see index.py)
+    :param resume: whether to continue the last run, skipping the assessments it converted ('arti/journal.tsv');
+    the assessments that cannot be converted are reported in 'arti/quarantine.tsv'
+    :param progress: the listeners of the progress events of the run (see utils.ProgressListener), a progress bar
+    per workbook by default (utils.TqdmListener), [] for none
+    :param store: whether to load the new assessments into the local RDF store ('arti/store/', see store.py), to
+    query them with store.query()
     """
-    __pipeline__(param)
+    __pipeline__(param, consolidated, compression, index, resume,
+                 [utils.TqdmListener()] if progress is None else progress, store)
     return
 
 
-def __pipeline__(input_folder: str):
+def __pipeline__(input_folder: str, consolidated: bool = False, compression: str = None, index: bool = False,
+                 resume: bool = False, listeners: list = None, store: bool = False):
     """
     ################
     Origin: camss.py
     ################
     """
-    for path in glob.iglob(input_folder + '/**', recursive=False):
-        if not input_folder or len(input_folder) == 0:
-            __help__()
-            return
-        __extract_file_assessments__(path, get_files(path))
+    if not input_folder or len(input_folder) == 0:
+        __help__()
+        return
+    # pre-flight scan and projected runtime, the largest workbooks first
+    workbooks = preflight.scan(input_folder)
+    preflight.print_report(workbooks)
+    print()
+    ass_index = sqlindex.AssessmentIndex() if index else None
+    journal = RunJournal(resume)
+    get_registry()
+
+    listeners = [utils.get_progress().add(listener) for listener in listeners or []]
+    try:
+        for workbook in workbooks:
+            start = time.perf_counter()
+            converted = __extract_file_assessments__(workbook.root_dir, [workbook.file], consolidated, compression,
+                                                     ass_index, journal)
+            preflight.record_timing(workbook.scenario, len(converted), time.perf_counter() - start)
+    finally:
+        for listener in listeners:
+            utils.get_progress().remove(listener)
+    get_registry().save()
+    if ass_index is not None:
+        ass_index.close()
+    if store:
+        localstore.load()
     print()
-    log("All graphs successfully created!")
+    journal.print_report()
+    log("All graphs successfully created!" if not journal.failed else "Graphs created, some assessments quarantined.")
     print()
 
 
@@ -1094,9 +2147,18 @@ def main(argv: []):
     Origin: camss.py
     ################
     Runs the code from console command line
-    :param argv: the input folder
+    :param argv: the input folder, and optionally --resume, --log-progress to log the progress instead of the
+    progress bars, --store to load the assessments into the local RDF store (see store.py), or --scores to only
+    compute the score table (see scores.py)
     """
-    __pipeline__(argv[0])
+    if '--scores' in argv[1:]:
+        scores.run(argv[0])
+        return
+    if '--log-progress' in argv[1:]:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    __pipeline__(argv[0], resume='--resume' in argv[1:],
+                 listeners=[utils.LogListener() if '--log-progress' in argv[1:] else utils.TqdmListener()],
+                 store='--store' in argv[1:])
     return
 
 
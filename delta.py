@@ -0,0 +1,121 @@
+import os
+import sys
+import shutil
+
+import camssXLSX2RDF as camss
+import nquads
+
+
+def canonicalize(file_paths: list) -> list:
+    """
+    Canonical form of an N-Quads dataset: its quads, one per line with single spaces between the terms, sorted and
+    without duplicates. Two datasets with the same quads have the same canonical form, whatever the order and the
+    number of files they were written to.
+    :param file_paths: the (compressed or not) N-Quads files of the dataset
+    :return: sorted list of the canonical lines
+    :raise ValueError: on a line outside the restricted shape handled by the tokenizer
+    """
+    lines = set()
+    for file_path in file_paths:
+        for line in nquads.iter_lines(file_path):
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            quad = nquads.parse_line(line)
+            if quad is None:
+                raise ValueError(f'Unexpected N-Quads line in {file_path}: {line}')
+            lines.add(' '.join(term for term in quad if term) + ' .')
+    return sorted(lines)
+
+
+def iter_snapshot(file_path: str):
+    """
+    Iterates over the canonical lines of a published snapshot, none if the dataset was never published.
+    """
+    if os.path.isfile(file_path):
+        yield from nquads.iter_lines(file_path)
+
+
+def diff(previous, current):
+    """
+    Compares two canonical (sorted) datasets in a single merge pass.
+    :param previous: iterable of the canonical lines of the published snapshot
+    :param current: iterable of the canonical lines of the new dataset
+    :return: generator of ('+', line) for the additions and ('-', line) for the removals
+    """
+    previous = iter(previous)
+    current = iter(current)
+    old = next(previous, None)
+    new = next(current, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old < new):
+            yield '-', old
+            old = next(previous, None)
+        elif old is None or new < old:
+            yield '+', new
+            new = next(current, None)
+        else:
+            old = next(previous, None)
+            new = next(current, None)
+
+
+def changeset(graphs: list = None, compression: str = None) -> dict:
+    """
+    Writes the changes of the merged datasets since their last published snapshot, as two N-Quads files per graph,
+    'arti/out/delta/<graph>-additions.nq' and 'arti/out/delta/<graph>-removals.nq', to be loaded into the triple store
+    instead of the whole datasets. The node identifiers are content-derived (see camssXLSX2RDF.stable_id), so only the
+    quads of the new, changed and deleted assessments are part of the changeset. The new snapshots are staged next
+    to the changeset; call publish() once the changeset is uploaded.
+    :param graphs: the graphs compared, 'ass', 'crit' and 'specs' by default
+    :param compression: None, 'gzip' or 'xz' compression of the changeset files
+    :return: (additions, removals, quads) per graph
+    """
+    suffix = camss.get_suffix(compression)
+    os.makedirs(DELTA_PATH, exist_ok=True)
+    report = {}
+    for graph in graphs if graphs else GRAPHS:
+        current = canonicalize(nquads.get_graph_files(f'arti/out/{graph}/'))
+        added = removed = 0
+        with camss.open_atomic(f'{DELTA_PATH}{graph}-additions.nq{suffix}', 'wt') as additions, \
+                camss.open_atomic(f'{DELTA_PATH}{graph}-removals.nq{suffix}', 'wt') as removals:
+            for change, line in diff(iter_snapshot(f'{SNAPSHOT_PATH}{graph}-graph.nq'), current):
+                if change == '+':
+                    print(line, file=additions)
+                    added += 1
+                else:
+                    print(line, file=removals)
+                    removed += 1
+        with camss.open_atomic(f'{DELTA_PATH}{graph}-snapshot.nq', 'wt') as f:
+            for line in current:
+                print(line, file=f)
+        report[graph] = (added, removed, len(current))
+    return report
+
+
+def publish(graphs: list = None):
+    """
+    Makes the snapshots staged by changeset() the published ones, after the changeset was uploaded to the triple
+    store.
+    :param graphs: the graphs published, 'ass', 'crit' and 'specs' by default
+    """
+    os.makedirs(SNAPSHOT_PATH, exist_ok=True)
+    for graph in graphs if graphs else GRAPHS:
+        staged = f'{DELTA_PATH}{graph}-snapshot.nq'
+        if os.path.isfile(staged):
+            shutil.move(staged, f'{SNAPSHOT_PATH}{graph}-graph.nq')
+
+
+def print_report(report: dict):
+    print('graph', 'additions', 'removals', 'quads', sep='\t')
+    for graph, (added, removed, quads) in report.items():
+        print(graph, added, removed, quads, sep='\t')
+
+
+GRAPHS = ['ass', 'crit', 'specs']  # graph output folders compared, 'arti/out/<graph>/'
+DELTA_PATH = 'arti/out/delta/'  # changesets, and the snapshots staged until they are published
+SNAPSHOT_PATH = 'arti/published/'  # canonical form of the datasets last uploaded to the triple store
+
+
+if __name__ == '__main__':
+    print_report(changeset())
+    if '--publish' in sys.argv[1:]:
+        publish()
@@ -0,0 +1,278 @@
+import os
+import re
+import sys
+import glob
+import time
+import shutil
+import hashlib
+import tempfile
+from collections import defaultdict
+from contextlib import redirect_stdout
+
+import camssXLSX2RDF as camss
+import delta
+import memory
+import nquads
+import scores
+
+
+def is_relabelled(term: str, relabel: str) -> bool:
+    """
+    Whether a term is an identifier relabelled by canonicalize(): the blank nodes, and the IRIs ending with a random
+    (version 4) UUID, or with any UUID for relabel='uuid'.
+    """
+    if term is None or relabel is None:
+        return False
+    if term.startswith('_:'):
+        return True
+    return term.startswith('<') and bool((ANY_UUID if relabel == 'uuid' else RANDOM_UUID).search(term))
+
+
+def canonicalize(lines, relabel: str = 'random') -> (list, int):
+    """
+    Canonical form of N-Quads lines, comparable whatever the order of the quads and the random identifiers: every
+    relabelled identifier (see is_relabelled) is named after its structural position, i.e. the quads it is part of,
+    the other identifiers masked, refined with the names of its neighbours until the partition is stable (colour
+    refinement). The quads are then sorted, without duplicates.
+    :param lines: iterable of N-Quads lines
+    :param relabel: 'random' (blank nodes and random UUIDs), 'uuid' (blank nodes and all UUIDs) or None
+    :return: sorted list of the canonical lines, and the number of relabelled identifiers sharing their name with
+    another one (structurally indistinguishable, their quads compared as a whole)
+    :raise ValueError: on a line outside the restricted shape handled by the tokenizer
+    """
+    quads = []
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        quad = nquads.parse_line(line)
+        if quad is None:
+            raise ValueError(f'Unexpected N-Quads line: {line}')
+        quads.append(quad)
+    ids = {term for quad in quads for term in quad if is_relabelled(term, relabel)}
+    names = {term: '' for term in ids}
+    classes = 1
+    for _ in range(REFINEMENTS):
+        signatures = defaultdict(list)
+        for quad in quads:
+            masked = tuple(names.get(term, term) if term else '' for term in quad)
+            for position, term in enumerate(quad):
+                if term in names:
+                    signatures[term].append((position,) + masked)
+        names = {term: hashlib.sha1(repr(sorted(signatures[term])).encode('utf-8')).hexdigest()[:20]
+                 for term in ids}
+        if len(set(names.values())) == classes:
+            break
+        classes = len(set(names.values()))
+    tied = len(ids) - len(set(names.values()))
+    canonical = set()
+    for quad in quads:
+        canonical.add(' '.join(f'_:c{names[term]}' if term in names else term for term in quad if term) + ' .')
+    return sorted(canonical), tied
+
+
+def read_outputs() -> (list, dict):
+    """
+    Reads the outputs of a conversion in the working folder: the N-Quads lines of the 'ass', 'crit' and 'specs'
+    graphs (per-assessment files, shards, compressed or not), and the score tables by specification title.
+    """
+    lines = []
+    for graph in delta.GRAPHS:
+        if os.path.isdir(f'arti/out/{graph}/'):
+            for file_path in nquads.get_graph_files(f'arti/out/{graph}/'):
+                lines.extend(nquads.iter_lines(file_path))
+    tables = {}
+    for file_path in glob.glob('arti/punct/*' + SCORES_SUFFIX):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            tables[os.path.basename(file_path)[:-len(SCORES_SUFFIX)]] = f.read().splitlines()
+    return lines, tables
+
+
+def reference(file_path: str) -> (list, dict):
+    """
+    Reference engine: the pipeline of run(), one output file per assessment.
+    """
+    camss.__extract_file_assessments__(os.path.dirname(file_path), [os.path.basename(file_path)])
+    return read_outputs()
+
+
+def consolidated(file_path: str) -> (list, dict):
+    camss.__extract_file_assessments__(os.path.dirname(file_path), [os.path.basename(file_path)], consolidated=True)
+    return read_outputs()
+
+
+def compressed(file_path: str) -> (list, dict):
+    camss.__extract_file_assessments__(os.path.dirname(file_path), [os.path.basename(file_path)], compression='xz')
+    return read_outputs()
+
+
+def in_memory(file_path: str, backend: str = None) -> (list, dict):
+    """
+    convert() into a MemorySink, the workbook read by a reader backend (see readers.py).
+    """
+    sink = camss.convert(file_path, backend=backend)
+    return sink.get_nquads().splitlines(), {title: table.splitlines() for title, table in sink.get_scores().items()}
+
+
+def scores_only(file_path: str) -> (list, dict):
+    """
+    Scores-only mode (see scores.py), no N-Quads.
+    """
+    tables = {}
+    for _, title, lines in scores.ScoreExtractor(file_path).iter_tables():
+        # the header of the score files, written once by scores.run() for all the tables
+        tables[title] = ['\tscore\tstrength\tcompliance level'] + lines
+    return None, tables
+
+
+def run_engine(engine, file_path: str, folder: str) -> (list, dict, float):
+    """
+    Runs an engine on a workbook in its own working folder, the process-wide caches and registry reset.
+    :return: the N-Quads lines (None if the engine writes none), the score tables, and the conversion time
+    """
+    cwd = os.getcwd()
+    os.makedirs(folder)
+    os.chdir(folder)
+    # the process-wide caches, registry and shard indexes belong to the working folder
+    camss.REGISTRY = None
+    camss.WORKBOOK_CACHE = None
+    camss.SHARDED_OUTPUTS.clear()
+    try:
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            # the progress printed by the pipeline
+            lines, tables = engine(file_path)
+        return lines, tables, time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        camss.REGISTRY = None
+        camss.WORKBOOK_CACHE = None
+        camss.SHARDED_OUTPUTS.clear()
+
+
+def get_workbooks(input_folder: str = 'arti/in/') -> list:
+    """
+    Returns the absolute paths of the EU Survey/CAMSS outputs of the input folder, one sub-folder per scenario.
+    """
+    workbooks = []
+    for path in glob.iglob(input_folder + '/**', recursive=False):
+        if os.path.isdir(path):
+            workbooks.extend(os.path.abspath(path + '/' + file) for file in camss.get_files(path)
+                             if os.path.isfile(path + '/' + file) and not file.startswith('.~lock'))
+    return sorted(workbooks)
+
+
+def compare(candidates: list = None, workbooks: list = None, synthetic: list = None, relabel: str = 'random',
+            keep: bool = False) -> list:
+    """
+    Use it before adopting a faster engine: runs the reference pipeline and the candidate engines on the same real
+    and synthetic workbooks, and compares their canonical N-Quads (see canonicalize) and score tables exactly.
+    :param candidates: engine names (see ENGINES) or (name, function) pairs, a function taking the absolute workbook
+    path and returning its N-Quads lines (None for none) and score tables by specification title (list of lines);
+    all the engines of ENGINES by default
+    :param workbooks: workbook file paths, those of 'arti/in/' by default
+    :param synthetic: numbers of assessments of the synthetic EIF workbooks also compared, SYNTHETIC_SIZES by default
+    :param relabel: identifiers relabelled before the comparison, see canonicalize
+    :param keep: whether to keep the working folders
+    :return: the comparison of every candidate on every workbook
+    """
+    candidates = candidates if candidates else [name for name in ENGINES if name != 'reference']
+    candidates = [(candidate, ENGINES[candidate]) if isinstance(candidate, str) else candidate
+                  for candidate in candidates]
+    workbooks = [os.path.abspath(workbook) for workbook in workbooks] if workbooks is not None else get_workbooks()
+    root = tempfile.mkdtemp(prefix='camss-equivalence-')
+    results = []
+    try:
+        for size in synthetic if synthetic is not None else SYNTHETIC_SIZES:
+            os.makedirs(f'{root}/in/EIF600', exist_ok=True)
+            file_path = f'{root}/in/EIF600/Content_Export_CAMSSAssessmentEIFScenario6_synthetic{size}.xlsx'
+            memory.write_synthetic(file_path, size)
+            workbooks.append(file_path)
+        for i, workbook in enumerate(workbooks):
+            lines, tables, elapsed = run_engine(reference, workbook, f'{root}/{i}/reference')
+            expected, _ = canonicalize(lines, relabel)
+            for name, engine in candidates:
+                result = {'workbook': workbook, 'engine': name, 'seconds': None, 'reference_seconds': elapsed}
+                try:
+                    candidate_lines, candidate_tables, result['seconds'] = run_engine(engine, workbook,
+                                                                                      f'{root}/{i}/{name}')
+                except Exception as e:
+                    result.update(error=f'{type(e).__name__}: {e}', equivalent=False)
+                    results.append(result)
+                    continue
+                result.update(compare_outputs(expected, tables, candidate_lines, candidate_tables, relabel))
+                results.append(result)
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+    print_report(results)
+    return results
+
+
+def compare_outputs(expected: list, tables: dict, lines: list, candidate_tables: dict, relabel: str = 'random',
+                    examples: int = 5) -> dict:
+    """
+    Compares the outputs of a candidate engine with the canonical outputs of the reference.
+    :param expected: canonical N-Quads lines of the reference
+    :param tables: score tables of the reference
+    :param lines: N-Quads lines of the candidate, None if it writes none (not compared)
+    :param candidate_tables: score tables of the candidate
+    :param examples: number of differing lines reported
+    """
+    result = {'quads': len(expected), 'missing': None, 'extra': None, 'tied': 0, 'examples': []}
+    if lines is not None:
+        current, result['tied'] = canonicalize(lines, relabel)
+        missing = []
+        extra = []
+        for change, line in delta.diff(expected, current):
+            (missing if change == '-' else extra).append(line)
+        result.update(missing=len(missing), extra=len(extra))
+        result['examples'] = [f'- {line}' for line in missing[:examples]] + [f'+ {line}' for line in extra[:examples]]
+    different = sorted(title for title in set(tables) | set(candidate_tables)
+                       if tables.get(title) != candidate_tables.get(title))
+    result.update(tables=len(tables), different_tables=len(different))
+    result['examples'] += [f'score table: {title}' for title in different[:examples]]
+    result['equivalent'] = not result['missing'] and not result['extra'] and not different
+    return result
+
+
+def print_report(results: list):
+    print('workbook', 'engine', 'seconds', 'reference seconds', 'speed-up', 'quads', 'missing', 'extra',
+          'score tables', 'different', 'result', sep='\t')
+    for result in results:
+        seconds = result['seconds']
+        speedup = round(result['reference_seconds'] / seconds, 2) if seconds else ''
+        print(os.path.basename(result['workbook']), result['engine'],
+              round(seconds, 3) if seconds is not None else '', round(result['reference_seconds'], 3), speedup,
+              result.get('quads', ''), '' if result.get('missing') is None else result['missing'],
+              '' if result.get('extra') is None else result['extra'], result.get('tables', ''),
+              result.get('different_tables', ''), 'OK' if result['equivalent'] else 'DIFFERENT', sep='\t')
+    for result in results:
+        if result['equivalent']:
+            continue
+        print()
+        print(f"{os.path.basename(result['workbook'])}, {result['engine']}:")
+        if result.get('error'):
+            print('', result['error'], sep='\t')
+        for example in result.get('examples', []):
+            print('', example, sep='\t')
+        if result.get('tied'):
+            print('', f"{result['tied']} structurally indistinguishable identifiers", sep='\t')
+
+
+ENGINES = {'reference': reference,
+           'consolidated': consolidated,
+           'compressed': compressed,
+           'sink': in_memory,
+           'openpyxl': lambda file_path: in_memory(file_path, 'openpyxl'),
+           'scores': scores_only}  # engines compared, see compare()
+SYNTHETIC_SIZES = [20]  # number of assessments of the synthetic workbooks compared
+REFINEMENTS = 8  # maximum colour refinement rounds of canonicalize()
+SCORES_SUFFIX = '-EIFScenario-scores.csv'  # score file name, after the specification title
+RANDOM_UUID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}>$')
+ANY_UUID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}>$')
+
+
+if __name__ == '__main__':
+    comparison = compare(sys.argv[1:] or None)
+    if not all(result['equivalent'] for result in comparison):
+        sys.exit(1)
@@ -0,0 +1,230 @@
+import os
+import re
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    assessment_id TEXT PRIMARY KEY,
+    title TEXT,
+    spec_id TEXT,
+    scenario TEXT,
+    tool_version TEXT,
+    org_id TEXT,
+    sdo_id TEXT,
+    assessment_date TEXT,
+    source_file TEXT,
+    source_row INTEGER
+);
+CREATE TABLE IF NOT EXISTS specifications (
+    spec_id TEXT PRIMARY KEY,
+    title TEXT,
+    description TEXT,
+    version TEXT,
+    download_url TEXT,
+    spec_type TEXT,
+    sdo_id TEXT
+);
+CREATE TABLE IF NOT EXISTS organisations (
+    org_id TEXT PRIMARY KEY,
+    kind TEXT,
+    name TEXT,
+    email TEXT
+);
+CREATE TABLE IF NOT EXISTS criteria (
+    criterion_sha_id TEXT PRIMARY KEY,
+    criterion TEXT,
+    scenario TEXT,
+    tool_version TEXT,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS scores (
+    assessment_id TEXT,
+    criterion TEXT,
+    criterion_sha_id TEXT,
+    score TEXT,
+    answer TEXT,
+    statement_id TEXT,
+    judgement TEXT,
+    PRIMARY KEY (assessment_id, criterion)
+);
+CREATE INDEX IF NOT EXISTS assessments_spec ON assessments (spec_id);
+CREATE INDEX IF NOT EXISTS assessments_title ON assessments (title);
+CREATE INDEX IF NOT EXISTS assessments_sdo ON assessments (sdo_id);
+CREATE INDEX IF NOT EXISTS scores_criterion ON scores (criterion);
+CREATE INDEX IF NOT EXISTS scores_criterion_sha ON scores (criterion_sha_id);
+"""
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS judgements USING fts5 (
+    assessment_id UNINDEXED,
+    criterion UNINDEXED,
+    judgement
+);
+CREATE TABLE IF NOT EXISTS judgements_map (
+    judgement_rowid INTEGER PRIMARY KEY,
+    assessment_id TEXT
+);
+CREATE INDEX IF NOT EXISTS judgements_map_assessment ON judgements_map (assessment_id);
+"""
+
+
+def get_text(value) -> str:
+    """
+    Returns the text of a spread-sheet value, None for the empty cells.
+    """
+    if value is None or value != value or str(value) == 'nan':
+        return None
+    return str(value)
+
+
+def get_judgement(statement: str) -> str:
+    """
+    Returns the plain text of a judgement, as escaped for the NQuads by Extractor._get_criteria (repr() and quotes).
+    """
+    text = get_text(statement)
+    if text and len(text) > 1 and text[0] == text[-1] and text[0] in '\'"':
+        text = re.sub(r'\\(.)', lambda e: {'n': '\n', 't': '\t'}.get(e.group(1), e.group(1)), text[1:-1])
+    return text
+
+
+class AssessmentIndex:
+    """
+    Local SQLite index of the converted CAMSS Assessments: assessments, specifications, organisations, criteria and
+    scores, plus a full-text (FTS5) index of the judgements. Populated while converting, it answers questions such as
+    "all the assessments of a specification" or "judgements mentioning FRAND" without parsing any RDF.
+    """
+    db_path: str  # SQLite database file path (string type)
+    fts: bool  # whether SQLite supports FTS5 (boolean type)
+
+    def __init__(self, db_path: str = None):
+        """
+        AssessmentIndex class initializer. Creates the database, if needed.
+        :param db_path: SQLite database file path
+        """
+        self.db_path = db_path if db_path else INDEX_PATH
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # shared by the pipeline worker threads, see the lock
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        try:
+            self.connection.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5, search() falls back to LIKE
+            self.fts = False
+        if self.fts and self.connection.execute('SELECT NOT EXISTS (SELECT 1 FROM judgements_map) '
+                                                'AND EXISTS (SELECT 1 FROM judgements)').fetchone()[0]:
+            # index populated before the map of the judgements rows
+            self.connection.execute('INSERT INTO judgements_map SELECT rowid, assessment_id FROM judgements')
+            self.connection.commit()
+
+    def add(self, extractor, source_file: str = None):
+        """
+        Indexes (or re-indexes) the assessment currently extracted.
+        :param extractor: the camssXLSX2RDF.Extractor of the assessment
+        :param source_file: the spread-sheet the assessment comes from
+        """
+        with self.lock:
+            self._add(extractor, source_file)
+
+    def _add(self, extractor, source_file: str = None):
+        d = extractor.ass_dict
+        c = self.connection
+        assessment_id = d['assessment_id']
+        c.execute('INSERT OR REPLACE INTO assessments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                  (assessment_id, get_text(d['title']['P1']), d['title']['spec_id'], extractor.scenario,
+                   extractor.tool_version, d['organization']['submitter_org_id'], d['agent']['sdo_id'],
+                   d['assessment_date'], source_file, extractor.row))
+        c.execute('INSERT OR REPLACE INTO specifications VALUES (?, ?, ?, ?, ?, ?, ?)',
+                  (d['title']['spec_id'], get_text(d['title']['P1']), get_text(d['title'].get('description')),
+                   get_text(d['title'].get('version')), get_text(d['title']['P2']), d.get('spec_type'),
+                   d['agent']['sdo_id']))
+        c.execute('INSERT OR REPLACE INTO organisations VALUES (?, ?, ?, ?)',
+                  (d['organization']['submitter_org_id'], 'organization', get_text(d['organization']['L2']),
+                   get_text(d['organization']['L6'])))
+        c.execute('INSERT OR REPLACE INTO organisations VALUES (?, ?, ?, ?)',
+                  (d['agent']['sdo_id'], 'agent', get_text(d['agent']['P3']), get_text(d['agent']['P4'])))
+        c.execute('DELETE FROM scores WHERE assessment_id = ?', (assessment_id,))
+        if self.fts:
+            # the judgements of a re-indexed assessment are deleted by rowid: assessment_id is not indexed by FTS5
+            rowids = c.execute('SELECT judgement_rowid FROM judgements_map WHERE assessment_id = ?',
+                               (assessment_id,)).fetchall()
+            if rowids:
+                c.executemany('DELETE FROM judgements WHERE rowid = ?', [tuple(rowid) for rowid in rowids])
+                c.execute('DELETE FROM judgements_map WHERE assessment_id = ?', (assessment_id,))
+        scores = []
+        for criterion, result in d['results_in'].items():
+            c.execute('INSERT OR REPLACE INTO criteria VALUES (?, ?, ?, ?, ?)',
+                      (result['criterion_sha_id'], criterion, extractor.scenario, extractor.tool_version,
+                       result['criterion_description']))
+            scores.append((assessment_id, criterion, result['criterion_sha_id'], result['score'],
+                           get_text(extractor.criteria[criterion][-1]), result['statement_id'],
+                           get_judgement(result['statement'])))
+        c.executemany('INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)', scores)
+        if self.fts:
+            for score in scores:
+                if score[6]:
+                    rowid = c.execute('INSERT INTO judgements VALUES (?, ?, ?)',
+                                      (score[0], score[1], score[6])).lastrowid
+                    c.execute('INSERT INTO judgements_map VALUES (?, ?)', (rowid, assessment_id))
+
+    def commit(self):
+        with self.lock:
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+
+    def query(self, sql: str, params: tuple = ()) -> list:
+        """
+        Runs any SQL query against the index.
+        :return: list of rows (sqlite3.Row, accessible by column name)
+        """
+        return self.connection.execute(sql, params).fetchall()
+
+    def assessments_of(self, spec: str) -> list:
+        """
+        All the assessments of a specification.
+        :param spec: the specification title or identifier
+        """
+        return self.query('SELECT * FROM assessments WHERE title = ? OR spec_id = ? ORDER BY assessment_date',
+                          (spec, spec))
+
+    def scores_for(self, criterion: str) -> list:
+        """
+        All the scores given to a criterion.
+        :param criterion: the criterion name (e.g. 'A12') or its identifier
+        """
+        return self.query('SELECT a.title, a.scenario, a.tool_version, s.* FROM scores s '
+                          'JOIN assessments a USING (assessment_id) WHERE s.criterion = ? OR s.criterion_sha_id = ?',
+                          (criterion, criterion))
+
+    def search(self, text: str, limit: int = 100) -> list:
+        """
+        Full-text search over the judgements.
+        :param text: FTS5 query, e.g. 'FRAND' or '"public review" AND fees'
+        :param limit: maximum number of judgements returned
+        """
+        if self.fts:
+            return self.query('SELECT a.title, j.criterion, snippet(judgements, 2, \'[\', \']\', \'...\', 12) '
+                              'AS snippet, j.judgement FROM judgements j JOIN assessments a USING (assessment_id) '
+                              'WHERE judgements MATCH ? ORDER BY rank LIMIT ?', (text, limit))
+        return self.query('SELECT a.title, s.criterion, s.judgement AS snippet, s.judgement FROM scores s '
+                          'JOIN assessments a USING (assessment_id) WHERE s.judgement LIKE ? LIMIT ?',
+                          (f'%{text}%', limit))
+
+
+def open_index(db_path: str = None) -> AssessmentIndex:
+    """
+    Use it to query the index from a python console, Jupyter Lab or Notebook, etc.
+    :param db_path: SQLite database file path, 'arti/index.sqlite' by default
+    """
+    return AssessmentIndex(db_path)
+
+
+INDEX_PATH = 'arti/index.sqlite'  # SQLite index of the converted assessments
@@ -0,0 +1,251 @@
+import gc
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import threading
+import tracemalloc
+from contextlib import redirect_stdout
+
+import camssXLSX2RDF as camss
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+
+class MemoryBudgetError(Exception):
+    """
+    Raised by benchmark() when a pipeline stage exceeds its memory budget.
+    """
+
+
+class RssSampler:
+    """
+    Samples the resident set size (RSS) of the process in a background thread, so that the peak RSS of each pipeline
+    stage can be measured (the peak reported by the operating system, ru_maxrss, only grows during the process life).
+    Reads /proc/self/statm on Linux; elsewhere, falls back to ru_maxrss, or to nothing at all on Windows.
+    """
+    interval: float  # seconds between two samples (float type)
+    peak: int  # peak RSS since the last reset, in bytes (integer type)
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample, name='camss-rss-sampler', daemon=True)
+
+    @staticmethod
+    def get_rss() -> int:
+        """
+        Returns the current RSS of the process in bytes, None if it cannot be measured.
+        """
+        try:
+            with open('/proc/self/statm', 'r') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            pass
+        if resource is not None:
+            # kilobytes on Linux, bytes on macOS
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+        return None
+
+    def sample(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, self.get_rss() or 0)
+            self.stopped.wait(self.interval)
+
+    def reset(self):
+        self.peak = self.get_rss() or 0
+
+    def start(self):
+        self.reset()
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+def write_synthetic(file_path: str, assessments: int = 100, seed: int = 0):
+    """
+    Writes a synthetic EU Survey/CAMSS output of the EIF scenario (v6), with random answers to the 45 criteria, for
+    benchmarking.
+    :param file_path: the .xlsx file path
+    :param assessments: number of assessments (rows)
+    :param seed: random seed, the same workbook is written for the same seed
+    """
+    import openpyxl
+    rnd = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    columns = 20 + 2 * CRITERIA
+    ws.append(['Alias', 'CAMSSAssessmentEIFScenario6'] + [''] * (columns - 2))
+    ws.append(['Export date', '2023-11-20 10:00:00'] + [''] * (columns - 2))
+    ws.append(['Contributions'] + [''] * (columns - 1))
+    header = [f'Field {i}' for i in range(20)]
+    for i in range(1, CRITERIA + 1):
+        header += [f'A{i} - Description of the criterion number {i}', f'Justification {i}']
+    ws.append(header)
+    sdos = ['W3C (https://www.w3.org)', 'IETF (https://www.ietf.org/)', 'ETSI (https://www.etsi.org/)',
+            'Other (SDO/SSO)']
+    for row in range(assessments):
+        cells = [str(row), f'Submitter {row % 50}', f'Unit {row % 7}', 'Officer', f'Organisation {row % 20}',
+                 '+32 2 000 00 00', '', f'submitter{row % 50}@example.eu', '', '', 'Standard',
+                 f'Specification {row}', f'1.{row % 10}', f'Description of the specification {row}',
+                 f'https://example.eu/specifications/{row}', sdos[row % len(sdos)], 'Custom SDO',
+                 'https://sdo.example.eu', '', 'eGovernment']
+        for i in range(CRITERIA):
+            cells += [rnd.choice(['YES', 'NO', 'Not Applicable']),
+                      f'Justification of the answer to the criterion {i + 1} of the specification {row}.']
+        ws.append(cells)
+    wb.save(file_path)
+
+
+def get_stages() -> list:
+    """
+    Pipeline stages measured, in order, run from the benchmark working folder: each stage reads the outputs of the
+    previous ones.
+    """
+
+    def extract(file_path: str):
+        ass_file = camss.AssessmentScenario(file_path)
+        for row in range(4, len(ass_file.ass_df)):
+            camss.Extractor(file_path, row, ass_df=ass_file.ass_df)
+
+    def graph(file_path: str):
+        camss.__extract_file_assessments__(os.path.dirname(file_path), [os.path.basename(file_path)])
+
+    return [('extract', extract),
+            ('graph', graph),
+            ('merge', lambda file_path: camss.__merge_graphs__()),
+            ('turtle', lambda file_path: camss.convert_graph_to('Turtle')),
+            ('json-ld', lambda file_path: camss.convert_graph_to('JSON-LD'))]
+
+
+def measure(stage, file_path: str, sampler: RssSampler, top: int = 5, trace: bool = True) -> dict:
+    """
+    Runs a pipeline stage, measuring its time, peak RSS and peak traced memory (tracemalloc), and the allocation
+    sites that grew the most during the stage.
+    :param trace: whether to trace the allocations, which makes the stage several times slower
+    :return: the measures of the stage
+    """
+    name, function = stage
+    gc.collect()
+    if trace:
+        tracemalloc.start(1)
+        before = tracemalloc.take_snapshot()
+    sampler.reset()
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        # the progress printed by the pipeline
+        function(file_path)
+    elapsed = time.perf_counter() - start
+    rss = max(sampler.peak, RssSampler.get_rss() or 0)
+    traced = None
+    sites = []
+    if trace:
+        traced = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        sites = [(str(stat.traceback[0]), stat.size_diff) for stat in
+                 after.filter_traces(TRACE_FILTERS).compare_to(before.filter_traces(TRACE_FILTERS), 'lineno')[:top]]
+    return {'stage': name, 'seconds': elapsed, 'rss': rss if rss else None, 'traced': traced, 'sites': sites}
+
+
+def benchmark(sizes: list = None, budgets: dict = None, top: int = 5, trace: bool = True,
+              keep: bool = False) -> list:
+    """
+    Peak-memory benchmark of the pipeline: synthetic workbooks of increasing size go through AssessmentScenario and
+    Extractor ('extract'), Graph ('graph'), __merge_graphs__ ('merge') and convert_graph_to ('turtle' and
+    'json-ld'), each size in its own temporary working folder.
+    :param sizes: number of assessments of the synthetic workbooks
+    :param budgets: maximum peak RSS per stage in MB (the peak traced memory where RSS cannot be measured),
+    MEMORY_BUDGETS by default
+    :param top: number of allocation sites reported per stage
+    :param trace: whether to trace the allocations (tracemalloc), which makes the stages several times slower; only
+    the peak RSS is measured otherwise
+    :param keep: whether to keep the temporary working folders
+    :return: the measures of every stage, per size
+    :raise MemoryBudgetError: when a stage exceeds its budget, after the report is printed
+    """
+    sizes = sizes if sizes else BENCHMARK_SIZES
+    budgets = dict(MEMORY_BUDGETS, **(budgets if budgets else {}))
+    cwd = os.getcwd()
+    sampler = RssSampler()
+    sampler.start()
+    results = []
+    try:
+        for size in sizes:
+            folder = tempfile.mkdtemp(prefix=f'camss-memory-{size}-')
+            os.chdir(folder)
+            # the process-wide caches and registry belong to the working folder
+            camss.REGISTRY = None
+            camss.WORKBOOK_CACHE = None
+            try:
+                os.makedirs('arti/in/EIF600')
+                file_path = f'arti/in/EIF600/Content_Export_CAMSSAssessmentEIFScenario6_{size}.xlsx'
+                write_synthetic(file_path, size)
+                for stage in get_stages():
+                    result = measure(stage, file_path, sampler, top, trace)
+                    result['assessments'] = size
+                    result['budget'] = budgets.get(result['stage'])
+                    results.append(result)
+            finally:
+                os.chdir(cwd)
+                if not keep:
+                    shutil.rmtree(folder, ignore_errors=True)
+    finally:
+        sampler.stop()
+        camss.REGISTRY = None
+        camss.WORKBOOK_CACHE = None
+    print_report(results)
+    exceeded = [result for result in results if is_exceeded(result)]
+    if exceeded:
+        raise MemoryBudgetError(', '.join(f"'{result['stage']}' with {result['assessments']} assessments"
+                                          for result in exceeded) + ' exceeded the memory budget.')
+    return results
+
+
+def is_exceeded(result: dict) -> bool:
+    if result['budget'] is None:
+        return False
+    peak = result['rss'] if result['rss'] is not None else result['traced']
+    return peak is not None and peak > result['budget'] * 1024 * 1024
+
+
+def print_report(results: list):
+    mb = 1024 * 1024
+    print('assessments', 'stage', 'seconds', 'peak RSS (MB)', 'peak traced (MB)', 'budget (MB)', sep='\t')
+    for result in results:
+        print(result['assessments'], result['stage'], round(result['seconds'], 2),
+              round(result['rss'] / mb, 1) if result['rss'] is not None else 'n/a',
+              round(result['traced'] / mb, 1) if result['traced'] is not None else 'n/a',
+              str(result['budget']) + (' EXCEEDED' if is_exceeded(result) else ''), sep='\t')
+    if not any(result['sites'] for result in results):
+        return
+    print()
+    print('top allocation sites per stage (growth during the stage)')
+    for result in results:
+        print(f"{result['assessments']} assessments, {result['stage']}")
+        for site, size in result['sites']:
+            print('', f'{round(size / 1024, 1)} KiB', site, sep='\t')
+
+
+CRITERIA = 45  # criteria of the EIF scenario (v6)
+BENCHMARK_SIZES = [50, 200, 800]  # number of assessments of the synthetic workbooks
+MEMORY_BUDGETS = {'extract': 1024, 'graph': 1024, 'merge': 512, 'turtle': 2048, 'json-ld': 2048}  # peak MB per stage
+# allocations of tracemalloc itself and of the imports are not reported
+TRACE_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen importlib.*')]
+
+
+if __name__ == '__main__':
+    try:
+        benchmark([int(size) for size in sys.argv[1:] if size.isdigit()] or None, trace='--no-trace' not in sys.argv)
+    except MemoryBudgetError as e:
+        print(e)
+        sys.exit(1)
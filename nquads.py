@@ -0,0 +1,345 @@
+import os
+import re
+import mmap
+import time
+import uuid
+import hashlib
+from collections import Counter
+import rdflib
+from rdflib import URIRef, BNode, Literal
+
+import camssXLSX2RDF as camss
+
+# N-Quads terms, as written by camssXLSX2RDF.Graph
+IRI = r'<[^<>"{}|^`\\\x00-\x20]*>'
+BNODE = r'_:[A-Za-z0-9_][A-Za-z0-9_.\-]*'
+LITERAL = r'"(?:[^"\\\n\r]|\\.)*"(?:@[a-zA-Z]+(?:-[a-zA-Z0-9]+)*|\^\^' + IRI + r')?'
+QUAD = re.compile(r'^[ \t]*(' + IRI + '|' + BNODE + r')[ \t]+(' + IRI + r')[ \t]+(' + IRI + '|' + BNODE + '|' +
+                  LITERAL + r')(?:[ \t]+(' + IRI + '|' + BNODE + r'))?[ \t]*\.[ \t]*$')
+LITERAL_PARTS = re.compile(r'^"(.*)"(?:@([a-zA-Z]+(?:-[a-zA-Z0-9]+)*)|\^\^<(.*)>)?$', re.DOTALL)
+ESCAPE = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))')
+ECHAR = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+BATCH_SIZE = 10000  # quads added at once to the rdflib graph
+
+
+def parse_line(line: str):
+    """
+    Splits an N-Quads line into its terms, in their N-Quads syntax.
+    :param line: the N-Quads line, without the line break
+    :return: (subject, predicate, object, graph) tuple, graph is None for a triple; None if the line is not valid
+    """
+    quad = QUAD.match(line)
+    if quad is None:
+        return None
+    return quad.groups()
+
+
+def unescape(text: str) -> str:
+    """
+    Decodes the N-Quads escape sequences (ECHAR and UCHAR) of a literal or an IRI.
+    """
+    if '\\' not in text:
+        return text
+
+    def decode(escape):
+        if escape.group(3) is not None:
+            if escape.group(3) not in ECHAR:
+                raise ValueError(f'Invalid escape sequence {escape.group(0)}')
+            return ECHAR[escape.group(3)]
+        return chr(int(escape.group(1) or escape.group(2), 16))
+    return ESCAPE.sub(decode, text)
+
+
+class TermFactory:
+    """
+    Builds rdflib terms from their N-Quads syntax. IRIs, blank nodes and the most repeated literals are memoised, so
+    that the long IRIs repeated on almost every line are only built once.
+    """
+    terms: dict  # N-Quads term -> rdflib term
+    max_terms: int  # memoised terms limit (integer type)
+
+    def __init__(self, max_terms: int = 1000000):
+        self.terms = {}
+        self.max_terms = max_terms
+        self.bnodes = {}
+
+    def get(self, token: str):
+        """
+        Returns the rdflib term of an N-Quads term.
+        :param token: the term, in N-Quads syntax
+        :return: URIRef, BNode or Literal
+        """
+        term = self.terms.get(token)
+        if term is not None:
+            return term
+        if token[0] == '<':
+            term = URIRef(unescape(token[1:-1]))
+        elif token[0] == '_':
+            # blank node labels are scoped to the file, as in the rdflib parser
+            term = self.bnodes.setdefault(token, BNode())
+        else:
+            value, lang, datatype = LITERAL_PARTS.match(token).groups()
+            term = Literal(unescape(value), lang=lang, datatype=URIRef(unescape(datatype)) if datatype else None)
+        if len(self.terms) < self.max_terms:
+            self.terms[token] = term
+        return term
+
+
+def iter_quads(file_path: str):
+    """
+    Iterates over the quads of an N-Quads file written by camssXLSX2RDF.Graph, as rdflib terms, without building a
+    graph.
+    :param file_path: the (compressed or not) N-Quads file path
+    :return: generator of (subject, predicate, object, graph) terms, graph is None for a triple
+    :raise ValueError: on a line outside the restricted shape handled by the tokenizer
+    """
+    factory = TermFactory()
+    for line in iter_lines(file_path):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        quad = parse_line(line)
+        if quad is None:
+            raise ValueError(f'Unexpected N-Quads line: {line}')
+        s, p, o, c = quad
+        yield factory.get(s), factory.get(p), factory.get(o), factory.get(c) if c else None
+
+
+def parse(file_path: str, g: rdflib.ConjunctiveGraph = None) -> rdflib.ConjunctiveGraph:
+    """
+    Fast N-Quads parser for the restricted shape written by camssXLSX2RDF.Graph: IRIs, blank nodes, plain, typed and
+    language-tagged literals and a named graph. Quads are added to the rdflib graph in batches. Anything unexpected
+    (e.g. a syntax the tokenizer does not cover) falls back to the rdflib parser for the whole file.
+    :param file_path: the (compressed or not) N-Quads file path
+    :param g: the graph to add the quads to, a new one by default
+    :return: the graph
+    """
+    g = rdflib.ConjunctiveGraph() if g is None else g
+    contexts = {}
+    batch = []
+    try:
+        for s, p, o, c in iter_quads(file_path):
+            if c not in contexts:
+                contexts[c] = g.get_context(c if c is not None else g.default_context.identifier)
+            batch.append((s, p, o, contexts[c]))
+            if len(batch) >= BATCH_SIZE:
+                g.addN(batch)
+                batch = []
+        g.addN(batch)
+    except ValueError:
+        # quads are a set: re-adding the ones already parsed is harmless
+        with camss.open_stream(file_path, 'rb') as data:
+            g.parse(data, format='nquads')
+    return g
+
+
+def iter_lines(file_path: str):
+    """
+    Iterates lazily over the lines of a (compressed or not) N-Quads file. Plain files are memory-mapped.
+    :param file_path: the file path
+    :return: generator of the decoded lines, without the line break
+    """
+    if camss.get_compression(file_path) is None:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b''):
+                    yield line.decode('utf-8').rstrip('\r\n')
+    else:
+        with camss.open_stream(file_path, 'rb') as f:
+            for line in f:
+                yield line.decode('utf-8').rstrip('\r\n')
+
+
+def get_graph_files(root: str) -> list:
+    """
+    Returns the N-Quads files of a graph output folder: the merged dataset file when there is one, otherwise the
+    per-assessment files and the consolidated shards.
+    :param root: graph output folder, e.g. 'arti/out/ass/'
+    :return: list of file paths
+    """
+    root = camss.slash(root)
+    merged = [root + file for file in camss.get_files(root) if file.startswith(root.split('/')[-2] + '-graph.nq')
+              and camss.is_nquads(file)]
+    if merged:
+        return merged[:1]
+    files = [root + 'nq/' + file for file in camss.get_files(root + 'nq/') if camss.is_nquads(file)]
+    sharded = camss.get_sharded_output(root)
+    return files + [sharded.path + shard for shard in sharded.get_shards()]
+
+
+def get_references() -> dict:
+    """
+    Predicates whose object must be described somewhere in the CAMSS Knowledge Graph, and the class the object must
+    be typed with (None: any class).
+    """
+    return {f'<{camss.CAV}resultsIn>': f'<{camss.CAV}Statement>',
+            f'<{camss.CAV}refersTo>': f'<{camss.CAV}Score>',
+            f'<{camss.CAV}considers>': f'<{camss.CAV}Score>',
+            f'<{camss.CAV}assignedTo>': f'<{camss.CCCEV}Criterion>',
+            f'<{camss.CAV}includes>': f'<{camss.CCCEV}Criterion>',
+            f'<{camss.CAV}contextualisedBy>': f'<{camss.CAV}Scenario>',
+            f'<{camss.CAV}performedBy>': f'<{camss.ORG}Organization>',
+            f'<{camss.CAV}assesses>': None,
+            f'<{camss.CSSV}isMaintainedBy>': f'<{camss.ORG}Organization>',
+            f'<{camss.DCAT}distribution>': f'<{camss.DCAT}Distribution>'}
+
+
+class GraphValidator:
+    """
+    Streaming validation of the generated N-Quads (assessments, criteria and specifications graphs) in one pass:
+    quad syntax, number of quads per predicate and per graph, and dangling references (e.g. a cav:resultsIn statement
+    that is not a cav:Statement, or a cav:assignedTo criterion missing from the criteria graph).
+    Memory only grows with the number of typed nodes and pending references, kept as 8-byte digests.
+    """
+    roots: list  # graph output folders (list type)
+    max_errors: int  # maximum number of syntax errors and dangling references reported in full (integer type)
+
+    def __init__(self, roots: list = None, max_errors: int = 20):
+        """
+        GraphValidator class initializer.
+        :param roots: graph output folders, by default the assessments, criteria and specifications ones
+        :param max_errors: maximum number of syntax errors and dangling references reported in full
+        """
+        self.roots = roots if roots else ['arti/out/ass/', 'arti/out/crit/', 'arti/out/specs/']
+        self.max_errors = max_errors
+        self.references = get_references()
+        self.rdf_type = f'<{camss.RDF}type>'
+        self.files = []
+        self.quads = 0
+        self.predicates = Counter()
+        self.graphs = Counter()
+        self.errors = []  # (file, line number, line)
+        self.error_count = 0
+        self.declared = set()  # digests of (node, class) and (node, None)
+        self.pending = {}  # digest of (node, class) -> (predicate, node, file)
+
+    @staticmethod
+    def digest(node: str, cls: str = None) -> bytes:
+        return hashlib.blake2b(f'{node} {cls}'.encode('utf-8'), digest_size=8).digest()
+
+    def scan(self, file_path: str):
+        """
+        Validates one N-Quads file.
+        :param file_path: the file path
+        """
+        self.files.append(file_path)
+        for number, line in enumerate(iter_lines(file_path), start=1):
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            quad = parse_line(line)
+            if quad is None:
+                self.error_count += 1
+                if len(self.errors) < self.max_errors:
+                    self.errors.append((file_path, number, line))
+                continue
+            s, pr, o, g = quad
+            self.quads += 1
+            self.predicates[pr] += 1
+            self.graphs[g] += 1
+            if pr == self.rdf_type:
+                for key in (self.digest(s, o), self.digest(s)):
+                    self.declared.add(key)
+                    self.pending.pop(key, None)
+            elif pr in self.references:
+                key = self.digest(o, self.references[pr])
+                if key not in self.declared:
+                    self.pending[key] = (pr, o, file_path)
+
+    def run(self) -> dict:
+        """
+        Validates all the N-Quads files of the graph output folders.
+        :return: the validation report
+        """
+        for root in self.roots:
+            for file_path in get_graph_files(root):
+                self.scan(file_path)
+        return self.get_report()
+
+    def get_report(self) -> dict:
+        dangling = Counter(predicate for predicate, _, _ in self.pending.values())
+        return {'files': len(self.files), 'quads': self.quads, 'syntax_errors': self.error_count,
+                'errors': self.errors, 'predicates': dict(self.predicates.most_common()),
+                'graphs': dict(self.graphs.most_common()), 'dangling': dict(dangling),
+                'dangling_examples': list(self.pending.values())[:self.max_errors]}
+
+    def print_report(self):
+        report = self.get_report()
+        print(f"{report['files']} files, {report['quads']} quads, {report['syntax_errors']} syntax errors, "
+              f"{sum(report['dangling'].values())} dangling references")
+        print()
+        print('quads per graph')
+        for graph, count in report['graphs'].items():
+            print(count, graph, sep='\t')
+        print()
+        print('quads per predicate')
+        for predicate, count in report['predicates'].items():
+            print(count, predicate, sep='\t')
+        if report['errors']:
+            print()
+            print('syntax errors')
+            for file_path, number, line in report['errors']:
+                print(f'{file_path}:{number}', line, sep='\t')
+        if report['dangling']:
+            print()
+            print('dangling references')
+            for predicate, node, file_path in report['dangling_examples']:
+                print(predicate, node, file_path, sep='\t')
+
+
+def validate(roots: list = None, max_errors: int = 20) -> dict:
+    """
+    Use it to validate the generated N-Quads from a python console, Jupyter Lab or Notebook, etc.
+    :param roots: graph output folders, by default the assessments, criteria and specifications ones
+    :param max_errors: maximum number of syntax errors and dangling references reported in full
+    :return: the validation report
+    """
+    validator = GraphValidator(roots, max_errors)
+    validator.run()
+    validator.print_report()
+    return validator.get_report()
+
+
+def write_synthetic(file_path: str, quads: int = 1000000):
+    """
+    Writes a synthetic N-Quads file shaped like the merged assessments graph ('ass-graph.nq'), for benchmarking.
+    :param file_path: the file path
+    :param quads: approximate number of quads
+    """
+    graph = f'<{camss.CAMSSA}>'
+    written = 0
+    with camss.open_stream(file_path, 'wt') as f:
+        while written < quads:
+            statement = f'<{camss.CAMSSA}{uuid.uuid4()}>'
+            score = f'<{camss.CAMSSA}{uuid.uuid4()}>'
+            criterion = f'<{camss.SC}c-{camss.sha256(str(written % 45))}>'
+            print(statement + f' <{camss.RDF}type> <{camss.CAV}Statement> {graph} .', file=f)
+            print(statement + f' <{camss.RDF}type> <{camss.OWL}NamedIndividual> {graph} .', file=f)
+            print(statement + f' <{camss.CAV}judgement> "Judgement {written} with a \\"quote\\"\\nand a line break"@en {graph} .', file=f)
+            print(statement + f' <{camss.CAV}refersTo> {score} {graph} .', file=f)
+            print(score + f' <{camss.RDF}type> <{camss.CAV}Score> {graph} .', file=f)
+            print(score + f' <{camss.CAV}assignedTo> {criterion} {graph} .', file=f)
+            print(score + f' <{camss.CAV}value> "{written % 101}"^^<{camss.XSD}string> {graph} .', file=f)
+            written += 7
+
+
+def benchmark(file_path: str) -> dict:
+    """
+    Times the fast parser against rdflib's ConjunctiveGraph.parse on the same N-Quads file and checks that both
+    graphs are equal.
+    :param file_path: the N-Quads file path, see write_synthetic
+    :return: the times in seconds and the number of quads
+    """
+    start = time.perf_counter()
+    fast = parse(file_path)
+    fast_time = time.perf_counter() - start
+    start = time.perf_counter()
+    reference = rdflib.ConjunctiveGraph()
+    with camss.open_stream(file_path, 'rb') as data:
+        reference.parse(data, format='nquads')
+    reference_time = time.perf_counter() - start
+    equal = len(fast) == len(reference) and all(quad in reference for quad in fast.quads((None, None, None, None)))
+    print(f'fast\t{round(fast_time, 2)} s')
+    print(f'rdflib\t{round(reference_time, 2)} s')
+    print(f'quads\t{len(fast)}\t{"equal" if equal else "DIFFERENT"}')
+    return {'fast': fast_time, 'rdflib': reference_time, 'quads': len(fast), 'equal': equal}
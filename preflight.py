@@ -0,0 +1,180 @@
+import os
+import csv
+import json
+import glob
+import threading
+
+import readers
+import camssXLSX2RDF as camss
+
+
+class WorkbookInfo:
+    """
+    What the pre-flight scan learns about a workbook, from its first rows only: scenario, tool version and number of
+    assessments, plus the estimated time to convert it.
+    """
+    root_dir: str  # scenario folder, e.g. 'arti/in/EIF600' (string type)
+    file: str  # workbook file name (string type)
+    size: int  # file size in bytes (integer type)
+    scenario: str  # EIF, MSP or TS (string type)
+    version: str  # EU Survey/CAMSS Tool version (string type)
+    rows: int  # number of spread-sheet rows (integer type)
+    estimate: float  # estimated conversion time in seconds (float type)
+    error: str  # why the workbook could not be scanned, if so (string type)
+
+    def __init__(self, root_dir: str, file: str):
+        self.root_dir = root_dir
+        self.file = file
+        self.size = os.path.getsize(self.file_path)
+        self.scenario = None
+        self.version = None
+        self.rows = 0
+        self.estimate = 0.0
+        self.error = None
+
+    @property
+    def file_path(self) -> str:
+        return self.root_dir + '/' + self.file
+
+    @property
+    def assessments(self) -> int:
+        # the assessments start at the fifth row (see camssXLSX2RDF.__extract_file_assessments__)
+        return max(self.rows - 4, 0)
+
+    def __repr__(self) -> str:
+        return f'WorkbookInfo({self.file_path!r}, {self.scenario}, v{self.version}, {self.assessments} assessments)'
+
+
+def read_head(file_path: str, head: int = None) -> (list, int):
+    """
+    Reads the first rows of a workbook and counts its rows, without loading the whole workbook: openpyxl in
+    read-only mode (the row count comes from the sheet dimension), xlrd on demand, or a streamed csv reader.
+    :param file_path: the workbook file path
+    :param head: number of rows to read
+    :return: the first rows, and the number of rows
+    """
+    head = head if head else HEAD_ROWS
+    extension = readers.get_extension(file_path)
+    if extension in ('.xlsx', '.xlsm') and readers.READERS['openpyxl'].available():
+        import openpyxl
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            rows = [list(row) for row in ws.iter_rows(max_row=head, values_only=True)]
+            count = ws.max_row
+            if count is None:
+                # no dimension recorded in the sheet, the rows are counted
+                count = sum(1 for _ in ws.iter_rows(values_only=True))
+        finally:
+            wb.close()
+        return rows, count
+    if extension == '.xls':
+        import xlrd
+        wb = xlrd.open_workbook(file_path, on_demand=True)
+        try:
+            ws = wb.sheet_by_index(0)
+            return [ws.row_values(i) for i in range(min(head, ws.nrows))], ws.nrows
+        finally:
+            wb.release_resources()
+    if extension == '.csv':
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            delimiter = max([',', ';', '\t'], key=f.readline().count)
+            f.seek(0)
+            rows = []
+            count = 0
+            for row in csv.reader(f, delimiter=delimiter):
+                if count < head:
+                    rows.append(row)
+                count += 1
+        return rows, count
+    df = readers.read(file_path)
+    return df.head(head).values.tolist(), len(df)
+
+
+def scan_workbook(root_dir: str, file: str) -> WorkbookInfo:
+    """
+    Scans a workbook: scenario, tool version and number of rows, from its first rows only.
+    :param root_dir: the scenario folder
+    :param file: the workbook file name
+    :return: WorkbookInfo, with the error if the workbook could not be scanned
+    """
+    info = WorkbookInfo(root_dir, file)
+    try:
+        rows, info.rows = read_head(info.file_path)
+        # the scenario and version are parsed as AssessmentScenario does, from the first rows
+        head = camss.AssessmentScenario.__new__(camss.AssessmentScenario)
+        head.ass_df = readers.Reader.to_frame(rows)
+        info.scenario = head.get_scenario()
+        info.version = head.get_version()
+    except Exception as e:
+        info.error = f'{type(e).__name__}: {e}'
+    info.estimate = info.assessments * get_row_time(info.scenario)
+    return info
+
+
+def scan(input_folder: str = 'arti/in/') -> list:
+    """
+    Pre-flight scan of all the workbooks of the input folder.
+    :param input_folder: the folder with one sub-folder of workbooks per scenario
+    :return: list of WorkbookInfo, largest first
+    """
+    infos = []
+    for path in glob.iglob(input_folder + '/**', recursive=False):
+        for file in camss.get_files(path):
+            if os.path.isfile(path + '/' + file):
+                infos.append(scan_workbook(path, file))
+    return sorted(infos, key=lambda info: (info.estimate, info.size), reverse=True)
+
+
+def get_row_time(scenario: str) -> float:
+    """
+    Returns the conversion time per assessment of a scenario, as measured by the previous runs.
+    """
+    timings = get_timings()
+    return timings.get(scenario, timings.get('*', ROW_TIME))
+
+
+def get_timings() -> dict:
+    global TIMINGS
+    if TIMINGS is None:
+        TIMINGS = {}
+        if os.path.isfile(TIMINGS_PATH):
+            with open(TIMINGS_PATH, 'r', encoding='utf-8') as f:
+                TIMINGS = json.load(f)
+    return TIMINGS
+
+
+def record_timing(scenario: str, assessments: int, elapsed: float):
+    """
+    Refines the conversion time per assessment of a scenario with the time a workbook actually took (moving average).
+    """
+    if not assessments or scenario is None:
+        return
+    with TIMINGS_LOCK:
+        timings = get_timings()
+        measured = elapsed / assessments
+        for key in [scenario, '*']:
+            timings[key] = measured if key not in timings else 0.7 * timings[key] + 0.3 * measured
+        os.makedirs(os.path.dirname(TIMINGS_PATH) or '.', exist_ok=True)
+        with open(TIMINGS_PATH, 'w', encoding='utf-8') as f:
+            json.dump(timings, f, indent=1)
+
+
+def print_report(infos: list):
+    """
+    Projected-runtime report of a batch: per workbook estimates, and their sum (the workbooks are converted one at a
+    time).
+    """
+    print('scenario', 'version', 'assessments', 'estimate (s)', 'workbook', sep='\t')
+    for info in infos:
+        print(info.scenario, info.version, info.assessments, round(info.estimate, 2),
+              info.file_path + (f' ({info.error})' if info.error else ''), sep='\t')
+    print(f'{len(infos)} workbooks, {sum(info.assessments for info in infos)} assessments, '
+          f'projected runtime: {round(sum(info.estimate for info in infos), 2)} s')
+
+
+HEAD_ROWS = 5  # rows read by the pre-flight scan, the header (4 rows) and the first assessment
+ROW_TIME = 0.05  # conversion time per assessment, in seconds, until measured by a run
+TIMINGS_PATH = 'arti/timings.json'  # measured conversion time per assessment, per scenario
+TIMINGS = None  # measured timings of the current process
+TIMINGS_LOCK = threading.Lock()
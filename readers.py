@@ -0,0 +1,265 @@
+import io
+import os
+import csv
+import time
+import pandas as p
+
+
+class Reader:
+    """
+    Spread-sheet reader backend. Loads an EU Survey/CAMSS output, from a file path or a binary file-like object, into
+    a DataFrame with the same shape as pandas.read_excel(file_path, header=None): integer row and column labels and
+    NaN in the empty cells.
+    """
+    name: str = None  # backend name (string type)
+    extensions: tuple = ()  # file extensions the backend is able to read
+
+    @staticmethod
+    def available() -> bool:
+        """
+        Checks whether the libraries the backend depends on are installed.
+        """
+        return True
+
+    def read(self, file_path: str) -> p.DataFrame:
+        raise NotImplementedError
+
+    def read_columns(self, file_path: str, columns: list) -> p.DataFrame:
+        """
+        Loads only some columns of the spread-sheet, labelled as in read().
+        :param columns: the column numbers, from 0
+        """
+        return self.read(file_path).reindex(columns=columns)
+
+    @staticmethod
+    def select(rows, columns: list) -> list:
+        """
+        Keeps only some cells of each row, as the rows are read.
+        """
+        return [[row[i] if i < len(row) else None for i in columns] for row in rows]
+
+    @staticmethod
+    def to_frame(rows: list, columns: list = None) -> p.DataFrame:
+        """
+        Builds the DataFrame from the rows of cells, dropping the trailing empty rows as read_excel does.
+        :param rows: list of rows, each of them a list of cell values
+        :param columns: the column labels, when the rows only hold some columns (see select)
+        :return: DataFrame
+        """
+        rows = [[int(cell) if isinstance(cell, float) and cell.is_integer() else cell for cell in row]
+                for row in rows]
+        while rows and all(cell is None or cell == '' for cell in rows[-1]):
+            rows.pop()
+        df = p.DataFrame(rows, columns=columns)
+        return df.where(df.notna() & (df != ''), float('nan'))
+
+
+class PandasReader(Reader):
+    """
+    pandas.read_excel, openpyxl for .xlsx/.xlsm and xlrd for .xls workbooks (reference backend).
+    """
+    name = 'pandas'
+    extensions = ('.xlsx', '.xlsm', '.xls')
+
+    def read(self, file_path: str) -> p.DataFrame:
+        return p.read_excel(file_path, header=None)
+
+    def read_columns(self, file_path: str, columns: list) -> p.DataFrame:
+        return p.read_excel(file_path, header=None, usecols=columns).reindex(columns=columns)
+
+
+class OpenpyxlReader(Reader):
+    """
+    openpyxl in read-only mode, streaming the worksheet rows instead of loading the whole workbook model.
+    """
+    name = 'openpyxl'
+    extensions = ('.xlsx', '.xlsm')
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import openpyxl
+        except ImportError:
+            return False
+        return True
+
+    def read(self, file_path: str) -> p.DataFrame:
+        import openpyxl
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = [list(row) for row in wb.worksheets[0].iter_rows(values_only=True)]
+        finally:
+            wb.close()
+        return self.to_frame(rows)
+
+    def read_columns(self, file_path: str, columns: list) -> p.DataFrame:
+        import openpyxl
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = self.select(wb.worksheets[0].iter_rows(values_only=True), columns)
+        finally:
+            wb.close()
+        return self.to_frame(rows, columns)
+
+
+class CsvReader(Reader):
+    """
+    EU Survey CSV exports, read with the standard library csv module. The delimiter (comma, semicolon or tab) is the
+    most frequent one in the first line.
+    """
+    name = 'csv'
+    extensions = ('.csv',)
+
+    def read(self, file_path) -> p.DataFrame:
+        return self.read_columns(file_path, None)
+
+    def read_columns(self, file_path, columns: list) -> p.DataFrame:
+        if isinstance(file_path, str):
+            f = open(file_path, 'r', encoding='utf-8-sig', newline='')
+        else:
+            f = io.TextIOWrapper(file_path, encoding='utf-8-sig', newline='')
+        with f:
+            line = f.readline()
+            delimiter = max([',', ';', '\t'], key=line.count)
+            f.seek(0)
+            reader = csv.reader(f, delimiter=delimiter)
+            rows = [row for row in reader] if columns is None else self.select(reader, columns)
+        return self.to_frame(rows, columns)
+
+
+class CalamineReader(Reader):
+    """
+    Compiled (Rust) calamine reader, only when the optional python-calamine package is installed.
+    """
+    name = 'calamine'
+    extensions = ('.xlsx', '.xlsm', '.xls')
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import python_calamine
+        except ImportError:
+            return False
+        return True
+
+    def read(self, file_path: str) -> p.DataFrame:
+        from python_calamine import CalamineWorkbook
+        if isinstance(file_path, str):
+            workbook = CalamineWorkbook.from_path(file_path)
+        else:
+            workbook = CalamineWorkbook.from_filelike(file_path)
+        sheet = workbook.get_sheet_by_index(0)
+        return self.to_frame(sheet.to_python(skip_empty_area=False))
+
+    def read_columns(self, file_path: str, columns: list) -> p.DataFrame:
+        from python_calamine import CalamineWorkbook
+        sheet = CalamineWorkbook.from_path(file_path).get_sheet_by_index(0)
+        return self.to_frame(self.select(sheet.to_python(skip_empty_area=False), columns), columns)
+
+
+READERS = {reader.name: reader for reader in [CalamineReader(), OpenpyxlReader(), PandasReader(), CsvReader()]}
+# preferred backend per extension, fastest first (see benchmark); refined by benchmark(..., select=True)
+PREFERENCE = {'.xlsx': ['calamine', 'openpyxl', 'pandas'],
+              '.xlsm': ['calamine', 'openpyxl', 'pandas'],
+              '.xls': ['calamine', 'pandas'],
+              '.csv': ['csv']}
+
+
+def get_extension(file_path: str) -> str:
+    return os.path.splitext(file_path)[1].lower()
+
+
+def get_readers(file_path: str) -> list:
+    """
+    Returns the available backends able to read a file, fastest first.
+    :param file_path: the spread-sheet file path
+    :return: list of Reader
+    """
+    extension = get_extension(file_path)
+    names = PREFERENCE.get(extension, ['pandas'])
+    return [READERS[name] for name in names if READERS[name].available()]
+
+
+def get_reader(file_path: str, backend: str = None) -> Reader:
+    """
+    Returns the backend used to read a file.
+    :param file_path: the spread-sheet file path
+    :param backend: name of a backend to force, otherwise the fastest available one
+    :return: Reader
+    """
+    if backend:
+        return READERS[backend]
+    readers = get_readers(file_path)
+    if not readers:
+        raise Exception(f"No spread-sheet reader available for '{file_path}'.")
+    return readers[0]
+
+
+def read(file_path: str, backend: str = None) -> p.DataFrame:
+    """
+    Loads an EU Survey/CAMSS output (xlsx, xlsm, xls or csv) into a DataFrame.
+    :param file_path: the spread-sheet file path
+    :param backend: name of a backend to force, otherwise the fastest available one
+    :return: DataFrame
+    """
+    return get_reader(file_path, backend).read(file_path)
+
+
+def read_columns(file_path: str, columns: list, backend: str = None) -> p.DataFrame:
+    """
+    Loads only some columns of an EU Survey/CAMSS output, e.g. the criterion answers of the scores-only mode.
+    :param file_path: the spread-sheet file path
+    :param columns: the column numbers, from 0
+    :param backend: name of a backend to force, otherwise the fastest available one
+    :return: DataFrame, labelled with the column numbers
+    """
+    return get_reader(file_path, backend).read_columns(file_path, columns)
+
+
+def get_format(data: bytes) -> str:
+    """
+    Guesses the file extension of a spread-sheet from its content: zip container (xlsx/xlsm), OLE2 compound document
+    (xls) or text (csv).
+    """
+    if data[:4] == b'PK\x03\x04':
+        return '.xlsx'
+    if data[:8] == b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1':
+        return '.xls'
+    return '.csv'
+
+
+def read_bytes(data: bytes, backend: str = None) -> p.DataFrame:
+    """
+    Loads an EU Survey/CAMSS output from its content, without writing it to disk.
+    :param data: the spread-sheet content
+    :param backend: name of a backend to force, otherwise the fastest available one
+    :return: DataFrame
+    """
+    return get_reader('workbook' + get_format(data), backend).read(io.BytesIO(data))
+
+
+def benchmark(file_path: str, repeat: int = 3, select: bool = False) -> dict:
+    """
+    Times every available backend able to read a file.
+    :param file_path: the spread-sheet file path
+    :param repeat: number of reads per backend, the best time is kept
+    :param select: whether to make the fastest backend the default one for this file extension
+    :return: the best time in seconds per backend name, fastest first
+    """
+    timings = {}
+    for reader in get_readers(file_path):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            reader.read(file_path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[reader.name] = best
+    timings = dict(sorted(timings.items(), key=lambda t: t[1]))
+    if select and timings:
+        extension = get_extension(file_path)
+        ranked = list(timings.keys())
+        PREFERENCE[extension] = ranked + [name for name in PREFERENCE.get(extension, []) if name not in ranked]
+    for name, elapsed in timings.items():
+        print(f'{name}\t{round(elapsed * 1000, 2)} ms')
+    return timings
@@ -0,0 +1,242 @@
+import gc
+import sys
+import tracemalloc
+
+import camssXLSX2RDF as camss
+
+
+def intern(value):
+    """
+    Keeps a single copy in memory of the strings repeated in every assessment of a scenario.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record:
+    """
+    Compact record with fixed attributes (__slots__). Records can also be read as the dictionaries of
+    Extractor.ass_dict, e.g. record['title']['P1'], by means of their KEYS table, so that the Graph methods work
+    with records as they do with dictionaries. The attributes the dictionary has no key for are MISSING, and read as
+    a missing key.
+    """
+    __slots__ = ()
+    KEYS = {}  # ass_dict key -> attribute name
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name, MISSING))
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        """
+        Builds the record of one of the dictionaries of Extractor.ass_dict.
+        """
+        return cls(**{cls.KEYS[key]: value for key, value in d.items() if key in cls.KEYS})
+
+    def __getitem__(self, key):
+        try:
+            value = getattr(self, self.KEYS[key])
+        except KeyError:
+            raise KeyError(key) from None
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self.KEYS and getattr(self, self.KEYS[key]) is not MISSING
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return [key for key in self.KEYS if key in self]
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(' + ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__
+                                                       if not isinstance(getattr(self, name), (dict, Record))
+                                                       and getattr(self, name) is not MISSING) + ')'
+
+
+class CriterionResult(Record):
+    """
+    The result of a criterion in an assessment. Also readable as the positional list of Extractor.criteria
+    ([column, criterion_sha_id, criterion_description, score_id, score, statement_id, statement, answer]).
+    """
+    __slots__ = ('column', 'criterion_sha_id', 'criterion_description', 'score_id', 'score', 'statement_id',
+                 'statement', 'answer')
+    KEYS = {'criterion_sha_id': 'criterion_sha_id', 'criterion_description': 'criterion_description',
+            'score_id': 'score_id', 'score': 'score', 'statement_id': 'statement_id', 'statement': 'statement'}
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return getattr(self, self.__slots__[key])
+        return super().__getitem__(key)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+
+class Specification(Record):
+    """
+    The specification assessed, ass_dict['title'] (and ass_dict['spec_type']).
+    """
+    __slots__ = ('spec_id', 'title', 'description', 'version', 'distribution_id', 'download_url', 'spec_type')
+    KEYS = {'P1': 'title', 'P2': 'download_url', 'spec_id': 'spec_id', 'description': 'description',
+            'version': 'version', 'distribution_id': 'distribution_id'}
+
+
+class Organisation(Record):
+    """
+    The submitter organisation, ass_dict['organization'].
+    """
+    __slots__ = ('org_id', 'uuid', 'name', 'email', 'unit_id', 'submitter', 'role', 'address', 'phone',
+                 'submission_date')
+    KEYS = {'submitter_org_id': 'org_id', 'uuid': 'uuid', 'L2': 'name', 'L6': 'email', 'submitter_unit_id': 'unit_id',
+            'L1': 'submitter', 'L3': 'role', 'L4': 'address', 'L5': 'phone', 'L7': 'submission_date'}
+
+
+class Agent(Record):
+    """
+    The SDO maintaining the specification, ass_dict['agent'].
+    """
+    __slots__ = ('org_id', 'uuid', 'name', 'email')
+    KEYS = {'sdo_id': 'org_id', 'uuid': 'uuid', 'P3': 'name', 'P4': 'email'}
+
+
+class Assessment(Record):
+    """
+    An assessment, i.e. the data of Extractor.ass_dict and Extractor.criteria. The criterion results are shared by
+    ass_dict['results_in'] and criteria, and the attributes ass_dict, criteria, ass_title, scenario and tool_version
+    make a record usable wherever an Extractor is, e.g. Graph(extract=record). Extractor keeps its assessment as a
+    record (camssXLSX2RDF.RECORDS), its ass_dict and criteria are then the record and its results.
+    """
+    __slots__ = ('assessment_id', 'assessment_date', 'scenario', 'scenario_full', 'scenario_id', 'tool_version',
+                 'url_eusurvey', 'status', 'specification', 'organisation', 'sdo', 'results', 'answers')
+    KEYS = {'assessment_id': 'assessment_id', 'assessment_date': 'assessment_date', 'tool_version': 'tool_version',
+            'url_eusurvey': 'url_eusurvey', 'status': 'status', 'title': 'specification',
+            'organization': 'organisation', 'agent': 'sdo', 'results_in': 'results', 'spec_type': 'spec_type',
+            'contextualised_by': 'contextualised_by', 'submission_date': 'submission_date',
+            'tool_release_date': 'tool_release_date'}
+    # the remaining answers of the assessment, kept in a tuple
+    ANSWERS = ('P5', 'P6', 'C1', 'C2', 'C3', 'C4', 'C5', 'P7', 'P8', 'P9', 'P10', 'io_spec_type')
+
+    def __getitem__(self, key):
+        if key in self.ANSWERS:
+            return self.answers[self.ANSWERS.index(key)]
+        return super().__getitem__(key)
+
+    def __contains__(self, key) -> bool:
+        return super().__contains__(key) or key in self.ANSWERS
+
+    def keys(self):
+        return super().keys() + list(self.ANSWERS)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    @property
+    def spec_type(self) -> str:
+        return self.specification.spec_type if self.specification is not MISSING else MISSING
+
+    @property
+    def contextualised_by(self) -> dict:
+        return {'scenario': self.scenario, 'scenario_id': self.scenario_id, 'L8': self.scenario_full}
+
+    @property
+    def submission_date(self):
+        return None
+
+    @property
+    def tool_release_date(self):
+        return None
+
+    # Extractor compatibility
+    @property
+    def ass_dict(self):
+        return self
+
+    @property
+    def criteria(self) -> dict:
+        return self.results
+
+    @property
+    def ass_title(self) -> str:
+        return self.specification.title
+
+    @classmethod
+    def from_extractor(cls, extractor: 'camss.Extractor'):
+        """
+        Builds the record of the assessment extracted, from the dictionaries Extractor has just populated.
+        """
+        d = extractor.ass_dict
+        results = {}
+        for criterion, values in extractor.criteria.items():
+            result = CriterionResult(**dict(zip(CriterionResult.__slots__, values)))
+            # the same few values in every assessment of a scenario, kept once in memory
+            result.criterion_sha_id = intern(result.criterion_sha_id)
+            result.criterion_description = intern(result.criterion_description)
+            result.score = intern(result.score)
+            result.answer = intern(result.answer)
+            results[intern(criterion)] = result
+        specification = Specification.from_dict(d['title'])
+        specification.spec_type = d.get('spec_type', MISSING)
+        return cls(assessment_id=d['assessment_id'], assessment_date=intern(d['assessment_date']),
+                   scenario=extractor.scenario, scenario_full=d['contextualised_by']['L8'],
+                   scenario_id=intern(d['contextualised_by']['scenario_id']), tool_version=extractor.tool_version,
+                   url_eusurvey=intern(d['url_eusurvey']), status=d['status'], specification=specification,
+                   organisation=Organisation.from_dict(d['organization']), sdo=Agent.from_dict(d['agent']),
+                   results=results, answers=tuple(d[key] for key in cls.ANSWERS))
+
+
+def extract(file_path: str) -> list:
+    """
+    Extracts all the assessments of an EU Survey/CAMSS output as records, the workbook being read only once.
+    :param file_path: the workbook file path
+    :return: list of Assessment
+    """
+    ass_df = camss.get_workbook_cache().read(file_path)
+    return [camss.Extractor(file_path, row, ass_df=ass_df).record for row in range(4, len(ass_df))]
+
+
+def measure(file_path: str, assessments: int = 1000) -> dict:
+    """
+    Compares the memory retained by a batch of assessments (Extractor.ass_dict and Extractor.criteria) kept as
+    dictionaries and as records (camssXLSX2RDF.RECORDS), with tracemalloc. The rows of the workbook are extracted
+    again until the batch is complete.
+    :param file_path: the workbook file path
+    :param assessments: size of the batch
+    :return: bytes retained by the dictionaries and by the records, per 'assessments' assessments
+    """
+    ass_df = camss.get_workbook_cache().read(file_path)
+    rows = list(range(4, len(ass_df)))
+    for row in rows:
+        # warm-up: process-wide caches and registry entries are not part of the batch
+        camss.Extractor(file_path, row, ass_df=ass_df)
+    sizes = {}
+    records = camss.RECORDS
+    try:
+        for kind in ['dict', 'records']:
+            camss.RECORDS = kind == 'records'
+            gc.collect()
+            tracemalloc.start()
+            batch = []
+            for i in range(assessments):
+                extractor = camss.Extractor(file_path, rows[i % len(rows)], ass_df=ass_df)
+                batch.append((extractor.ass_dict, extractor.criteria))
+                del extractor
+            gc.collect()
+            sizes[kind] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del batch
+    finally:
+        camss.RECORDS = records
+    print(f'dict\t{round(sizes["dict"] / 1024 / 1024, 2)} MB per {assessments} assessments')
+    print(f'records\t{round(sizes["records"] / 1024 / 1024, 2)} MB per {assessments} assessments '
+          f'({round((1 - sizes["records"] / sizes["dict"]) * 100, 1)}% less)')
+    return sizes
+
+
+MISSING = object()  # value of the record attributes the assessment dictionary has no key for
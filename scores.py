@@ -0,0 +1,126 @@
+import io
+import os
+import glob
+import time
+
+import pandas as pd
+
+import camssXLSX2RDF as camss
+import preflight
+import readers
+import utils
+
+
+class ScoreExtractor:
+    """
+    Scores-only extraction of an EU Survey/CAMSS output: only the criterion answer columns and the specification
+    title are read, and the answers of every row are scored at once, column by column. No assessment dictionary,
+    identifier or graph is built.
+    """
+    file_path: str  # the workbook file path (string type)
+    scenario: 'camss.AssessmentScenario'  # scenario, tool version and criteria, from the header rows only
+    profile: utils.ScoringProfile  # scoring profile of the scenario, None if its assessments are not scored
+    ass_df: pd.DataFrame  # the title and criterion answer columns of the workbook, read on demand
+
+    def __init__(self, file_path: str):
+        """
+        ScoreExtractor class initializer. Only the header rows are read, as the pre-flight scan does.
+        :param file_path: the workbook file path
+        """
+        self.file_path = file_path
+        rows, _ = preflight.read_head(file_path, HEADER_ROWS)
+        self.scenario = camss.AssessmentScenario.__new__(camss.AssessmentScenario)
+        self.scenario.ass_df = readers.Reader.to_frame(rows)
+        self.scenario.scenario = self.scenario.get_scenario()
+        self.scenario.tool_version = self.scenario.get_version()
+        self.scenario.get_criteria()
+        if self.scenario.scenario == 'EIF':
+            self.scenario.gradients = self.scenario.get_gradients()
+        self.profile = utils.get_profile(self.scenario.scenario, self.scenario.tool_version)
+        self.ass_df = None
+
+    @property
+    def title_column(self) -> int:
+        return camss.TITLE_COLUMNS.get(self.scenario.scenario, camss.TITLE_COLUMNS['TS'])
+
+    def read(self) -> pd.DataFrame:
+        """
+        Reads the title and criterion answer columns only, the other columns of the workbook are not loaded.
+        """
+        if self.ass_df is None:
+            columns = [self.title_column] + [values[0] for values in self.scenario.criteria.values()]
+            self.ass_df = readers.read_columns(self.file_path, sorted(set(columns)))
+        return self.ass_df
+
+    def get_titles(self) -> list:
+        """
+        Titles of the specifications assessed, as in Extractor.ass_dict['title']['P1'].
+        """
+        return [camss.Extractor.normalize_title(title) for title in self.read().loc[4:, self.title_column]]
+
+    def get_scores(self) -> dict:
+        """
+        Scores the answers of all the assessments, column by column: each distinct answer of a criterion is only
+        scored once (Extractor._new_yesno_choice for EIF, Extractor._yesno_choice otherwise).
+        :return: criterion -> (scores, answers), one per assessment
+        """
+        ass_df = self.read()
+        gradients = self.scenario.gradients
+        scores = {}
+        for criterion, values in self.scenario.criteria.items():
+            answers = [str(answer) for answer in ass_df.loc[4:, values[0]]]
+            choices = {}
+            for answer in set(answers):
+                if self.scenario.scenario == 'EIF':
+                    choices[answer] = str(camss.Extractor._new_yesno_choice(answer.strip(), gradients))
+                else:
+                    choices[answer] = str(camss.Extractor._yesno_choice(answer.strip()))
+            scores[criterion] = ([choices[answer] for answer in answers], answers)
+        return scores
+
+    def iter_tables(self):
+        """
+        Yields the score table of every assessment, as written by utils.PunctuationCalculator.
+        :return: generator of (row, title, score table lines), none if the scenario is not scored
+        """
+        if self.profile is None:
+            return
+        scores = self.get_scores()
+        for i, title in enumerate(self.get_titles()):
+            # the positions of Extractor.criteria read by PunctuationCalculator: [4] score and [-1] answer
+            criteria = {criterion: (None, None, None, None, values[0][i], None, None, values[1][i])
+                        for criterion, values in scores.items()}
+            table = io.StringIO()
+            utils.PunctuationCalculator(criteria, {'title': {'P1': title}}, self.profile) \
+                .generate_punctuation_file(table)
+            yield i + 4, title, table.getvalue().splitlines()[1:]
+
+
+def run(input_folder: str = 'arti/in/', output: str = None) -> int:
+    """
+    Use it to compute only the scores and compliance levels of the assessments, e.g. to triage new submissions,
+    without generating the RDF graphs.
+    :param input_folder: the folder with one sub-folder of workbooks per scenario
+    :param output: the score table file path
+    :return: the number of assessments scored
+    """
+    output = output if output else SCORES_PATH
+    start = time.perf_counter()
+    scored = 0
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with camss.open_atomic(output, 'wt') as f:
+        print('workbook', 'row', 'title', '', 'score', 'strength', 'compliance level', sep='\t', file=f)
+        for path in glob.iglob(input_folder + '/**', recursive=False):
+            for file in camss.get_files(path):
+                if not os.path.isfile(path + '/' + file):
+                    continue
+                for row, title, lines in ScoreExtractor(path + '/' + file).iter_tables():
+                    for line in lines:
+                        print(path + '/' + file, row, title, line, sep='\t', file=f)
+                    scored += 1
+    camss.log(f"{scored} assessments scored in {round(time.perf_counter() - start, 2)} s, see '{output}'.")
+    return scored
+
+
+HEADER_ROWS = 4  # header rows of a workbook: scenario, export date and criteria
+SCORES_PATH = 'arti/punct/scores.tsv'  # score table of the scores-only mode
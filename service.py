@@ -0,0 +1,283 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import camssXLSX2RDF as camss
+import nquads
+import readers
+
+
+class Metrics:
+    """
+    Request counters and timings of the conversion service, per stage ('upload', 'convert', 'serialize' and
+    'total'), in seconds. The timeouts are either 'cancelled' (the conversion had not started yet) or 'abandoned'
+    (a worker was converting the workbook, it goes on until the conversion is over).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {'requests': 0, 'converted': 0, 'rejected': 0, 'failed': 0, 'timeouts': 0, 'cancelled': 0,
+                         'abandoned': 0, 'in_flight': 0}
+        self.timings = {}  # stage -> [count, total, max]
+
+    def count(self, counter: str, increment: int = 1):
+        with self.lock:
+            self.counters[counter] += increment
+
+    def time(self, stage: str, elapsed: float):
+        with self.lock:
+            timing = self.timings.setdefault(stage, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+
+    def get_report(self) -> dict:
+        with self.lock:
+            return {'counters': dict(self.counters),
+                    'timings': {stage: {'count': count, 'mean': round(total / count, 4), 'max': round(maximum, 4)}
+                                for stage, (count, total, maximum) in self.timings.items()}}
+
+
+class ConversionService:
+    """
+    Converts uploaded EU Survey/CAMSS workbooks on a bounded worker pool. Each request is converted into its own
+    MemorySink (see camssXLSX2RDF.convert), so the requests share no state: the response holds every entity the
+    assessments refer to, whatever was converted before. The process-wide EIF gradients and SDO justifications stay
+    warm between requests.
+    """
+    workers: int  # size of the worker pool (integer type)
+    max_pending: int  # conversions waiting for a worker before new requests are rejected (integer type)
+    timeout: float  # seconds a request waits for its conversion (float type)
+
+    def __init__(self, workers: int = None, max_pending: int = 8, timeout: float = 300.0):
+        """
+        ConversionService class initializer.
+        :param workers: size of the worker pool
+        :param max_pending: conversions waiting for a worker before new requests are rejected (HTTP 503)
+        :param timeout: seconds a request waits for its conversion before failing (HTTP 504)
+        """
+        self.workers = workers if workers else min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.slots = threading.BoundedSemaphore(self.workers + max_pending)
+        self.metrics = Metrics()
+        # absolute, so that the uploads do not move if the working directory changes while serving
+        self.upload_path = os.path.abspath(os.path.join(camss.CACHE_PATH, 'uploads'))
+        camss.AssessmentScenario.get_gradients()
+
+    @staticmethod
+    def convert(file_path: str) -> camss.MemorySink:
+        """
+        Converts an uploaded workbook.
+        :return: the MemorySink holding the graphs and score tables of the workbook
+        """
+        return camss.convert(file_path, camss.MemorySink())
+
+    def submit(self, file_path: str) -> Future:
+        """
+        Converts an uploaded workbook on the worker pool.
+        :return: the Future of the conversion, see convert()
+        """
+        return self.pool.submit(self.convert, file_path)
+
+    def release(self, upload: str):
+        """
+        Frees the slot and the upload folder of a request once its conversion is over (done, failed or cancelled): a
+        conversion that timed out keeps its slot while a worker is still converting it.
+        """
+        shutil.rmtree(upload, ignore_errors=True)
+        self.slots.release()
+
+    @staticmethod
+    def iter_nquads(sink: camss.MemorySink):
+        """
+        Yields the NQuads of the converted assessments: assessments, specifications and criteria graphs.
+        """
+        for graph in ['ass', 'specs', 'crit']:
+            yield sink.get_nquads(graph)
+
+    @staticmethod
+    def iter_scores(sink: camss.MemorySink):
+        """
+        Yields the score table of the converted assessments: the EIF scenario score table of each assessment, with
+        the specification title as first column.
+        """
+        yield '\t'.join(['title', '', 'score', 'strength', 'compliance level']) + '\n'
+        for title, table in sink.get_scores().items():
+            for line in table.splitlines(keepends=True)[1:]:
+                yield title + '\t' + line
+
+    def serialize(self, sink: camss.MemorySink, target: str) -> str:
+        """
+        Serializes the converted assessments as Turtle or JSON-LD.
+        :param target: 'ttl' or 'json-ld'
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, 'graph.nq')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                for chunk in self.iter_nquads(sink):
+                    f.write(chunk)
+            g = nquads.parse(file_path)
+        if target == 'ttl':
+            g = camss.declare_namespace(g)
+        return g.serialize(format=target)
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    """
+    HTTP interface of the conversion service:
+    POST /convert?name=<workbook file name>&format=nquads|turtle|json-ld|scores, with the workbook as request body
+    GET /metrics, request counters and timings per stage
+    GET /health
+    """
+    service: ConversionService = None
+    protocol_version = 'HTTP/1.1'
+    formats = {'nquads': 'application/n-quads', 'turtle': 'text/turtle', 'json-ld': 'application/ld+json',
+               'scores': 'text/tab-separated-values'}
+
+    def send_text(self, status: int, text: str, content_type: str = 'text/plain'):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type + '; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_chunks(self, chunks, content_type: str):
+        """
+        Streams the response, with chunked transfer encoding.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', content_type + '; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            if data:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/metrics':
+            self.send_text(200, json.dumps(self.service.metrics.get_report(), indent=1), 'application/json')
+        elif path == '/health':
+            self.send_text(200, 'OK')
+        else:
+            self.send_text(404, 'Not found')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/convert':
+            self.send_text(404, 'Not found')
+            return
+        query = parse_qs(url.query)
+        name = os.path.basename(query.get('name', ['upload.xlsx'])[0])
+        output = query.get('format', ['nquads'])[0].lower()
+        length = int(self.headers.get('Content-Length', 0))
+        if output not in self.formats:
+            self.send_text(400, f"Unknown format '{output}', use one of {', '.join(self.formats)}.")
+            return
+        if readers.get_extension(name) not in readers.PREFERENCE or not length:
+            self.send_text(400, 'Upload an xlsx, xlsm, xls or csv workbook as request body.')
+            return
+        service = self.service
+        service.metrics.count('requests')
+        if not service.slots.acquire(blocking=False):
+            # too many conversions in progress or waiting
+            self.rfile.read(length)
+            service.metrics.count('rejected')
+            self.send_response(503)
+            self.send_header('Retry-After', '5')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        start = time.perf_counter()
+        service.metrics.count('in_flight')
+        upload = tempfile.mkdtemp(dir=service.upload_path)
+        future = None
+        try:
+            file_path = os.path.join(upload, name)
+            with open(file_path, 'wb') as f:
+                remaining = length
+                while remaining:
+                    chunk = self.rfile.read(min(remaining, 1 << 20))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            service.metrics.time('upload', time.perf_counter() - start)
+            tic = time.perf_counter()
+            future = service.submit(file_path)
+            try:
+                sink = future.result(timeout=service.timeout)
+            except TimeoutError:
+                service.metrics.count('timeouts')
+                if future.cancel():
+                    # still waiting for a worker: not converted at all
+                    service.metrics.count('cancelled')
+                else:
+                    # a worker is converting it: the slot is only released once it is done, see release()
+                    service.metrics.count('abandoned')
+                self.send_text(504, 'Conversion timed out.')
+                return
+            except Exception as e:
+                service.metrics.count('failed')
+                self.send_text(422, f'The workbook could not be converted: {e}')
+                return
+            service.metrics.time('convert', time.perf_counter() - tic)
+            service.metrics.count('converted')
+            tic = time.perf_counter()
+            if output == 'nquads':
+                self.send_chunks(service.iter_nquads(sink), self.formats[output])
+            elif output == 'scores':
+                self.send_chunks(service.iter_scores(sink), self.formats[output])
+            else:
+                content = service.serialize(sink, 'ttl' if output == 'turtle' else 'json-ld')
+                self.send_text(200, content, self.formats[output])
+            service.metrics.time('serialize', time.perf_counter() - tic)
+        finally:
+            if future is None:
+                service.release(upload)
+            else:
+                # at once if the conversion is over, otherwise when the worker is done with it
+                future.add_done_callback(lambda _: service.release(upload))
+            service.metrics.count('in_flight', -1)
+            service.metrics.time('total', time.perf_counter() - start)
+
+    def log_message(self, format: str, *args):
+        camss.logging.info(format % args)
+
+
+def serve(host: str = '127.0.0.1', port: int = 8080, **kwargs) -> ThreadingHTTPServer:
+    """
+    Creates the HTTP conversion service, listening on localhost by default; call serve_forever() on it to run it,
+    or shutdown() to stop it.
+    :param host: the interface to listen on
+    :param port: the port to listen on, 0 for any free port
+    :param kwargs: see ConversionService
+    :return: the HTTP server
+    """
+    service = ConversionService(**kwargs)
+    os.makedirs(service.upload_path, exist_ok=True)
+    handler = type('Handler', (ConversionHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == '__main__':
+    server = serve(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8080)
+    camss.log(f'Serving on http://{server.server_address[0]}:{server.server_address[1]}/convert')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
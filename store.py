@@ -0,0 +1,254 @@
+import os
+import sys
+import time
+import sqlite3
+from collections import Counter
+
+import pandas as pd
+
+import camssXLSX2RDF as camss
+import delta
+import nquads
+
+
+def available() -> bool:
+    """
+    Whether the optional pyoxigraph package (embedded Oxigraph RDF store) is installed.
+    """
+    try:
+        import pyoxigraph
+    except ImportError:
+        return False
+    return True
+
+
+class LocalStore:
+    """
+    Embedded, on-disk RDF store (Oxigraph, running in-process, no server) holding the quads of the 'ass', 'crit' and
+    'specs' datasets, to run SPARQL queries without parsing the N-Quads files every time. sync() keeps it up to date
+    from the output files that changed since the last sync: a manifest ('manifest.sqlite') records the size and
+    modification time of every file loaded, the canonical quads it held (see delta.py) and, per quad, the number of
+    files holding it. Only the changed files are read, and only the quads no file holds any more are removed, the
+    additions bulk-loaded in batches.
+    """
+    path: str  # the store folder (string type)
+
+    def __init__(self, path: str = None):
+        """
+        LocalStore class initializer. Opens the store, creating it the first time.
+        :param path: the store folder, STORE_PATH by default
+        """
+        try:
+            import pyoxigraph
+        except ImportError:
+            raise Exception('The local RDF store needs the optional pyoxigraph package (pip install pyoxigraph).')
+        self.ox = pyoxigraph
+        self.path = camss.slash(path if path else STORE_PATH)
+        os.makedirs(self.path, exist_ok=True)
+        self.store = pyoxigraph.Store(self.path + 'data')
+        self.manifest = sqlite3.connect(self.path + 'manifest.sqlite')
+        self.manifest.executescript(MANIFEST_SCHEMA)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def get_snapshot(self, graph: str) -> str:
+        """
+        Returns the file path of the canonical snapshot of a dataset, as loaded into the store by the versions before
+        the manifest; it is only read once, to remove the quads of the dataset deleted since.
+        """
+        return f'{self.path}{graph}-graph.nq.gz'
+
+    @staticmethod
+    def get_signature(file_path: str) -> str:
+        stat = os.stat(file_path)
+        return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+    def get_changes(self, graph: str, files: list) -> (Counter, dict):
+        """
+        Compares the output files of a dataset with the manifest.
+        :return: the change of the number of files holding each quad, and the canonical quads of the new or changed
+        files (an empty list for the deleted ones)
+        """
+        signatures = {file_path: self.get_signature(file_path) for file_path in files}
+        known = dict(self.manifest.execute('SELECT file_path, signature FROM files WHERE graph = ?', (graph,)))
+        changed = {file_path: delta.canonicalize([file_path]) for file_path, signature in signatures.items()
+                   if known.get(file_path) != signature}
+        changed.update({file_path: [] for file_path in known if file_path not in signatures})
+        changes = Counter()
+        for file_path, lines in changed.items():
+            for line, in self.manifest.execute('SELECT r.line FROM quads q JOIN refs r USING (line_id) '
+                                               'WHERE q.file_path = ?', (file_path,)):
+                changes[line] -= 1
+            for line in lines:
+                changes[line] += 1
+        return changes, {file_path: (signatures.get(file_path), lines) for file_path, lines in changed.items()}
+
+    def add(self, lines: list) -> int:
+        if lines:
+            self.store.bulk_load(input=('\n'.join(lines) + '\n').encode('utf-8'), format=self.ox.RdfFormat.N_QUADS)
+        return len(lines)
+
+    def remove(self, lines: list) -> int:
+        if lines:
+            for quad in self.ox.parse(input=('\n'.join(lines) + '\n').encode('utf-8'),
+                                      format=self.ox.RdfFormat.N_QUADS):
+                self.store.remove(quad)
+        return len(lines)
+
+    def sync(self, graphs: list = None, batch_size: int = None) -> dict:
+        """
+        Applies the changes of the datasets since the last sync: quads of the new assessments added, of the deleted
+        ones removed, both in batches. The graphs without any output are left as they are.
+        :param graphs: the graphs synchronised, 'ass', 'crit' and 'specs' by default
+        :param batch_size: number of quads added or removed at once, BATCH_SIZE by default
+        :return: (additions, removals, quads) per graph
+        """
+        batch_size = batch_size if batch_size else BATCH_SIZE
+        report = {}
+        m = self.manifest
+        for graph in graphs if graphs else delta.GRAPHS:
+            files = nquads.get_graph_files(f'arti/out/{graph}/')
+            if not files:
+                continue
+            changes, changed = self.get_changes(graph, files)
+            added = removed = 0
+            additions = []
+            removals = []
+            # a quad is added when a first file holds it, removed when no file holds it any more: the additions and
+            # removals are distinct quads, their batches can be applied in any order
+            for line, change in changes.items():
+                if not change:
+                    continue
+                row = m.execute('SELECT line_id, count FROM refs WHERE graph = ? AND line = ?',
+                                (graph, line)).fetchone()
+                count = (row[1] if row else 0) + change
+                if row is None:
+                    m.execute('INSERT INTO refs (graph, line, count) VALUES (?, ?, ?)', (graph, line, count))
+                elif count > 0:
+                    m.execute('UPDATE refs SET count = ? WHERE line_id = ?', (count, row[0]))
+                else:
+                    m.execute('DELETE FROM refs WHERE line_id = ?', (row[0],))
+                if row is None and count > 0:
+                    additions.append(line)
+                elif row is not None and count <= 0:
+                    removals.append(line)
+                if len(additions) >= batch_size:
+                    added += self.add(additions)
+                    additions = []
+                if len(removals) >= batch_size:
+                    removed += self.remove(removals)
+                    removals = []
+            for file_path, (signature, lines) in changed.items():
+                m.execute('DELETE FROM quads WHERE file_path = ?', (file_path,))
+                m.execute('DELETE FROM files WHERE file_path = ?', (file_path,))
+                if signature is not None:
+                    m.executemany('INSERT INTO quads SELECT ?, line_id FROM refs WHERE graph = ? AND line = ?',
+                                  [(file_path, graph, line) for line in lines])
+                    m.execute('INSERT INTO files VALUES (?, ?, ?)', (file_path, graph, signature))
+            snapshot = self.get_snapshot(graph)
+            for line in delta.iter_snapshot(snapshot):
+                # loaded before the manifest, and deleted since
+                if m.execute('SELECT 1 FROM refs WHERE graph = ? AND line = ?', (graph, line)).fetchone() is None:
+                    removals.append(line)
+            added += self.add(additions)
+            removed += self.remove(removals)
+            self.store.flush()
+            # the manifest is only committed once the store holds the changes: an interrupted sync is applied again
+            m.commit()
+            if os.path.isfile(snapshot):
+                os.remove(snapshot)
+            quads = m.execute('SELECT count(*) FROM refs WHERE graph = ?', (graph,)).fetchone()[0]
+            report[graph] = (added, removed, quads)
+        return report
+
+    def query(self, sparql: str, union: bool = True):
+        """
+        Runs a SPARQL query against the store.
+        :param sparql: the SPARQL query
+        :param union: whether the default graph is the union of all the graphs, so that the queries need no GRAPH
+        clause
+        :return: a DataFrame for a SELECT query (one column per variable, the terms' values, None when unbound), a
+        boolean for an ASK query, and a list of (subject, predicate, object) in N-Triples syntax for a CONSTRUCT or
+        DESCRIBE query
+        """
+        result = self.store.query(sparql, use_default_graph_as_union=union)
+        if isinstance(result, self.ox.QueryBoolean):
+            return bool(result)
+        if isinstance(result, self.ox.QuerySolutions):
+            variables = [variable.value for variable in result.variables]
+            return pd.DataFrame([[term.value if term is not None else None for term in solution]
+                                 for solution in result], columns=variables)
+        return [(str(triple.subject), str(triple.predicate), str(triple.object)) for triple in result]
+
+    def close(self):
+        self.store = None
+        self.manifest.close()
+
+
+def get_store(path: str = None) -> LocalStore:
+    """
+    Returns the local RDF store of the current process, opening it the first time: a store folder can only be
+    opened once at a time.
+    """
+    global STORE
+    if STORE is None or (path is not None and STORE.path != camss.slash(path)):
+        if STORE is not None:
+            STORE.close()
+        STORE = LocalStore(path)
+    return STORE
+
+
+def load(graphs: list = None, path: str = None) -> dict:
+    """
+    Use it to load the converted assessments into the local RDF store, e.g. after run() or __merge_graphs__; only
+    the quads changed since the previous load are written. The datasets are read as nquads.get_graph_files() finds
+    them: the merged dataset when there is one, the per-assessment files and shards otherwise.
+    :param graphs: the graphs loaded, 'ass', 'crit' and 'specs' by default
+    :param path: the store folder, STORE_PATH by default
+    :return: (additions, removals, quads) per graph
+    """
+    start = time.perf_counter()
+    store = get_store(path)
+    report = store.sync(graphs)
+    camss.log(f"Local RDF store '{store.path}' synchronised in {round(time.perf_counter() - start, 2)} s: "
+              + ', '.join(f'{graph} +{added} -{removed}' for graph, (added, removed, _) in report.items()))
+    return report
+
+
+def query(sparql: str, path: str = None, union: bool = True):
+    """
+    Use it to query the converted assessments loaded with load(), see LocalStore.query.
+    """
+    return get_store(path).query(sparql, union)
+
+
+BATCH_SIZE = 50000  # quads added or removed at once
+STORE_PATH = 'arti/store/'  # the local RDF store and the manifest of the output files it holds
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_path TEXT PRIMARY KEY,
+    graph TEXT,
+    signature TEXT
+);
+CREATE TABLE IF NOT EXISTS refs (
+    line_id INTEGER PRIMARY KEY,
+    graph TEXT,
+    line TEXT,
+    count INTEGER,
+    UNIQUE (graph, line)
+);
+CREATE TABLE IF NOT EXISTS quads (
+    file_path TEXT,
+    line_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS quads_file ON quads (file_path);
+"""
+STORE = None  # local RDF store of the process, see get_store()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        print(query(sys.argv[1]))
+    else:
+        delta.print_report(load())
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import camssXLSX2RDF as camss
+import memory
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """
+    Runs every test in its own working folder ('arti/' layout), the process-wide caches, registry and shard indexes
+    reset.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(camss, 'REGISTRY', None)
+    monkeypatch.setattr(camss, 'WORKBOOK_CACHE', None)
+    camss.SHARDED_OUTPUTS.clear()
+    yield tmp_path
+    camss.SHARDED_OUTPUTS.clear()
+
+
+@pytest.fixture
+def workbook(workdir):
+    """
+    A synthetic EIF workbook of 'arti/in/', see memory.write_synthetic.
+    """
+    os.makedirs('arti/in/EIF600')
+    file_path = os.path.abspath('arti/in/EIF600/Content_Export_CAMSSAssessmentEIFScenario6_synthetic.xlsx')
+    memory.write_synthetic(file_path, ASSESSMENTS)
+    return file_path
+
+
+ASSESSMENTS = 6  # assessments of the synthetic workbooks
@@ -0,0 +1,19 @@
+import csv
+
+import analytics
+import camssXLSX2RDF as camss
+from conftest import ASSESSMENTS
+
+
+def test_report_matches_score_tables(workbook):
+    camss.run('arti/in/', index=True, progress=[])
+    tables = analytics.report()
+    overall = tables['assessments'].set_index('title')
+    categories = tables['categories']
+    assert len(overall) == ASSESSMENTS
+    for title, row in overall.iterrows():
+        with open(f'arti/punct/{title}-EIFScenario-scores.csv', encoding='utf-8') as f:
+            lines = list(csv.reader(f, delimiter='\t'))
+        levels = categories[categories.title == title].sort_values('category')['compliance_level'].tolist()
+        assert levels == [line[3] for line in lines[1:6]]
+        assert f'{row.score}/{row.maximum}' == lines[6][1]
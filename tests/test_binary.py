@@ -0,0 +1,20 @@
+import binary
+import nquads
+
+
+def test_round_trip(workdir):
+    nquads.write_synthetic('graph.nq', 1000)
+    binary.write(['graph.nq'], 'graph' + binary.EXTENSION)
+    with binary.BinaryDataset('graph' + binary.EXTENSION) as dataset:
+        lines = list(dataset.iter_lines())
+    assert sorted(lines) == sorted(line for line in nquads.iter_lines('graph.nq') if line.strip())
+
+
+def test_close_with_views(workdir):
+    nquads.write_synthetic('graph.nq', 1000)
+    binary.write(['graph.nq'], 'graph' + binary.EXTENSION)
+    dataset = binary.BinaryDataset('graph' + binary.EXTENSION)
+    quads = dataset.quads[:10]
+    dataset.close()
+    # still mapped while the view is alive
+    assert quads.shape == (10, 4) and int(quads.max()) < dataset.terms
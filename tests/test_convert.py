@@ -0,0 +1,47 @@
+import json
+import os
+import zipfile
+
+import camssXLSX2RDF as camss
+import equivalence
+
+
+def test_sink_matches_files(workbook):
+    results = equivalence.compare(['sink', 'consolidated'], workbooks=[workbook], synthetic=[])
+    assert [result['engine'] for result in results] == ['sink', 'consolidated']
+    for result in results:
+        assert result['equivalent'], result['examples']
+        assert result['quads'] > 0 and result['tables'] > 0
+
+
+def test_archive_members_written_once(workbook):
+    with camss.ArchiveSink('outputs.zip') as sink:
+        camss.convert(workbook, sink)
+    with zipfile.ZipFile('outputs.zip') as archive:
+        names = archive.namelist()
+    assert len(names) == len(set(names))
+    assert len([name for name in names if name.startswith('crit/nq/')]) == 1
+
+
+def test_convert_leaves_working_folder(workbook):
+    before = sorted(os.listdir('arti'))
+    sink = camss.convert(workbook)
+    assert sink.get_nquads('ass') and sink.get_nquads('crit') and sink.get_nquads('specs')
+    assert sorted(os.listdir('arti')) == before
+
+
+def test_convert_ignores_working_folder(workbook, tmp_path, monkeypatch):
+    os.makedirs(tmp_path / 'empty')
+    monkeypatch.chdir(tmp_path / 'empty')
+    expected = camss.convert(workbook)
+    assert os.listdir('.') == [] and camss.REGISTRY is None
+    # a registry persisted by the pipeline in the working folder, with other contact point uuids
+    entities = {kind: {entity_id: {'uuid': camss.stable_id('elsewhere', entity_id), 'emitted': {}}
+                       for entity_id in ids} for kind, ids in expected.registry.entities.items()}
+    os.makedirs('arti')
+    with open(camss.ENTITIES_PATH, 'w', encoding='utf-8') as f:
+        json.dump(entities, f)
+    sink = camss.convert(workbook)
+    assert camss.REGISTRY is None
+    for graph in ('ass', 'crit', 'specs'):
+        assert sink.get_nquads(graph) == expected.get_nquads(graph)
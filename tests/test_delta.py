@@ -0,0 +1,39 @@
+import datetime
+import shutil
+
+import camssXLSX2RDF as camss
+import delta
+
+
+class Tomorrow(datetime.date):
+
+    @classmethod
+    def today(cls):
+        return TOMORROW
+
+
+TOMORROW = datetime.date.today() + datetime.timedelta(days=1)
+
+
+def convert():
+    camss.run('arti/in/', progress=[])
+    camss.__merge_graphs__()
+
+
+def test_rerun_gives_empty_changeset(workbook, monkeypatch):
+    convert()
+    report = delta.changeset()
+    assert all(added == quads and not removed for added, removed, quads in report.values())
+    delta.publish()
+    # a full rerun from scratch, on another day
+    shutil.rmtree('arti/out')
+    monkeypatch.setattr(camss, 'REGISTRY', None)
+    monkeypatch.setattr(camss.datetime, 'date', Tomorrow)
+    convert()
+    report = delta.changeset()
+    assert report and all(not added and not removed for added, removed, _ in report.values())
+
+
+def test_assessment_date_is_export_date(workbook):
+    sink = camss.convert(workbook)
+    assert f'"2023-11-20"^^<{camss.XSD}date>' in sink.get_nquads('ass')
@@ -0,0 +1,35 @@
+import camssXLSX2RDF as camss
+import index
+from conftest import ASSESSMENTS
+
+
+def count(ass_index, table):
+    return ass_index.query(f'SELECT count(*) FROM {table}')[0][0]
+
+
+def test_reindex_replaces_judgements(workbook):
+    ass_index = index.AssessmentIndex()
+    extractors = [camss.Extractor(workbook, row) for row in range(4, 4 + ASSESSMENTS)]
+    for extractor in extractors:
+        ass_index.add(extractor, workbook)
+    judgements = count(ass_index, 'judgements')
+    assert judgements and count(ass_index, 'judgements_map') == judgements
+    for extractor in extractors[:2]:
+        ass_index.add(extractor, workbook)
+    assert count(ass_index, 'judgements') == judgements
+    assert len(ass_index.search('justification')) == min(judgements, 100)
+    ass_index.close()
+
+
+def test_judgements_map_filled_for_older_index(workbook):
+    ass_index = index.AssessmentIndex()
+    extractor = camss.Extractor(workbook, 4)
+    ass_index.add(extractor, workbook)
+    ass_index.connection.execute('DROP TABLE judgements_map')
+    ass_index.close()
+    ass_index = index.AssessmentIndex()
+    judgements = count(ass_index, 'judgements')
+    assert count(ass_index, 'judgements_map') == judgements
+    ass_index.add(extractor, workbook)
+    assert count(ass_index, 'judgements') == judgements
+    ass_index.close()
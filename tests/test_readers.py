@@ -0,0 +1,11 @@
+import pytest
+
+import readers
+
+
+@pytest.mark.parametrize('backend', [reader.name for reader in readers.READERS.values()
+                                     if reader.available() and '.xlsx' in reader.extensions])
+def test_read_columns_matches_read(workbook, backend):
+    columns = [11, 3, 40]
+    expected = readers.read(workbook, backend)[columns]
+    assert readers.read_columns(workbook, columns, backend).equals(expected)
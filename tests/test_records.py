@@ -0,0 +1,37 @@
+import pytest
+
+import camssXLSX2RDF as camss
+import records
+from conftest import ASSESSMENTS
+
+
+def assert_same(record, d):
+    assert sorted(record.keys()) == sorted(d.keys())
+    for key, value in d.items():
+        if isinstance(value, dict):
+            assert_same(record[key], value)
+        else:
+            assert record[key] == value or (value != value and record[key] != record[key]), key
+
+
+def test_records_read_as_dictionaries(workbook, monkeypatch):
+    for row in range(4, 4 + ASSESSMENTS):
+        extractor = camss.Extractor(workbook, row)
+        assert isinstance(extractor.ass_dict, records.Assessment)
+        monkeypatch.setattr(camss, 'RECORDS', False)
+        expected = camss.Extractor(workbook, row)
+        monkeypatch.setattr(camss, 'RECORDS', True)
+        assert_same(extractor.ass_dict, expected.ass_dict)
+        assert [[values[i] for i in range(len(values))] for values in extractor.criteria.values()] == \
+            list(expected.criteria.values())
+    with pytest.raises(KeyError):
+        extractor.ass_dict['title']['unknown']
+
+
+def test_records_convert_as_dictionaries(workbook, monkeypatch):
+    sink = camss.convert(workbook)
+    monkeypatch.setattr(camss, 'RECORDS', False)
+    expected = camss.convert(workbook)
+    for graph in ('ass', 'crit', 'specs'):
+        assert sink.get_nquads(graph) == expected.get_nquads(graph)
+    assert sink.get_scores() == expected.get_scores()
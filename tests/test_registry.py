@@ -0,0 +1,52 @@
+import io
+import sys
+import threading
+
+import camssXLSX2RDF as camss
+
+
+def test_concurrent_emit_writes_once(workdir):
+    registry = camss.EntityRegistry(persistent=False, exists=lambda file_path: True)
+    lines = ['<urn:a> <urn:b> <urn:c> <urn:g> .']
+    outputs = [io.StringIO() for _ in range(8)]
+    barrier = threading.Barrier(len(outputs))
+
+    def emit(i):
+        barrier.wait()
+        for _ in range(200):
+            registry.emit('organization', 'org', lines, f'file-{i}.nq', outputs[i])
+
+    interval = sys.getswitchinterval()
+    # threads switched as often as possible, e.g. between the check and the record of an emit
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=emit, args=(i,)) for i in range(len(outputs))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert sum(output.getvalue().count('\n') for output in outputs) == 1
+
+
+def test_concurrent_first_use_shares_globals(workdir):
+    results = []
+    barrier = threading.Barrier(8)
+
+    def first_use():
+        barrier.wait()
+        results.append((camss.get_registry(), camss.get_workbook_cache(), camss.get_sharded_output('arti/out/ass/')))
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=first_use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert len(results) == 8
+    assert all(len({id(result[i]) for result in results}) == 1 for i in range(3))
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+import camssXLSX2RDF as camss
+import equivalence
+import memory
+from conftest import ASSESSMENTS
+
+
+def get_outputs() -> (list, dict):
+    lines, tables = equivalence.read_outputs()
+    return equivalence.canonicalize(lines)[0], tables
+
+
+def test_resume_skips_converted_rows(workbook, capsys):
+    camss.run('arti/in/', progress=[])
+    outputs = get_outputs()
+    mtime = os.path.getmtime('arti/out/crit/nq/EIF-6.0.0-criteria.nq')
+    camss.run('arti/in/', resume=True, progress=[])
+    assert f'{ASSESSMENTS} assessments converted by the previous run were skipped.' in capsys.readouterr().out
+    assert get_outputs() == outputs
+    assert os.path.getmtime('arti/out/crit/nq/EIF-6.0.0-criteria.nq') == mtime
+
+
+@pytest.mark.parametrize('consolidated', [False, True])
+def test_resume_after_edit(workbook, consolidated):
+    camss.run('arti/in/', consolidated=consolidated, progress=[])
+    before = get_outputs()
+    memory.write_synthetic(workbook, ASSESSMENTS, seed=1)
+    camss.run('arti/in/', consolidated=consolidated, resume=True, progress=[])
+    sink = camss.convert(workbook)
+    expected = equivalence.canonicalize(sink.get_nquads().splitlines())[0], \
+        {title: table.splitlines() for title, table in sink.get_scores().items()}
+    assert get_outputs() == expected != before
@@ -0,0 +1,39 @@
+import random
+
+import utils
+
+
+def test_levels_match_bisect():
+    profile = utils.get_profile('EIF')
+    for category, (_, start, end) in enumerate(profile.categories, start=1):
+        scores = list(range(-1, (end - start) * profile.maximum + 2))
+        assert list(profile.get_levels(category, scores)) == [profile.get_level(category, score) for score in scores]
+
+
+def test_calculator_scores_categories():
+    profile = utils.get_profile('EIF')
+    rng = random.Random(7)
+    answers = [rng.choice(['Yes', 'No', 'Not applicable']) for _ in range(profile.criteria)]
+    criteria = {f'A{i}': [None, None, None, None, str(rng.choice([0, 20, 40, 60, 80, 100])), None, None, answer]
+                for i, answer in enumerate(answers, start=1)}
+    ass_punct = utils.PunctuationCalculator(criteria, {'contextualised_by': {'scenario': 'EIF'}}).run_criteria()
+    for category, (_, start, end) in enumerate(profile.categories, start=1):
+        score = sum(int(values[4]) for values in list(criteria.values())[start:end])
+        assert ass_punct[category - 1][0] == score
+        assert ass_punct[category - 1][3] == profile.get_level(category, score)
+        assert ass_punct[category - 1][4] == answers[start:end].count('Not applicable')
+    assert ass_punct[-1] == profile.criteria
+
+
+def test_msp_and_ts_not_scored():
+    assert utils.get_profile('MSP') is None and utils.get_profile('TS', '1.0.0') is None
+
+
+def test_scores_only_titles_match_extractor(workbook):
+    import camssXLSX2RDF as camss
+    import scores
+
+    titles = [title for _, title, _ in scores.ScoreExtractor(workbook).iter_tables()]
+    assert titles == [camss.Extractor(workbook, row).ass_title for row in range(4, 4 + len(titles))]
+    assert camss.Extractor.normalize_title(' Spec \n  Title\t1 ') == 'Spec Title 1'
+    assert camss.Extractor.normalize_title(2024) == '2024'
@@ -0,0 +1,111 @@
+import http.client
+import threading
+
+import pytest
+
+import camssXLSX2RDF as camss
+import equivalence
+import memory
+import service
+from conftest import ASSESSMENTS
+
+
+@pytest.fixture
+def server():
+    server = service.serve(port=0, workers=1, max_pending=0, timeout=30)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.RequestHandlerClass.service.pool.shutdown(wait=True)
+
+
+def post(server, file_path: str, output: str = 'nquads') -> (int, str):
+    with open(file_path, 'rb') as f:
+        body = f.read()
+    connection = http.client.HTTPConnection(*server.server_address, timeout=60)
+    try:
+        connection.request('POST', f'/convert?name=workbook.xlsx&format={output}', body)
+        response = connection.getresponse()
+        return response.status, response.read().decode('utf-8')
+    finally:
+        connection.close()
+
+
+def test_requests_isolated(server, workbook, tmp_path):
+    # the same submitters and SDOs, other answers
+    edited = str(tmp_path / 'edited.xlsx')
+    memory.write_synthetic(edited, ASSESSMENTS, seed=1)
+    for file_path in [workbook, edited, workbook]:
+        status, content = post(server, file_path)
+        assert status == 200
+        expected, _ = equivalence.canonicalize(camss.convert(file_path).get_nquads().splitlines())
+        assert equivalence.canonicalize(content.splitlines())[0] == expected
+        assert f'<{camss.SCHEMA}ContactPoint>' in content
+    status, content = post(server, edited, 'scores')
+    assert status == 200
+    assert len(content.splitlines()) > ASSESSMENTS
+
+
+def test_timed_out_conversion_keeps_slot(server, workbook, monkeypatch):
+    conversion = server.RequestHandlerClass.service
+    started = threading.Event()
+    proceed = threading.Event()
+    convert = conversion.convert
+
+    def slow(file_path):
+        started.set()
+        proceed.wait(30)
+        return convert(file_path)
+
+    monkeypatch.setattr(conversion, 'convert', slow)
+    monkeypatch.setattr(conversion, 'timeout', 0.1)
+    assert post(server, workbook)[0] == 504
+    assert started.is_set()
+    # the only worker is still converting
+    assert post(server, workbook)[0] == 503
+    proceed.set()
+    conversion.pool.submit(lambda: None).result(30)
+    monkeypatch.setattr(conversion, 'timeout', 30)
+    assert post(server, workbook)[0] == 200
+    counters = conversion.metrics.get_report()['counters']
+    assert (counters['timeouts'], counters['abandoned'], counters['cancelled']) == (1, 1, 0)
+
+
+def test_uploads_kept_out_of_working_folder(server, workbook, tmp_path, monkeypatch):
+    conversion = server.RequestHandlerClass.service
+    assert conversion.upload_path == str(tmp_path / camss.CACHE_PATH / 'uploads')
+    (tmp_path / 'elsewhere').mkdir()
+    monkeypatch.chdir(tmp_path / 'elsewhere')
+    assert post(server, workbook)[0] == 200
+    assert not (tmp_path / 'elsewhere' / 'arti').exists()
+
+
+def test_queued_conversion_cancelled(workbook, monkeypatch):
+    server = service.serve(port=0, workers=1, max_pending=1, timeout=0.1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conversion = server.RequestHandlerClass.service
+    started = threading.Event()
+    proceed = threading.Event()
+    convert = conversion.convert
+
+    def slow(file_path):
+        started.set()
+        proceed.wait(30)
+        return convert(file_path)
+
+    monkeypatch.setattr(conversion, 'convert', slow)
+    try:
+        # abandoned while the only worker converts it, then cancelled while waiting for that worker
+        assert post(server, workbook)[0] == 504
+        assert started.is_set()
+        assert post(server, workbook)[0] == 504
+    finally:
+        proceed.set()
+        conversion.pool.submit(lambda: None).result(30)
+    monkeypatch.setattr(conversion, 'timeout', 30)
+    assert post(server, workbook)[0] == 200
+    server.shutdown()
+    conversion.pool.shutdown(wait=True)
+    counters = conversion.metrics.get_report()['counters']
+    assert (counters['timeouts'], counters['abandoned'], counters['cancelled']) == (2, 1, 1)
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+import camssXLSX2RDF as camss
+import delta
+import memory
+import nquads
+from conftest import ASSESSMENTS
+
+pyoxigraph = pytest.importorskip('pyoxigraph')
+import store
+
+
+def assert_synchronised(local_store):
+    quads = set()
+    for graph in delta.GRAPHS:
+        quads.update(delta.canonicalize(nquads.get_graph_files(f'arti/out/{graph}/')))
+    assert len(local_store) == len(quads)
+
+
+@pytest.fixture
+def local_store(workdir):
+    local_store = store.get_store()
+    yield local_store
+    local_store.close()
+    store.STORE = None
+
+
+def test_sync_add_edit_remove(workbook, local_store):
+    camss.run('arti/in/', progress=[])
+    report = local_store.sync()
+    assert report['ass'][0] == report['ass'][2] > 0 and report['ass'][1] == 0
+    assert_synchronised(local_store)
+    assert local_store.sync() == {graph: (0, 0, quads) for graph, (_, _, quads) in report.items()}
+    assessments = f'SELECT ?a WHERE {{ ?a a <{camss.CAV}Assessment> }}'
+    assert len(local_store.query(assessments)) == ASSESSMENTS
+
+    # edited answers, the same assessments
+    memory.write_synthetic(workbook, ASSESSMENTS, seed=1)
+    camss.run('arti/in/', resume=True, progress=[])
+    added, removed, _ = local_store.sync()['ass']
+    assert added and removed
+    assert_synchronised(local_store)
+    assert len(local_store.query(assessments)) == ASSESSMENTS
+
+    # an assessment deleted
+    removed_file = sorted(camss.get_files('arti/out/ass/nq/'))[0]
+    os.remove('arti/out/ass/nq/' + removed_file)
+    added, removed, _ = local_store.sync()['ass']
+    assert not added and removed
+    assert_synchronised(local_store)
+    assert len(local_store.query(assessments)) == ASSESSMENTS - 1
@@ -0,0 +1,33 @@
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def text_file(workdir):
+    lines = [f'line {i}' + (' match' if i % 7 == 0 else '') for i in range(1, 501)]
+    with open('file.nq', 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return 'file.nq', lines
+
+
+@pytest.mark.parametrize('chunk_size', [5, 64, 1 << 20])
+def test_search_line_numbers(text_file, monkeypatch, chunk_size):
+    monkeypatch.setattr(utils, 'CHUNK_SIZE', chunk_size)
+    file_path, lines = text_file
+    expected = [(i + 1, line) for i, line in enumerate(lines) if 'match' in line]
+    with utils.FileViewer(file_path) as viewer:
+        assert list(viewer.search('match', limit=None)) == expected
+        assert list(viewer.search(r'MAT?CH', regex=True, ignore_case=True, limit=3)) == expected[:3]
+        assert viewer.goto(250)[3][0] == lines[249]
+
+
+def test_display_closes_previous_viewer(text_file, monkeypatch):
+    monkeypatch.setattr(utils, 'display', lambda *args: None)
+    file_path, _ = text_file
+    utils.display_filecontent(file_path)
+    viewer, _ = utils.VIEWER
+    utils.display_filecontent(file_path)
+    assert viewer.file.closed and viewer.mm.closed
+    utils.display_filecontent(None)
+    assert utils.VIEWER is None
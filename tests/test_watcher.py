@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+import camssXLSX2RDF as camss
+import equivalence
+import memory
+import watcher
+from conftest import ASSESSMENTS
+
+
+@pytest.fixture
+def watch(workbook):
+    w = watcher.Watcher('arti/in/', debounce=0, targets=[])
+    yield w
+    w.pool.shutdown(wait=True)
+
+
+def test_idle_workbooks_not_hashed(watch, workbook, monkeypatch):
+    assert watch.poll() == 0  # first seen
+    assert watch.poll() == 1
+    keys = []
+    get_key = camss.WorkbookCache.get_key
+    monkeypatch.setattr(camss.WorkbookCache, 'get_key', staticmethod(lambda file_path: keys.append(file_path)
+                                                                     or get_key(file_path)))
+    for _ in range(5):
+        assert watch.poll() == 0
+    assert keys == []
+    assert watch.pending == {}
+    # touched but unchanged: hashed once, not converted
+    os.utime(workbook, (os.path.getatime(workbook), os.path.getmtime(workbook) + 10))
+    assert watch.poll() == 0
+    assert watch.poll() == 0
+    assert watch.poll() == 0
+    assert len(keys) == 1
+
+
+@pytest.mark.parametrize('consolidated', [False, True])
+def test_edited_workbook_replaced(watch, workbook, consolidated):
+    watch.consolidated = consolidated
+    watch.poll()
+    assert watch.poll() == 1
+    before, _ = equivalence.canonicalize(equivalence.read_outputs()[0])
+    memory.write_synthetic(workbook, ASSESSMENTS, seed=1)
+    os.utime(workbook, (os.path.getatime(workbook), os.path.getmtime(workbook) + 10))
+    watch.poll()
+    assert watch.poll() == 1
+    lines, tables = equivalence.read_outputs()
+    sink = camss.convert(workbook)
+    expected, _ = equivalence.canonicalize(sink.get_nquads().splitlines())
+    assert equivalence.canonicalize(lines)[0] == expected != before
+    assert tables == {title: table.splitlines() for title, table in sink.get_scores().items()}
@@ -1,9 +1,15 @@
-from time import sleep
 from IPython.core.display import display, HTML
 from IPython.display import Javascript, display
 import ipywidgets as widgets
 import os
 import re
+import mmap
+import time
+import bisect
+import logging
+import threading
+import numpy as np
+from contextlib import nullcontext
 from tqdm.auto import tqdm
 
 ###########################################
@@ -24,22 +30,269 @@ def set_name(filename: str):
 def run_all(ev):
     display(Javascript('IPython.notebook.execute_cells_below()'))
 
-def fileselector():
-    return os.getcwd() + '/arti/out/'
+def fileselector(out_path: str = 'arti/out/'):
+    return os.path.join(os.path.abspath(out_path), '')
 
-def file_validator(filepath):
-    pattern = re.compile(r'(.*\/)(.*?)$')
+class FileViewer:
+    """
+    Read-only, memory-mapped view of an output file, however large: pages of lines from the head, the tail or any
+    line number, and a search streamed through the file, without ever reading the whole file into memory. The pages
+    are (start, end, first line number, lines), start and end being byte offsets, and the line numbers starting at 1
+    (None when the page was reached from the tail, as the lines before it are not counted).
+    """
+    file_path: str  # the viewed file path (string type)
+    page_size: int  # number of lines per page (integer type)
+    size: int  # file size in bytes (integer type)
+
+    def __init__(self, file_path: str, page_size: int = 50):
+        """
+        FileViewer class initializer. Maps the file into memory.
+        :param file_path: the (uncompressed) file path
+        :param page_size: number of lines per page
+        """
+        if file_path.endswith(('.gz', '.xz')):
+            raise ValueError(f"'{file_path}' is compressed, decompress it first to browse it.")
+        self.file_path = file_path
+        self.page_size = page_size
+        self.file = open(file_path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        # an empty file cannot be mapped
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.known = [(1, 0)]  # (line number, byte offset) of the lines already found, sorted
+
+    def decode(self, start: int, end: int) -> str:
+        return self.mm[start:end].decode('utf-8', errors='replace').rstrip('\r\n')
+
+    def next_line(self, position: int) -> int:
+        """
+        Returns the byte offset of the line after the one at position.
+        """
+        end = self.mm.find(b'\n', position)
+        return self.size if end < 0 else end + 1
+
+    def previous_line(self, position: int) -> int:
+        """
+        Returns the byte offset of the line before the one starting at position.
+        """
+        if position <= 0:
+            return 0
+        return self.mm.rfind(b'\n', 0, position - 1) + 1
+
+    def read(self, start: int, line: int = None, count: int = None) -> (int, int, int, list):
+        """
+        Reads a page of lines from a line start.
+        :param start: byte offset of the first line
+        :param line: number of the first line, if known
+        :param count: number of lines, page_size by default
+        """
+        count = count if count else self.page_size
+        lines = []
+        position = start
+        while len(lines) < count and position < self.size:
+            end = self.next_line(position)
+            lines.append(self.decode(position, end))
+            position = end
+        return start, position, line, lines
+
+    def find_line(self, line: int) -> int:
+        """
+        Returns the byte offset of a line, the end of the file after the last line. The newlines are counted by
+        chunks from the closest line already found.
+        """
+        number, position = self.known[max(bisect.bisect_right(self.known, (line, self.size)) - 1, 0)]
+        while number < line and position < self.size:
+            chunk = self.mm[position:position + CHUNK_SIZE]
+            newlines = chunk.count(b'\n')
+            if newlines < line - number:
+                number += newlines
+                position += len(chunk)
+                continue
+            while number < line:
+                position = self.next_line(position)
+                number += 1
+        bisect.insort(self.known, (number, position))
+        return position
+
+    def head(self) -> (int, int, int, list):
+        return self.read(0, 1)
+
+    def tail(self) -> (int, int, int, list):
+        start = self.size
+        for _ in range(self.page_size):
+            if start <= 0:
+                break
+            start = self.previous_line(start)
+        return self.read(start, 1 if start == 0 else None)
+
+    def goto(self, line: int) -> (int, int, int, list):
+        """
+        Reads the page starting at a line number (from 1).
+        """
+        line = max(line, 1)
+        return self.read(self.find_line(line), line)
+
+    def next_page(self, page: tuple) -> (int, int, int, list):
+        start, end, line, lines = page
+        return self.read(end, line + len(lines) if line else None) if end < self.size else page
+
+    def previous_page(self, page: tuple) -> (int, int, int, list):
+        start, end, line, lines = page
+        if line:
+            return self.goto(line - self.page_size)
+        position = start
+        for _ in range(self.page_size):
+            if position <= 0:
+                break
+            position = self.previous_line(position)
+        return self.read(position, 1 if position == 0 else None)
+
+    def search(self, pattern: str, regex: bool = False, ignore_case: bool = False, limit: int = 100):
+        """
+        Searches the lines with a substring or a regular expression, streaming through the mapped file: only the
+        matching lines are decoded.
+        :param pattern: the substring, or the regular expression (applied to the UTF-8 bytes of the lines)
+        :param regex: whether the pattern is a regular expression
+        :param ignore_case: whether to ignore the (ASCII) case
+        :param limit: maximum number of matching lines, None for all
+        :return: generator of (line number, line) of the matching lines
+        """
+        if regex or ignore_case:
+            expression = re.compile(pattern.encode('utf-8') if regex else re.escape(pattern.encode('utf-8')),
+                                    re.IGNORECASE if ignore_case else 0)
+            matches = (match.start() for match in expression.finditer(self.mm))
+        else:
+            matches = self.iter_find(pattern.encode('utf-8'))
+        found = 0
+        line = 1
+        counted = 0
+        end = -1
+        for position in matches:
+            if position < end:
+                # a line is only reported once
+                continue
+            start = self.mm.rfind(b'\n', 0, position) + 1
+            line += self.count_lines(counted, start)
+            counted = start
+            end = self.next_line(start)
+            yield line, self.decode(start, end)
+            found += 1
+            if limit and found >= limit:
+                return
+
+    def count_lines(self, start: int, end: int) -> int:
+        """
+        Counts the newlines between two byte offsets, CHUNK_SIZE bytes at a time.
+        """
+        return sum(self.mm[position:min(position + CHUNK_SIZE, end)].count(b'\n')
+                   for position in range(start, end, CHUNK_SIZE))
+
+    def iter_find(self, needle: bytes):
+        position = self.mm.find(needle) if needle else -1
+        while position >= 0:
+            yield position
+            position = self.mm.find(needle, position + 1)
+
+    def close(self):
+        if self.size:
+            self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def print_page(page: tuple, file_path: str = None):
+    start, end, line, lines = page
+    if file_path:
+        print(f"'{file_path}', bytes {start}-{end}")
+    for i, text in enumerate(lines):
+        print(f'{line + i:>8}  {text}' if line else f'{"":>8}  {text}')
 
-    if filepath is not None:
-        filename = pattern.search(filepath)
 
-        with open(filename.group(1) + filename.group(2), 'r') as f:
-            print(f.read())
+def file_validator(filepath):
+    if filepath is not None:
+        with FileViewer(filepath) as viewer:
+            print_page(viewer.head(), filepath)
+            if viewer.size > CHUNK_SIZE:
+                print(f'... {viewer.size} bytes, use display_filecontent() to browse or search the whole file')
     else:
         print('There is no file of your choice...')
 
+
 def display_filecontent(filepath):
-    file_validator(filepath)
+    """
+    Displays a memory-mapped, paged view of an output file in the notebook: head, previous and next page, tail, go to
+    a line, and substring or regular expression search. One file is viewed at a time: the previous view is closed,
+    its file unmapped.
+    """
+    global VIEWER
+    if VIEWER is not None:
+        VIEWER[1].close()
+        VIEWER[0].close()
+        VIEWER = None
+    if filepath is None:
+        print('There is no file of your choice...')
+        return
+    try:
+        viewer = FileViewer(filepath)
+    except (OSError, ValueError) as e:
+        print(e)
+        return
+    output = widgets.Output()
+    state = {'page': viewer.head()}
+
+    def show(page):
+        state['page'] = page
+        output.clear_output(wait=True)
+        with output:
+            print_page(page, filepath)
+
+    def on_search(_):
+        output.clear_output(wait=True)
+        with output:
+            try:
+                results = list(viewer.search(pattern.value, regex.value, ignore_case.value, SEARCH_LIMIT))
+            except re.error as e:
+                print(f'Invalid regular expression: {e}')
+                return
+            print(f"{len(results)}{'+' if len(results) == SEARCH_LIMIT else ''} matching lines of '{filepath}'")
+            for line, text in results:
+                print(f'{line:>8}  {text}')
+
+    buttons = [('Head', lambda _: show(viewer.head())),
+               ('Previous', lambda _: show(viewer.previous_page(state['page']))),
+               ('Next', lambda _: show(viewer.next_page(state['page']))),
+               ('Tail', lambda _: show(viewer.tail()))]
+    navigation = []
+    for description, action in buttons:
+        button = widgets.Button(description=description)
+        button.on_click(action)
+        navigation.append(button)
+    line = widgets.BoundedIntText(value=1, min=1, max=2 ** 63 - 1, description='Line')
+    go = widgets.Button(description='Go')
+    go.on_click(lambda _: show(viewer.goto(line.value)))
+    pattern = widgets.Text(description='Search')
+    regex = widgets.Checkbox(value=False, description='Regex')
+    ignore_case = widgets.Checkbox(value=False, description='Ignore case')
+    find = widgets.Button(description='Find')
+    find.on_click(on_search)
+    close = widgets.Button(description='Close')
+    box = widgets.VBox([widgets.HBox(navigation + [line, go, close]),
+                        widgets.HBox([pattern, regex, ignore_case, find]), output])
+
+    def on_close(_):
+        global VIEWER
+        box.close()
+        viewer.close()
+        VIEWER = None
+
+    close.on_click(on_close)
+    VIEWER = (viewer, box)
+    display(box)
+    show(state['page'])
 
 ###########################################
 ############ Hide code ####################
@@ -89,162 +342,335 @@ def display_hidebuttom():
 ########### Progress bar ##################
 ###########################################
 
-def progress_bar(file: str, row: int, spec: str):
-    steps = [f"Extracting Assessments from '{file}'",
-             f'Extracting data from the {row}º Assessment in "{file}" into a python dictionary',
-             f"'{spec}' retrieved!", f"'{spec}' CAMSS Knowledge Graph created!"]
-    with tqdm(total=4, position=0, ncols=300, leave=True, desc=spec,
-              bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt}') as bar:
-        for i in range(4):
-            bar.update(int(1))
-            sleep(0.5)
-        print('                                               ' + spec + ' Completed!')
-        print()
+class ProgressListener:
+    """
+    Receives the progress events of a conversion (see Progress): FILE_STARTED, ROW_EXTRACTED, GRAPH_WRITTEN,
+    ROW_SKIPPED, ROW_FAILED and FILE_DONE. The events are delivered one at a time, from the converting thread.
+    """
+
+    def notify(self, event: str, file: str, row: int = None, spec: str = None, total: int = None):
+        """
+        :param event: the event name
+        :param file: the workbook file path
+        :param row: the workbook row of the assessment, None for the workbook events
+        :param spec: the specification title, once the assessment is extracted
+        :param total: number of assessments of the workbook, for FILE_STARTED
+        """
+        pass
+
+    def close(self):
+        pass
+
+
+class TqdmListener(ProgressListener):
+    """
+    One progress bar per workbook, advanced when the graphs of an assessment are written (or the assessment skipped
+    or quarantined): a notebook widget in Jupyter, a text bar in a console (tqdm.auto).
+    """
+
+    def __init__(self, **kwargs):
+        """
+        :param kwargs: tqdm options, e.g. leave=False or file=sys.stdout
+        """
+        self.options = dict(position=0, leave=True, unit='ass', **kwargs)
+        self.bars = {}
+
+    def notify(self, event: str, file: str, row: int = None, spec: str = None, total: int = None):
+        if event == FILE_STARTED:
+            self.bars[file] = tqdm(total=total, desc=os.path.basename(file), **self.options)
+        elif event in (GRAPH_WRITTEN, ROW_SKIPPED, ROW_FAILED) and file in self.bars:
+            bar = self.bars[file]
+            if spec:
+                bar.set_postfix_str(spec, refresh=False)
+            bar.update(1)
+        elif event == FILE_DONE and file in self.bars:
+            self.bars.pop(file).close()
+
+    def close(self):
+        for bar in self.bars.values():
+            bar.close()
+        self.bars.clear()
+
+
+class LogListener(ProgressListener):
+    """
+    Logs the progress of every workbook (logging module), every few assessments, with the conversion rate.
+    """
+
+    def __init__(self, every: int = 50, level: int = logging.INFO):
+        """
+        :param every: number of assessments between two messages
+        :param level: logging level of the messages
+        """
+        self.every = every
+        self.level = level
+        self.files = {}
+
+    def notify(self, event: str, file: str, row: int = None, spec: str = None, total: int = None):
+        if event == FILE_STARTED:
+            self.files[file] = [time.perf_counter(), total, 0, 0]
+            logging.log(self.level, f"'{file}': {total} assessments to convert")
+            return
+        state = self.files.get(file)
+        if state is None:
+            return
+        if event in (GRAPH_WRITTEN, ROW_SKIPPED, ROW_FAILED):
+            state[2] += 1
+            state[3] += event == ROW_FAILED
+            if state[2] % self.every == 0:
+                elapsed = time.perf_counter() - state[0]
+                logging.log(self.level, f"'{file}': {state[2]}/{state[1]} assessments "
+                                        f"({round(state[2] / elapsed, 1) if elapsed else '-'}/s)")
+        elif event == FILE_DONE:
+            elapsed = time.perf_counter() - self.files.pop(file)[0]
+            logging.log(self.level, f"'{file}': {state[2]} assessments in {round(elapsed, 2)} s"
+                                    + (f', {state[3]} quarantined' if state[3] else ''))
+
+
+class Progress:
+    """
+    Publishes the progress events of the pipeline to the listeners added. Emitting costs a single check while no
+    listener is added; the listeners are notified under a lock, as several workbooks can be converted at once.
+    """
+
+    def __init__(self):
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def add(self, listener: ProgressListener) -> ProgressListener:
+        with self.lock:
+            self.listeners = self.listeners + [listener]
+        return listener
+
+    def remove(self, listener: ProgressListener):
+        with self.lock:
+            self.listeners = [added for added in self.listeners if added is not listener]
+        listener.close()
+
+    def emit(self, event: str, file: str, row: int = None, spec: str = None, total: int = None):
+        if not self.listeners:
+            return
+        with self.lock:
+            for listener in self.listeners:
+                listener.notify(event, file, row, spec, total)
+
+
+def get_progress() -> Progress:
+    """
+    Returns the progress events publisher of the current process.
+    """
+    global PROGRESS
+    if PROGRESS is None:
+        PROGRESS = Progress()
+    return PROGRESS
 
 ###########################################
 ########## EIF score counting #############
 ###########################################
 
+class ScoringProfile:
+    """
+    Scoring profile of a scenario, as data: its categories (name and range of criteria positions), the maximum score
+    of a criterion and the compliance levels of every category as half-open score intervals. The levels are compiled
+    once into sorted bounds, so that a compliance level is found by a binary search: bisect for a score,
+    numpy.searchsorted for many scores at once.
+    """
+    name: str  # scenario (and version) of the profile (string type)
+    categories: list  # (category name, first criterion position, last criterion position + 1)
+    criteria: int  # number of criteria of the scenario (integer type)
+    maximum: int  # maximum score of a criterion (integer type)
+
+    def __init__(self, name: str, categories: list, levels: list, maximum: int = 100):
+        """
+        ScoringProfile class initializer.
+        :param name: scenario (and version) of the profile
+        :param categories: (category name, first criterion position, last criterion position + 1)
+        :param levels: per category, the (lowest score, highest score + 1, compliance level) intervals
+        :param maximum: maximum score of a criterion
+        """
+        self.name = name
+        self.categories = categories
+        self.criteria = categories[-1][2]
+        self.maximum = maximum
+        self.bounds = []
+        self.labels = []
+        for intervals in levels:
+            bounds, labels = self.compile(intervals)
+            self.bounds.append(bounds)
+            self.labels.append(labels)
+
+    @staticmethod
+    def compile(intervals: list) -> (list, list):
+        """
+        Compiles the compliance level intervals of a category: the label of a score is labels[bisect_right(bounds,
+        score)], None for the scores outside every interval.
+        """
+        bounds = []
+        labels = [None]
+        for start, stop, level in sorted(intervals):
+            if not bounds or bounds[-1] != start:
+                bounds.append(start)
+                labels.append(None)
+            labels[-1] = level
+            bounds.append(stop)
+            labels.append(None)
+        return bounds, labels
+
+    @property
+    def category_range(self) -> list:
+        return [(start, end) for _, start, end in self.categories]
+
+    def get_level(self, category: int, score: int) -> str:
+        """
+        Returns the compliance level of a category score.
+        :param category: the category number, from 1
+        """
+        return self.labels[category - 1][bisect.bisect_right(self.bounds[category - 1], score)]
+
+    def get_levels(self, category: int, scores) -> np.ndarray:
+        """
+        Returns the compliance levels of many scores of a category at once.
+        :param category: the category number, from 1
+        :param scores: array of category scores
+        """
+        labels = np.array(self.labels[category - 1], dtype=object)
+        return labels[np.searchsorted(self.bounds[category - 1], scores, side='right')]
+
+    def score(self, scores, not_applicable) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        Scores many assessments at once: category scores, not applicable criteria and compliance levels.
+        :param scores: array of criterion scores, one row per assessment, in the order of the criteria positions
+        :param not_applicable: array of booleans, whether each criterion is not applicable
+        :return: category scores, not applicable counts and compliance levels, one row per assessment
+        """
+        scores = np.asarray(scores)
+        not_applicable = np.asarray(not_applicable)
+        category_scores = np.column_stack([scores[:, start:end].sum(axis=1) for _, start, end in self.categories])
+        counts = np.column_stack([not_applicable[:, start:end].sum(axis=1) for _, start, end in self.categories])
+        levels = np.column_stack([self.get_levels(category, category_scores[:, category - 1])
+                                  for category in range(1, len(self.categories) + 1)])
+        return category_scores, counts, levels
+
+
+def get_profile(scenario: str, version: str = None) -> ScoringProfile:
+    """
+    Returns the scoring profile of a scenario version, or of the scenario; None if its assessments are not scored.
+    """
+    return PROFILES.get(f'{scenario}-{version}', PROFILES.get(scenario))
+
+
 class PunctuationCalculator:
-    def __init__(self, criteria, ass_dict):
+    def __init__(self, criteria, ass_dict, profile: ScoringProfile = None):
         self.criteria = criteria
         self.ass_dict = ass_dict
-        self.category_range = [(0, 1), (1, 18), (18, 30), (30, 35), (35, 45)]
+        # the profile of the assessment scenario, EIF by default
+        context = ass_dict.get('contextualised_by') or {}
+        self.profile = profile if profile else get_profile(context.get('scenario', 'EIF'), ass_dict.get('tool_version'))
+        if self.profile is None:
+            raise Exception(f"No scoring profile for the {context.get('scenario')} scenario.")
+        self.category_range = self.profile.category_range
 
     def get_range(self, interval):
-        start = interval[0]
-        l = []
-        while start < interval[1]:
-            l.append(start)
-            start += 1
-        return l
-
-    def get_strength(self, not_app, total, criteria_short=False):
-        if criteria_short:
-            return round(((total - not_app) / total - 1) * 100, 4)
-        else:
-            return round(((total - not_app) / total) * 100, 4)
+        return list(range(interval[0], interval[1]))
+
+    def get_strength(self, not_app, total):
+        return round(((total - not_app) / total) * 100, 4)
 
     def get_compliance_level(self, cat, sc):
-        compliance_level = {
-            1: {'Ad-hoc': range(21), 'Opportunistic': [40], 'Essential': [60], 'Sustainable': [80],
-                'Seamless': [100]},
-            2: {'Ad-hoc': range(0, 341), 'Opportunistic': range(341, 681), 'Essential': range(681, 1021),
-                'Sustainable': range(1021, 1361), 'Seamless': range(1361, 1701)},
-            3: {'Ad-hoc': range(0, 241), 'Opportunistic': range(241, 481), 'Essential': range(481, 721),
-                'Sustainable': range(721, 961), 'Seamless': range(961, 1201)},
-            4: {'Ad-hoc': range(0, 101), 'Opportunistic': range(101, 201), 'Essential': range(201, 301),
-                'Sustainable': range(301, 401), 'Seamless': range(401, 501)},
-            5: {'Ad-hoc': range(0, 201), 'Opportunistic': range(201, 401), 'Essential': range(401, 601),
-                'Sustainable': range(601, 801), 'Seamless': range(801, 1001)}
-        }
-        for level in compliance_level[cat]:
-            if sc in compliance_level[cat][level]:
-                return level
+        return self.profile.get_level(cat, sc)
+
+    def get_score(self, criterion_score):
+        try:
+            return int(criterion_score) if criterion_score != 'None' else 0
+        except:
+            print('empty criterion')
+            return 0
 
     def run_criteria(self):
         category_range = self.category_range
-        criteria_list = list(self.criteria.keys())
-        criteria_short = False
+        criteria_list = list(self.criteria.values())[:self.profile.criteria]
+
+        # the assessment is scored as a batch of one, with the compiled profile
+        scores = [[self.get_score(values[4]) for values in criteria_list]]
+        not_applicable = [[str(values[-1]).lower() == 'not applicable' for values in criteria_list]]
+        category_scores, counts, levels = self.profile.score(scores, not_applicable)
 
-        criterion_score_list = []
         ass_punct = []
         count_overall_notapp = 0
 
-        for rang in category_range:
-            count_notapp = 0
-            rang_ = self.get_range(rang)
-
-            for i in rang_:
-                criterion_score = self.criteria[criteria_list[i]][4]
-                notapp = self.criteria[criteria_list[i]][-1]
+        for category, rang in enumerate(category_range, start=1):
+            category_score = int(category_scores[0, category - 1])
+            count_notapp = int(counts[0, category - 1])
+            total_category_score = str(category_score) + '/' + str((rang[1] - rang[0]) * self.profile.maximum)
+            category_strength = self.get_strength(count_notapp, rang[1] - rang[0])
 
-                if notapp.lower() == 'not applicable':
-                    count_notapp += 1
-
-                try:
-                    if criterion_score != 'None':
-                        criterion_score_list.append(int(criterion_score))
-                    else:
-                        criterion_score_list.append(0)
-                except:
-                    print('empty criterion')
-
-            category_score = sum(criterion_score_list[rang_[0]:rang_[-1] + 1])
-
-            if criteria_short and rang == (1, 23):
-                total_category_score = str(category_score) + '/' + str(((rang[1] - rang[0]) * 100) - 100)
-                category_strength = self.get_strength(count_notapp, ((rang[1] - rang[0])) - 1)
-            else:
-                total_category_score = str(category_score) + '/' + str((rang[1] - rang[0]) * 100)
-                category_strength = self.get_strength(count_notapp, rang[1] - rang[0])
-
-            compliance_level = self.get_compliance_level(category_range.index(rang) + 1, category_score)
+            compliance_level = levels[0, category - 1]
             ass_punct.append(
                 [category_score, total_category_score, category_strength, compliance_level, count_notapp])
             count_overall_notapp += count_notapp
 
         overall_score = sum(punct[0] for punct in ass_punct)
+        total_overall_score = [overall_score, (category_range[-1][1] - category_range[0][0]) * self.profile.maximum]
 
-        if criteria_short:
-            total_overall_score = [overall_score, (category_range[-1][1] - 1 - category_range[0][0]) * 100]
-        else:
-            total_overall_score = [overall_score, (category_range[-1][1] - category_range[0][0]) * 100]
-
-        total_overall_score[0] -= count_overall_notapp * 100
-        total_overall_score[1] -= count_overall_notapp * 100
+        total_overall_score[0] -= count_overall_notapp * self.profile.maximum
+        total_overall_score[1] -= count_overall_notapp * self.profile.maximum
         total_overall_score = [str(item) for item in total_overall_score]
         total_overall_score = '/'.join(total_overall_score)
         overall_strength = self.get_strength(count_overall_notapp, len(self.criteria))
         ass_punct.append([total_overall_score, overall_strength])
         ass_punct.append(count_overall_notapp)
-        ass_punct.append(45)
+        ass_punct.append(self.profile.criteria)
 
         return ass_punct
-    def generate_punctuation_file(self):
-        with open(f'arti/punct/{self.ass_dict["title"]["P1"]}-EIFScenario-scores.csv', 'w', encoding='utf-8') as f:
+    def generate_punctuation_file(self, f=None):
+        """
+        Writes the score table, to 'arti/punct/' or to an open text stream.
+        """
+        with open(f'arti/punct/{self.ass_dict["title"]["P1"]}-EIFScenario-scores.csv', 'w', encoding='utf-8') \
+                if f is None else nullcontext(f) as f:
             ass_scores = self.run_criteria()
-            # EIF Principles setting the context for EU Actions on Interoperability
-            # category 1
             print('', 'score', 'strength', 'compliance level', sep='\t', file=f)
-            print('EIF Principles setting the context for EU Actions on Interoperability', ass_scores[0][1],
-                  ass_scores[0][2], ass_scores[0][3], sep='\t', file=f)
-            if len(self.criteria) == 43:
-                # EIF Core Interoperability Principles
-                # 2
-                print('EIF Core Interoperability Principles', ass_scores[1][1], ass_scores[1][2], ass_scores[1][3],
-                      sep='\t', file=f)
-                # EIF Principles Related to generic user needs and expectations
-                # 3
-                print('EIF Principles Related to generic user needs and expectations', ass_scores[2][1],
-                      ass_scores[2][2], ass_scores[2][3], sep='\t', file=f)
-                # EIF Foundation principles for cooperation among public administrations
-                # 4
-                print('EIF Foundation principles for cooperation among public administrations', ass_scores[3][1],
-                      ass_scores[3][2], ass_scores[3][3], sep='\t', file=f)
-                # EIF Interoperability Layers
-                # 5
-                print('EIF Interoperability Layers', ass_scores[4][1], ass_scores[4][2], ass_scores[4][3], sep='\t',
-                      file=f)
-            else:
-                # EIF Core Interoperability Principles
-                # 2
-                print('EIF Core Interoperability Principles', ass_scores[1][1], ass_scores[1][2], ass_scores[1][3],
-                      sep='\t', file=f)
-                # EIF Principles Related to generic user needs and expectations
-                # 3
-                print('EIF Principles Related to generic user needs and expectations', ass_scores[2][1],
-                      ass_scores[2][2], ass_scores[2][3], sep='\t', file=f)
-                # EIF Foundation principles for cooperation among public administrations
-                # 4
-                print('EIF Foundation principles for cooperation among public administrations', ass_scores[3][1],
-                      ass_scores[3][2], ass_scores[3][3], sep='\t', file=f)
-                # EIF Interoperability Layers
-                # 5
-                print('EIF Interoperability Layers', ass_scores[4][1], ass_scores[4][2], ass_scores[4][3], sep='\t',
-                      file=f)
-            print('Overall Score', ass_scores[5][0], ass_scores[5][1], '', sep='\t', file=f)
-            print('', round(int(ass_scores[5][0].split("/")[0]) / int(ass_scores[5][0].split("/")[1]), 4), '', '',
-                  sep='\t', file=f)
-            print('not app', ass_scores[6], '', '', sep='\t', file=f)
-            print('total', ass_scores[7], '', '', sep='\t', file=f)
\ No newline at end of file
+            for i, (name, _, _) in enumerate(self.profile.categories):
+                print(name, ass_scores[i][1], ass_scores[i][2], ass_scores[i][3], sep='\t', file=f)
+            overall = len(self.profile.categories)
+            print('Overall Score', ass_scores[overall][0], ass_scores[overall][1], '', sep='\t', file=f)
+            print('', round(int(ass_scores[overall][0].split("/")[0]) / int(ass_scores[overall][0].split("/")[1]), 4),
+                  '', '', sep='\t', file=f)
+            print('not app', ass_scores[overall + 1], '', '', sep='\t', file=f)
+            print('total', ass_scores[overall + 2], '', '', sep='\t', file=f)
+
+
+CHUNK_SIZE = 1024 * 1024  # bytes scanned at once by FileViewer to count the lines
+SEARCH_LIMIT = 100  # matching lines shown by display_filecontent()
+VIEWER = None  # (FileViewer, widget) shown by display_filecontent()
+
+# progress events, see Progress
+FILE_STARTED = 'file started'
+ROW_EXTRACTED = 'row extracted'
+GRAPH_WRITTEN = 'graph written'
+ROW_SKIPPED = 'row skipped'
+ROW_FAILED = 'row failed'
+FILE_DONE = 'file done'
+PROGRESS = None  # progress events publisher of the process, see get_progress()
+
+# scoring profile of the EIF scenario
+EIF_PROFILE = ScoringProfile(
+    'EIF',
+    categories=[('EIF Principles setting the context for EU Actions on Interoperability', 0, 1),
+                ('EIF Core Interoperability Principles', 1, 18),
+                ('EIF Principles Related to generic user needs and expectations', 18, 30),
+                ('EIF Foundation principles for cooperation among public administrations', 30, 35),
+                ('EIF Interoperability Layers', 35, 45)],
+    levels=[[(0, 21, 'Ad-hoc'), (40, 41, 'Opportunistic'), (60, 61, 'Essential'), (80, 81, 'Sustainable'),
+             (100, 101, 'Seamless')],
+            [(0, 341, 'Ad-hoc'), (341, 681, 'Opportunistic'), (681, 1021, 'Essential'),
+             (1021, 1361, 'Sustainable'), (1361, 1701, 'Seamless')],
+            [(0, 241, 'Ad-hoc'), (241, 481, 'Opportunistic'), (481, 721, 'Essential'), (721, 961, 'Sustainable'),
+             (961, 1201, 'Seamless')],
+            [(0, 101, 'Ad-hoc'), (101, 201, 'Opportunistic'), (201, 301, 'Essential'), (301, 401, 'Sustainable'),
+             (401, 501, 'Seamless')],
+            [(0, 201, 'Ad-hoc'), (201, 401, 'Opportunistic'), (401, 601, 'Essential'), (601, 801, 'Sustainable'),
+             (801, 1001, 'Seamless')]])
+# scoring profiles per scenario ('EIF') or scenario version ('EIF-6.0.0'); None: the MSP and TS assessments have no
+# scoring table of their own, so they get no score table, global score nor cav:considers link
+PROFILES = {'EIF': EIF_PROFILE, 'MSP': None, 'TS': None}
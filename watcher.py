@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import camssXLSX2RDF as camss
+
+
+def is_ignored(file_name: str) -> bool:
+    """
+    Checks whether a file of the input folder is not a workbook to convert: hidden files, LibreOffice
+    ('.~lock.<file>#') and Microsoft Office ('~$<file>') lock files, and temporary download files.
+    """
+    return file_name.startswith('.') or file_name.startswith('~$') or file_name.endswith('#') \
+        or os.path.splitext(file_name)[1].lower() not in WORKBOOK_EXTENSIONS
+
+
+class Watcher:
+    """
+    Long-running watcher of the input folder ('arti/in/*/'). New or changed workbooks are converted on a warm worker
+    pool once they stop changing (debounce), and the merged NQuads, Turtle and JSON-LD datasets are then refreshed.
+    The folder is polled with os.scandir(), which only stats a handful of files per poll, so idle CPU use is
+    negligible, and a workbook is only hashed when its size or modification time changed since it was last checked.
+    The content hash of every converted workbook is kept in 'arti/watch.json', so touched but unchanged workbooks and
+    the workbooks converted before a restart are not converted again; the outputs of an edited workbook are replaced.
+    """
+    input_folder: str  # folder watched, e.g. 'arti/in/' (string type)
+    interval: float  # seconds between two polls (float type)
+    debounce: float  # seconds a workbook must stay unchanged before being converted (float type)
+    targets: list  # merged datasets refreshed after each batch, 'Turtle' and/or 'JSON-LD'
+    state: dict  # workbook path -> content hash of its last conversion
+    checked: dict  # workbook path -> (size, mtime) when it was last converted or found unchanged
+
+    def __init__(self, input_folder: str = 'arti/in/', interval: float = 2.0, debounce: float = 5.0,
+                 workers: int = None, consolidated: bool = False, compression: str = None, targets: list = None,
+                 state_path: str = None):
+        """
+        Watcher class initializer.
+        :param input_folder: the folder with one sub-folder of workbooks per scenario
+        :param interval: seconds between two polls
+        :param debounce: seconds a workbook must stay unchanged before being converted
+        :param workers: size of the worker pool
+        :param consolidated: whether to append the graphs to the consolidated shards
+        :param compression: None, 'gzip' or 'xz' compression of the NQuads outputs
+        :param targets: merged datasets refreshed after each batch, ['Turtle', 'JSON-LD'] by default
+        :param state_path: the watcher state file path
+        """
+        self.input_folder = camss.slash(input_folder)
+        self.interval = interval
+        self.debounce = debounce
+        self.consolidated = consolidated
+        self.compression = compression
+        self.targets = ['Turtle', 'JSON-LD'] if targets is None else targets
+        self.state_path = state_path if state_path else WATCH_PATH
+        self.state = {}
+        if os.path.isfile(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        self.pending = {}  # workbook path -> (size, mtime, time the signature was first seen)
+        self.checked = {}
+        self.stopped = threading.Event()
+        # the worker pool and the process-wide caches stay warm between batches
+        self.pool = ThreadPoolExecutor(max_workers=workers if workers else min(4, os.cpu_count() or 1))
+        camss.get_registry()
+        camss.get_workbook_cache()
+
+    def scan(self) -> list:
+        """
+        Polls the input folder.
+        :return: the workbooks that changed and have not changed during the last 'debounce' seconds
+        """
+        now = time.monotonic()
+        seen = set()
+        ready = []
+        with os.scandir(self.input_folder) as folders:
+            for folder in folders:
+                if not folder.is_dir() or folder.name.startswith('.'):
+                    continue
+                with os.scandir(folder.path) as entries:
+                    for entry in entries:
+                        if not entry.is_file() or is_ignored(entry.name):
+                            continue
+                        seen.add(entry.path)
+                        stat = entry.stat()
+                        signature = (stat.st_size, stat.st_mtime)
+                        if self.checked.get(entry.path) == signature:
+                            # not modified since it was last checked
+                            self.pending.pop(entry.path, None)
+                            continue
+                        previous = self.pending.get(entry.path)
+                        if previous is None or previous[:2] != signature:
+                            self.pending[entry.path] = signature + (now,)
+                        elif now - previous[2] >= self.debounce:
+                            ready.append(entry.path)
+        for watched in [self.pending, self.checked]:
+            for path in list(watched):
+                if path not in seen:
+                    # deleted, or renamed by the application saving it
+                    del watched[path]
+        return ready
+
+    def convert(self, file_path: str) -> bool:
+        """
+        Converts a workbook, if its content changed since its last conversion. The outputs of the assessments of an
+        edited workbook are replaced.
+        :return: whether the workbook was converted
+        """
+        key = camss.WorkbookCache.get_key(file_path)
+        previous = self.state.get(file_path)
+        if previous == key:
+            return False
+        camss.log(f"Converting '{file_path}'...")
+        camss.__extract_file_assessments__(os.path.dirname(file_path), [os.path.basename(file_path)],
+                                           self.consolidated, self.compression, overwrite=previous is not None)
+        self.state[file_path] = key
+        return True
+
+    def refresh(self):
+        """
+        Refreshes the merged datasets. Only the per-assessment files that changed are converted again (see
+        camssXLSX2RDF.convert_graph_to).
+        """
+        camss.get_registry().save()
+        camss.__merge_graphs__(self.consolidated, self.compression)
+        for target in self.targets:
+            camss.convert_graph_to(target, self.compression)
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=1)
+
+    def poll(self) -> int:
+        """
+        Polls the input folder once and converts the workbooks that are ready.
+        :return: the number of workbooks converted
+        """
+        ready = self.scan()
+        if not ready:
+            return 0
+        for path in ready:
+            # converted, unchanged or failing: watched again from its next change on
+            self.checked[path] = self.pending.pop(path)[:2]
+        futures = {self.pool.submit(self.convert, path): path for path in ready}
+        wait(futures)
+        converted = 0
+        for future, path in futures.items():
+            try:
+                converted += future.result()
+            except Exception as e:
+                camss.log(f"'{path}' could not be converted: {e}", level='w')
+        if converted:
+            self.refresh()
+        return converted
+
+    def run(self):
+        """
+        Watches the input folder until stop() is called or the process is interrupted (Ctrl+C).
+        """
+        camss.log(f"Watching '{self.input_folder}'...")
+        try:
+            while not self.stopped.is_set():
+                self.poll()
+                self.stopped.wait(self.interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.pool.shutdown(wait=True)
+            camss.log('Watcher stopped.')
+
+    def start(self) -> threading.Thread:
+        """
+        Watches the input folder in a background thread, e.g. from a Jupyter Notebook.
+        """
+        thread = threading.Thread(target=self.run, name='camss-watcher', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stopped.set()
+
+
+def watch(input_folder: str = 'arti/in/', **kwargs) -> Watcher:
+    """
+    Use it to watch the input folder from a python console, Jupyter Lab or Notebook, etc. (in the background).
+    :param input_folder: the folder with one sub-folder of workbooks per scenario
+    :param kwargs: see Watcher
+    :return: the Watcher; call its stop() method to stop watching
+    """
+    watcher = Watcher(input_folder, **kwargs)
+    watcher.start()
+    return watcher
+
+
+WATCH_PATH = 'arti/watch.json'  # content hash of every workbook converted by the watcher
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xlsm', '.xls', '.csv')  # workbooks the watcher converts
+
+
+if __name__ == '__main__':
+    Watcher(sys.argv[1] if len(sys.argv) > 1 else 'arti/in/').run()